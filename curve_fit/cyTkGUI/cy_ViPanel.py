@@ -1,6 +1,6 @@
 # -*- encoding: utf-8 -*-
 
-import time
+import os, sys
 import cv2
 import numpy as np
 import six
@@ -11,6 +11,10 @@ from PIL import ImageTk
 
 from cy_Utils.cy_CvOSD import CvOSD as OSD
 
+#-- the imutils of this repo first, an installed imutils has no FPS(window=)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'imutils-master'))
+from imutils.video import FPS
+
 #------------------------------------------------------------------
 # TODO: resize image to fit panel size
 # TODO: pan/zoom feature
@@ -388,7 +392,8 @@ class tkViPanel:
 		if self.osdOn:
 			self.osd = OSD()
 			self.osd.set_property(fontScale=self.osdScale, fontColor=self.osdColor)
-			self.timeLastFrame = time.time()
+			#-- rolling fps over the last 30 frames, timed from the first show()
+			self.fpsMeter = FPS(window=30)
 
 		if rootWin is None:
 			self.dbgPrint("ERROR: Null rootWin !!")
@@ -429,11 +434,11 @@ class tkViPanel:
 			pass
 
 		if self.osdOn:
-			now = time.time()
-			fps = (self.fps_last + (1.0 / (now - self.timeLastFrame)))/2.0
-			self.timeLastFrame = now
-			self.fps_min = fps if fps < self.fps_min else self.fps_min
-			self.fps_max = fps if fps > self.fps_max else self.fps_max
+			self.fpsMeter.update()
+			fps = self.fpsMeter.rolling_fps()
+			if fps > 0:
+				self.fps_min = fps if fps < self.fps_min else self.fps_min
+				self.fps_max = fps if fps > self.fps_max else self.fps_max
 			showName = self.clsName if not name else name
 			text = "{}, fps{:.1f} - max{:.1f}".format(showName, fps, self.fps_max)
 			self.fps_last = fps
@@ -0,0 +1,90 @@
+#!/usr/bin/python
+#-- encoding: utf-8 --
+
+import os, glob
+
+import cv2
+
+
+###########################################################
+# Collect files
+###########################################################
+def find_files(target, patterns):
+    """To list the files of a directory, a glob pattern, or a single file
+
+    Arguments
+    ---------------
+    target: string
+        a directory (searched with patterns, in lower and upper case), a glob (e.g. 'captures/*.jpg'),
+        or a file name
+    patterns: list of string
+        the file patterns used when target is a directory
+
+    Returns
+    ---------------
+    list of file names, sorted
+    """
+    if os.path.isdir(target):
+        files = set()
+        for pattern in patterns:
+            files.update(glob.glob(os.path.join(target, pattern)))
+            files.update(glob.glob(os.path.join(target, pattern.upper())))
+    elif glob.has_magic(target):
+        files = glob.glob(target)
+    else:
+        files = [target]
+    return sorted(f for f in files if os.path.isfile(f))
+
+
+
+###########################################################
+# Run a function over a process pool
+###########################################################
+def worker_init():
+    #-- one OpenCV thread per process, the pool already occupies every core
+    cv2.setNumThreads(1)
+
+
+def run_batch(func, *iterables, jobs=None, maxChunk=1, progress=None):
+    """To call func over the items of iterables in parallel with a ProcessPoolExecutor, like map()
+
+    Arguments
+    ---------------
+    func: function
+        a module level function (or a functools.partial of one), it should catch its own errors
+        and report them in its result
+    iterables: list
+        the arguments of func, one list per argument
+    jobs: integer
+        number of worker processes, None for os.cpu_count(), 1 to run in this process
+    maxChunk: integer
+        the most items sent to a worker at once, a worker can then reuse its caches across items
+    progress: function
+        if not None, called as progress(n, total, result) for each result, in order
+
+    Returns
+    ---------------
+    list of the results of func, in the order of the items
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    total = min(len(items) for items in iterables)
+    if jobs == 1:
+        results = map(func, *iterables)
+        pool = None
+    else:
+        nWorkers = jobs or os.cpu_count() or 1
+        chunk = max(1, min(maxChunk, total // (nWorkers * 4)))
+        pool = ProcessPoolExecutor(max_workers=nWorkers, initializer=worker_init)
+        results = pool.map(func, *iterables, chunksize=chunk)
+
+    try:
+        out = []
+        for res in results:
+            out.append(res)
+            if progress:
+                progress(len(out), total, res)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return out
@@ -14,6 +14,7 @@ import cv2
 import cyPyModules.Add_cyModules
 import cyPyModules.shading_test_util as shadingUTIL
 import cyPyModules.image_shading as IS
+import cyPyModules.shading_batch as shadingBATCH
 
 import cy_OSUTIL as cyOS
 import cy_CvOSD as OSD
@@ -70,7 +71,7 @@ def main():
     chromaspec: corner R/G, B/G 的色偏百分比
     """
     parser = argparse.ArgumentParser(add_help=False)
-    parser.add_argument('img', help="input image file name")
+    parser.add_argument('img', help="input image file name, or a folder/glob/manifest (.txt, .json) for batch test")
     parser.add_argument('--gui', nargs='?', const=1, type=int, default=0, help='JSON file for default RAW format.')
     parser.add_argument('--conf', help='JSON file for default RAW format.')
     parser.add_argument("--lumaspec", nargs=2, type=int, default=[85, 10], help='spec of luma shading, Corner/Center percentage, Inter-Corner Deviation percentage')
@@ -80,6 +81,10 @@ def main():
     parser.add_argument("--hvfield", type=int, default=100, choices=range(0,101), help='spec of chroma shading, Corner R/G, B/G percentage, Inter-Corner Deviation percentage')
     parser.add_argument("--saveimg", nargs='?', const=1, type=int, default=0, help='save result shading image if specified')
     parser.add_argument("--output", type=str, default="", help='the directory to store the result image')
+    parser.add_argument("--batch", action='store_true', help='batch test, implied if img is a folder, a glob or a manifest')
+    parser.add_argument("--jobs", type=int, default=None, help='number of worker processes of batch test, default=number of CPUs')
+    parser.add_argument("--report", type=str, default="shading_report.csv", help='the report file of batch test, .csv or .json')
+    parser.add_argument("--ydev-fail", action='store_true', help='batch test fails an image on the Inter-Corner Deviation too, otherwise it is only reported')
     #parser.add_argument("--scale", type=int, help="percentage to downscale while generating output images, e.g., 30 stands for 30%%.")
     #parser.add_argument("--ROI", help='+x+y*w+h to specify ROI of RAW image.')
     args = vars(parser.parse_args())
@@ -117,6 +122,23 @@ def main():
         print('--- gIsSaveImg= ', gIsSaveImg)
         print('--- gOutputDir= ', gOutputDir)
 
+    #-------------------------------------------
+    # Batch test
+    #-------------------------------------------
+    if args['batch'] or shadingBATCH.is_batch_target(gImgFilename):
+        files = shadingBATCH.find_image_files(gImgFilename)
+        if not files:
+            DBG.error('No image found: ' + gImgFilename)
+            return
+        conf = { 'winsize': gWinSizeRatio, 'dfield': gDiagField, 'hvfield': gHvField,
+                 'lumaC2C': gSpecLumaC2C, 'lumaDev': gSpecLumaDev, 'chromaDev': gSpecChromaDev,
+                 'saveimg': gIsSaveImg, 'outdir': gOutputDir, 'ydevFail': args['ydev_fail'] }
+        results = shadingBATCH.batch_test(files, conf, jobs=args['jobs'])
+        shadingBATCH.write_report(results, args['report'])
+        DBG.info('Report: ' + args['report'])
+        gIsGui = False
+        return
+
 
     try:
         # f = open(gOpenFileName, 'rb')
@@ -241,18 +241,33 @@ class roiRect():
 #--------------------------------------
 # Class: ImageROI
 #--------------------------------------
+#-- one record per ROI rectangle of ImageROI
+roiRecord_Dtype = np.dtype([
+    ('Xc', np.int64), ('Yc', np.int64),         # center of the ROI
+    ('W', np.int64), ('H', np.int64),           # size of the ROI
+    ('x0', np.int64), ('y0', np.int64),         # Vertex0: top-left
+    ('x1', np.int64), ('y1', np.int64),         # Vertex1: bottom-right
+    ('enabled', np.bool_),
+    ('lwidth', np.int32),
+    ('lcolor', np.uint8, (3,)),
+    ('dirty', np.bool_),
+    ('exact', np.bool_),                        # defined by its vertexes, see add_vertexes()
+])
+
 class ImageROI():
     """A class to define a list of ROI rectangles of an image.
 
-    The list is implemented as a dictionary, e.g., { "Q1":roiRect, "C0":roiRect, ... }
-    The key of the element is a string to identify the ROI rectangle,
-    and the value of the element is an object of roiRect class.
+    The ROI rectangles are stored in a structured NumPy array (see roiRecord_Dtype) of
+    centers, sizes, vertexes and drawing properties, one record per rectangle in the order
+    they are added; a rectangle is identified by its name string, e.g., "Q1", "C0", ...
+    Boundary clamping, moving and resizing run vectorized over all rectangles,
+    following the same rules as roiRect.update().
 
     ...
     Attributes
     -----------
-    ROIs: {}
-        a dictionary to manage a list of ROI rectangle.
+    names: list
+        the names of the ROI rectangles, in the order of the records
     imgW, imgH: int
         the image size which is for boundary handling
 
@@ -261,15 +276,27 @@ class ImageROI():
     add(name:str, center:(x,y), size(w,h))
         create and add a rectangle to ROIs list
         if the named rectangle exists, update the center and size as specified
+    add_many(names:list, centers:(N,2), sizes:(N,2))
+        add (or update) a batch of rectangles at once
+    add_vertexes(names:list, vertexes:(N,4))
+        add (or update) a batch of rectangles with exact vertexes, which are never clamped
     delete(name:str)
-        remove a designated roiRect from the list
+        remove a designated ROI rectangle from the list
+    set_center(name, Xc, Yc), set_size(name, w, h)
+        move/resize the named rectangle
+    set_centers(centers, names=None), set_sizes(sizes, names=None), move(dx, dy, names=None)
+        move/resize a batch (or all) of rectangles at once
+    update(bounding=True)
+        re-calculate the vertexes of all rectangles
     get_vertex(name:str) -> (Vt, Vb)
         get vertexes (Vt: TopLeft, Vb:BottomRight) of the rectangle
     get_vertex_all() --> a list of [ [name:str, Vt:(x,y), Vb:(x,y) ], ...[] ]
         get vertexes of all rectangles
+    get_vertex_array() --> np.ndarray (N, 4)
+        get x0, y0, x1, y1 of all rectangles
     """
     def __init__(self, imgW, imgH):
-        """Initialize a dictionary acting as a control list of an image ROI rectangle.
+        """Initialize the record array acting as a control list of an image ROI rectangle.
 
         Arguments
         ------------
@@ -279,10 +306,84 @@ class ImageROI():
         ------------
         None
         """
-        self.ROIs = {}  # -- use Dictionary key="roiName", val=roiRect
+        self.names = []
+        self._index = {}    # -- key="roiName", val=index of the record
+        self._rects = np.zeros(16, roiRecord_Dtype)
         self.imgW = imgW
         self.imgH = imgH
-        #self.matImg = matImg.copy()
+
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def rects(self):
+        """The records of all ROI rectangles, a view of the structured array
+        """
+        return self._rects[:len(self.names)]
+
+
+    def _indexes(self, names):
+        """To get the record indexes of names, None for all
+        """
+        if names is None:
+            return slice(0, len(self.names))
+        return np.array([ self._index[name] for name in names ], dtype=np.intp)
+
+
+    def _reserve(self, count):
+        """To grow the record array to hold count records
+        """
+        if count > self._rects.size:
+            rects = np.zeros(max(count, self._rects.size * 2), roiRecord_Dtype)
+            rects[:len(self.names)] = self.rects
+            self._rects = rects
+
+
+    def _clamp(self, r, bounding=True):
+        """To re-calculate the vertexes of the records r, the vectorized version of roiRect.update()
+
+        The records added by add_vertexes() keep their vertexes.
+        """
+        if r['exact'].any():
+            free = ~r['exact']
+            sub = r[free]
+            self._clamp(sub, bounding)
+            r[free] = sub
+            r['dirty'] = False
+            return
+
+        halfW = r['W'] // 2
+        halfH = r['H'] // 2
+        if bounding == True:
+            for c, v0, v1, size, half, imgSize in (('Xc', 'x0', 'x1', 'W', halfW, self.imgW),
+                                                   ('Yc', 'y0', 'y1', 'H', halfH, self.imgH)):
+                center = r[c]
+                p0 = center - half
+                p1 = center + half
+                low = p0 < 0
+                high = ~low & (p1 > imgSize-1)
+
+                p0[low] = 0
+                p1[low] = r[size][low]
+                center[low] = half[low]
+
+                p1[high] = imgSize - 1
+                p0[high] = imgSize - r[size][high]
+                center[high] = imgSize - half[high]
+
+                r[c] = center
+                r[v0] = p0
+                r[v1] = p1
+        else:
+            r['x0'] = np.maximum(0, r['Xc'] - halfW)
+            r['y0'] = np.maximum(0, r['Yc'] - halfH)
+            r['x1'] = np.minimum(self.imgW, r['Xc'] + halfW)
+            r['y1'] = np.minimum(self.imgH, r['Yc'] + halfH)
+        r['dirty'] = False
 
 
     def add(self, name, center, size):
@@ -302,16 +403,78 @@ class ImageROI():
         list
             a list of the format: [name:str, Vt:(x,y), Vb:(x,y))], e.g., ["Q1", (10, 10), (30,30)]
         """
-        if name not in self.ROIs:
-            rect = roiRect(self.imgW, self.imgH, Xc=center[0], Yc=center[1], W=size[0], H=size[1])
-            self.ROIs.setdefault(name, rect)
-        else:
-            rect = self.ROIs[name]
-            rect.set_center(center[0], center[1])
-            rect.set_size(size[0], size[1])
+        self.add_many([name], [center], [size])
+        return self.get_vertex(name)
+
+
+    def add_many(self, names, centers, sizes):
+        """add (or update) a batch of rectangles to ROI list at once
+
+        Arguments
+        -------------
+        names: list of str
+            the string IDs of the rectangles
+        centers: array-like (N, 2)
+            the center coordinates (x, y) of the rectangles
+        sizes: array-like (N, 2)
+            the sizes (w, h) of the rectangles
+        """
+        names = list(names)
+        centers = np.asarray(centers, dtype=np.int64).reshape(-1, 2)
+        sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+
+        idx = self._add_records(names)
+        r = self._rects[idx]
+        r['Xc'], r['Yc'] = centers[:, 0], centers[:, 1]
+        r['W'], r['H'] = sizes[:, 0], sizes[:, 1]
+        r['exact'] = False
+        self._clamp(r)
+        self._rects[idx] = r
+
+
+    def add_vertexes(self, names, vertexes):
+        """add (or update) a batch of rectangles given by their vertexes
+
+        Unlike add_many(), the vertexes are kept exactly: they are not rounded to an even size
+        around a center nor clamped by update(), e.g., the cells of a grid which tile the whole image.
+        Moving or resizing such a rectangle makes it a center/size rectangle again.
+
+        Arguments
+        -------------
+        names: list of str
+            the string IDs of the rectangles
+        vertexes: array-like (N, 4)
+            x0, y0, x1, y1 of the rectangles, i.e., the sub-image img[y0:y1, x0:x1]
+        """
+        names = list(names)
+        vertexes = np.asarray(vertexes, dtype=np.int64).reshape(-1, 4)
+
+        idx = self._add_records(names)
+        r = self._rects[idx]
+        r['x0'], r['y0'], r['x1'], r['y1'] = vertexes.T
+        r['Xc'], r['Yc'] = (r['x0'] + r['x1']) // 2, (r['y0'] + r['y1']) // 2
+        r['W'], r['H'] = r['x1'] - r['x0'], r['y1'] - r['y0']
+        r['exact'] = True
+        r['dirty'] = False
+        self._rects[idx] = r
+
+
+    def _add_records(self, names):
+        """To create the records of the names not in the list yet, and get the indexes of all names
+        """
+        newNames = [ name for name in dict.fromkeys(names) if name not in self._index ]
+        n = len(self.names)
+        self._reserve(n + len(newNames))
+        self._rects[n:n+len(newNames)] = np.zeros(1, roiRecord_Dtype)
+        new = self._rects[n:n+len(newNames)]
+        new['enabled'] = True
+        new['lwidth'] = 2
+        new['lcolor'] = (0, 255, 0)
+        for i, name in enumerate(newNames):
+            self._index[name] = n + i
+        self.names.extend(newNames)
+        return self._indexes(names)
 
-        rect.update()
-        return [ name, rect.Vertex0, rect.Vertex1 ]
 
     def delete(self, name):
         """Remove the named ROI from the list
@@ -325,21 +488,69 @@ class ImageROI():
         -------------
         None
         """
-        self.ROIs.pop(name)
+        i = self._index.pop(name)
+        n = len(self.names)
+        self._rects[i:n-1] = self._rects[i+1:n]
+        self.names.pop(i)
+        for k in self.names[i:]:
+            self._index[k] -= 1
 
     def set_center(self, name, Xc, Yc):
         """Set coordinate (x, y) of the named ROI center
         """
-        if name in self.ROIs:
-            roi_rect = self.ROIs[name]
-            roi_rect.set_center(Xc, Yc)
+        if name in self._index:
+            r = self._rects[self._index[name]]
+            r['Xc'], r['Yc'], r['dirty'], r['exact'] = Xc, Yc, True, False
 
     def set_size(self, name, w, h):
         """Set size (w, h) of the named ROI
         """
-        if name in self.ROIs:
-            roi_rect = self.ROIs[name]
-            roi_rect.set_size(w, h)
+        if name in self._index:
+            r = self._rects[self._index[name]]
+            r['W'], r['H'], r['dirty'], r['exact'] = w, h, True, False
+
+    def set_centers(self, centers, names=None):
+        """Set coordinates (x, y) of the ROI centers at once
+
+        Arguments
+        -------------
+        centers: array-like (N, 2) or (x, y)
+            the center of each rectangle, or one center for all
+        names: list of str
+            the rectangles to move, None for all
+        """
+        idx = self._indexes(names)
+        centers = np.asarray(centers, dtype=np.int64)
+        self._rects['Xc'][idx] = centers[..., 0]
+        self._rects['Yc'][idx] = centers[..., 1]
+        self._rects['dirty'][idx] = True
+        self._rects['exact'][idx] = False
+
+    def set_sizes(self, sizes, names=None):
+        """Set sizes (w, h) of the ROIs at once
+
+        Arguments
+        -------------
+        sizes: array-like (N, 2) or (w, h)
+            the size of each rectangle, or one size for all
+        names: list of str
+            the rectangles to resize, None for all
+        """
+        idx = self._indexes(names)
+        sizes = np.asarray(sizes, dtype=np.int64)
+        self._rects['W'][idx] = sizes[..., 0]
+        self._rects['H'][idx] = sizes[..., 1]
+        self._rects['dirty'][idx] = True
+        self._rects['exact'][idx] = False
+
+    def move(self, dx, dy, names=None):
+        """Move the ROIs by (dx, dy) at once, names=None for all
+        """
+        idx = self._indexes(names)
+        self._rects['Xc'][idx] += dx
+        self._rects['Yc'][idx] += dy
+        self._rects['dirty'][idx] = True
+        self._rects['exact'][idx] = False
 
     def set_property(self, name, **kwargs):
         """Set properities of the named ROI :
@@ -347,15 +558,11 @@ class ImageROI():
                 lwidth:     width of rectangle line
                 lcolor:     the color to draw rectangle (R, G, B)
         """
-        if name in self.ROIs:
-            roi_rect = self.ROIs[name]
+        if name in self._index:
+            r = self._rects[self._index[name]]
             for argkey, argval in kwargs.items():
-                if argkey == 'enabled':
-                    roi_rect.set_property[argkey] = argval   # True or False
-                elif argkey == 'lwidth':
-                    roi_rect.set_property[argkey] = argval   # line width
-                elif argkey == 'lcolor':
-                    roi_rect.set_property[argkey] = argval   # line color
+                if argkey in ('enabled', 'lwidth', 'lcolor'):
+                    r[argkey] = argval
                 else:
                     pass
 
@@ -363,25 +570,37 @@ class ImageROI():
         """To query property of the named ROI with following key:
                 'enabled', 'lwidth', 'lcolor'
         """
-        if name in self.ROIs:
-            roi_rect = self.ROIs[name]
-            return roi_rect.get_property[protKey]
+        if name in self._index:
+            val = self._rects[self._index[name]][protKey]
+            return tuple(val.tolist()) if protKey == 'lcolor' else val.item()
         else:
             return None
 
-    def update(self):
+    def update(self, bounding=True):
         """To re-calculate the ROI Vertex0 and Vertex1 of all ROI rectangles
+
+        Arguments
+        ------------
+        bounding: boolean
+            if True, the centers of ROIs are re-calculated to align at boundary, see roiRect.update()
         """
-        for k in self.ROIs:
-            self.ROIs[k].update()
+        r = self.rects
+        self._clamp(r, bounding)
+
+    def _draw_index(self, i, cv_img):
+        r = self._rects[i]
+        if r['dirty']:
+            self._clamp(self._rects[i:i+1])
+        if r['enabled']:
+            cv2.rectangle(cv_img, (int(r['x0']), int(r['y0'])), (int(r['x1']), int(r['y1'])),
+                          tuple(r['lcolor'].tolist()), int(r['lwidth']))
 
     def draw(self, nameID, cv_img):
         """To draw the specified ROI rectangle on the image
             (Debug purpose)
         """
-        # self.matImg = self.matOrigin.copy()
-        if nameID in self.ROIs:
-            self.ROIs[nameID].draw(cv_img)
+        if nameID in self._index:
+            self._draw_index(self._index[nameID], cv_img)
 
     def draw_all(self, cv_img):
         """Draw all ROI rectangle on the image
@@ -395,19 +614,27 @@ class ImageROI():
         -----------
         None
         """
-        for k in self.ROIs:
-            self.ROIs[k].draw(cv_img)
+        for i in range(len(self.names)):
+            self._draw_index(i, cv_img)
 
     def show(self, cv_window, cv_img):
         """To display the image with ROIs imprinted]
             (Debug purpose)
         """
-        #self.matImg = self.matOrigin.copy()
-        # for k in self.ROIs:
-        #     self.ROIs[k].show(self.winName, self.matImg)
         self.draw_all(cv_img) #-- have all rectabgle to be drawn on self.matImg
         cv2.imshow(cv_window, cv_img)
 
+    def get_vertex_array(self):
+        """get vertexes of all rectangles as an array
+
+        Returns
+        -------------
+        np.ndarray (N, 4) int64
+            x0, y0, x1, y1 of each rectangle in the order of self.names
+        """
+        r = self.rects
+        return np.stack((r['x0'], r['y0'], r['x1'], r['y1']), axis=-1)
+
     def get_vertex_all(self):
         """get vertex of all rectangles
 
@@ -420,14 +647,7 @@ class ImageROI():
         list
             a list of the list [name:str, Vt:(x,y), Vb:(x,y))], e.g., [ ["Q1", (10, 10), (30,30)], [], ..., [] ]
         """
-        allp = []
-        for k in self.ROIs:
-            p = [ k ]
-            p.append(self.ROIs[k].Vertex0)
-            p.append(self.ROIs[k].Vertex1)
-            #print(p)
-            allp.append(p)
-        return allp
+        return [ [name, (x0, y0), (x1, y1)] for name, (x0, y0, x1, y1) in zip(self.names, self.get_vertex_array().tolist()) ]
 
     def get_vertex(self, name):
         """get vertex of the rectangle of the ID name:str
@@ -442,12 +662,9 @@ class ImageROI():
         list
             a list of the format: [name:str, Vt:(x,y), Vb:(x,y))], e.g., ["Q1", (10, 10), (30,30)]
         """
-        if name in self.ROIs:
-            p = [name]
-            p.append(self.ROIs[name].Vertex0)
-            p.append(self.ROIs[name].Vertex1)
-            #print(p)
-        return p
+        r = self._rects[self._index[name]]
+        return [name, (int(r['x0']), int(r['y0'])), (int(r['x1']), int(r['y1']))]
+
 
 
 ###########################################################
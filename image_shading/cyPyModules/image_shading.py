@@ -11,6 +11,95 @@ else:
     import cyPyModules.image_ROI as ROI
 
 
+#--------------------------------------
+# Integral image (summed-area table)
+#--------------------------------------
+def build_integral_image(cvSrcImg):
+    """To build the integral image of the B/G/R/Y channels of a BGR image
+
+    8-bit images use 32-bit integral images with wrap-around, which keep the sum of any
+    rectangle exact as long as it is below 2^32 (i.e. up to ~16.8M pixels of 8-bit data);
+    integral_means() handles the larger rectangles directly. Other depths use float64.
+
+    The planes are built one at a time into the result, so the only temporary is one
+    plane of the source image (48MB for a 48MP image).
+
+    Arguments
+    --------------
+    cvSrcImg: cv Mat
+        BGR source image, (H, W, 3)
+
+    Returns
+    --------------
+    np.ndarray (4, H+1, W+1)
+        planes are in the order of B, G, R, Y
+    """
+    imgH, imgW = cvSrcImg.shape[:2]
+    is8bit = (cvSrcImg.dtype == np.uint8)
+    integral = np.empty((4, imgH+1, imgW+1), np.int32 if is8bit else np.float64)
+    for c in range(4):
+        if c < 3:
+            plane = np.ascontiguousarray(cvSrcImg[:,:,c])
+        else:
+            plane = cv2.cvtColor(cvSrcImg, cv2.COLOR_BGR2GRAY)
+        cv2.integral(plane, sum=integral[c], sdepth=cv2.CV_32S if is8bit else cv2.CV_64F)
+        del plane
+    return integral.view(np.uint32) if is8bit else integral
+
+
+def integral_means(integral, vertexes, cvSrcImg=None):
+    """To get the B/G/R/Y means of a list of rectangles from an integral image
+
+    Arguments
+    --------------
+    integral: np.ndarray (4, H+1, W+1)
+        the integral image from build_integral_image()
+    vertexes: np.ndarray (N, 4)
+        x0, y0, x1, y1 of each rectangle, i.e., the sub-image img[y0:y1, x0:x1]
+    cvSrcImg: cv Mat
+        the source image, used for rectangles too large for a 32-bit integral image
+
+    Returns
+    --------------
+    np.ndarray (N, 4)
+        the means of B, G, R, Y of each rectangle
+    """
+    vertexes = np.asarray(vertexes, dtype=np.intp).reshape(-1, 4)
+    x0, y0, x1, y1 = vertexes.T
+    area = (x1 - x0) * (y1 - y0)
+    sums = integral[:, y1, x1] - integral[:, y0, x1] - integral[:, y1, x0] + integral[:, y0, x0]
+    means = sums.T / np.maximum(area, 1)[:, None]
+
+    if integral.dtype == np.uint32:
+        #-- sum of 255 * area may wrap around 2^32
+        for i in np.nonzero(area * 255 >= (1 << 32))[0]:
+            if cvSrcImg is None:
+                raise ValueError("rectangle {} is too large for a 32-bit integral image".format(vertexes[i]))
+            sub = cvSrcImg[y0[i]:y1[i], x0[i]:x1[i]]
+            means[i, :3] = sub.reshape(-1, 3).mean(axis=0)
+            means[i, 3] = cv2.cvtColor(sub, cv2.COLOR_BGR2GRAY).mean()
+    return means
+
+
+#-- channels of the grid shading map, see ImageShading.update_grid()
+gridShading_Channels = ('Y', 'R', 'G', 'B', 'Y/Ymax', 'R/G', 'B/G')
+
+def grid_vertexes(imgW, imgH, cols, rows):
+    """To divide an image into cols x rows cells which tile the whole image
+
+    Returns
+    --------------
+    np.ndarray (rows*cols, 4)
+        x0, y0, x1, y1 of each cell in row-major order
+    """
+    xs = np.linspace(0, imgW, cols+1).astype(np.intp)
+    ys = np.linspace(0, imgH, rows+1).astype(np.intp)
+    x0, y0 = np.meshgrid(xs[:-1], ys[:-1])
+    x1, y1 = np.meshgrid(xs[1:], ys[1:])
+    return np.stack((x0, y0, x1, y1), axis=-1).reshape(-1, 4)
+
+
+
 #--------------------------------------
 # Class: ImageShading
 #--------------------------------------
@@ -31,6 +120,11 @@ class ImageShading():
     Methods
     ---------------
     set_property()
+    update(cvSrcImg, version=0)
+    set_grid(cols, rows)
+    update_grid(cvSrcImg, version=0) --> np.ndarray (rows, cols, 7)
+    get_integral_image(cvSrcImg, version=0)
+    clear_integral_image()
     """
     def __init__(self, imgW, imgH):
         """Initialize all shading rectangles
@@ -56,6 +150,16 @@ class ImageShading():
         self.gImgH = imgH
         self.gShadingINFO = {}
 
+        #-- grid shading map, see set_grid()
+        self.gGridRECT = None
+        self.gGridSize = (0, 0)
+        self.gShadingGRID = None
+
+        #-- integral image of the last source image, the image itself and its version
+        self._integral = None
+        self._integralSrc = None
+        self._integralVersion = None
+
         #-- derive image center coordinate
         self.gImgXc = int(imgW / 2)
         self.gImgYc = int(imgH / 2)
@@ -217,17 +321,22 @@ class ImageShading():
 
 
 
-    def _calculate_all_shadings(self, cvSrcImg):
+    def _calculate_all_shadings(self, cvSrcImg, version=0):
         """To calculate the luma/chroma shading of each shading rectangles.
 
         The calculated result is saved in self.gShadingINFO which is a dictionary of the following format:
             e.g., { 'Co':shadingDict, 'Q1':shadingDict, ... }
                 where shadingDict specifies the Luma/Chroma and Vertexes of the named shading rectangle
 
+        The Y/R/G/B means of all rectangles are looked up at once from the integral image of
+        cvSrcImg, each rectangle costs O(1) regardless of its size.
+
         Arguments
         --------------
         cvSrcImg: cv Mat
             the source image to get sub-image of each shading rectangle
+        version: integer
+            see get_integral_image()
         """
         #-- clear the shading info list
         self.gShadingINFO.clear()
@@ -236,57 +345,67 @@ class ImageShading():
         allRect = self.gShadingRECT.get_vertex_all()
         #print(allRect)
 
-        #-- calculate Y, R/G/B of each sub-image
-        for rect in allRect:
-            nameID = rect[0]
-            VPt = rect[1]
-            VPb = rect[2]
-
-            subimg = cvSrcImg[VPt[1]:VPb[1], VPt[0]:VPb[0]]
-            subGray = cv2.cvtColor(subimg, cv2.COLOR_BGR2GRAY)
-
-            Bmean = int(np.mean(subimg[:,:,0]))
-            Gmean = int(np.mean(subimg[:,:,1]))
-            Rmean = int(np.mean(subimg[:,:,2]))
-            Ymean = int(np.mean(subGray))
-
-            Rratio = Rmean/Gmean
-            Bratio = Bmean/Gmean
-
-            if False:
-                #print(nameID, ": shape= ", subGray.shape, shading rect 的 an= ", Ymean, " Gmean= ", Gmean)
-                Ytext = "Y= "+str(Ymean)
-                RGtext = "R/G= "+ "{:.2f}%".format(Rratio)
-                BGtext = "B/G= "+ "{:.2f}%".format(Bratio)
-                print(Ytext, ' ', RGtext, ' ', BGtext)
-
-                text = Ytext
-                fface = cv2.FONT_HERSHEY_SIMPLEX
-                fscale=1
-                fthick=2
-                ((tw, th),tpad) = cv2.getTextSize(text=Ytext, fontFace=fface, fontScale=fscale, thickness=fthick)
-                cv2.putText(cv_img, text, (VPt[0], VPb[1]+(th+tpad*2)), fface, fscale, (0, 0, 200), fthick, 255)
-                #text = nameID + ": Y= " + str(Ymean) + " (R,G,B)= " + str(Rmean) + ", " + str(Gmean) + ", " + str(Bmean)
-                #print(text, ' @ ', (VPt[0], VPb[1]+10))
-                #font = cv2.FONT_HERSHEY_SIMPLEX
-                #fontScale=1
-                #fontThinckness=1
-                #cv2.putText(cv_img, text, (VPt[0], VPb[1]+20), font, 1, (0, 0, 200), 2, 255)
-                #cv2.putText(gImgWC, text, (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 200), 2, 255)
+        #-- calculate Y, R/G/B of all sub-images
+        integral = self.get_integral_image(cvSrcImg, version)
+        allMeans = integral_means(integral, self.gShadingRECT.get_vertex_array(), cvSrcImg)
+
+        for rect, means in zip(allRect, allMeans):
+            nameID, VPt, VPb = rect
+            Bmean, Gmean, Rmean, Ymean = [ int(m) for m in means ]
             shadingDict = { "Y":Ymean, "R":Rmean, "G":Gmean, "B":Bmean, "Vt":VPt, "Vb":VPb }
             self.gShadingINFO.setdefault(nameID, shadingDict)
 
 
-    def update(self, cvSrcImg):
+    def get_integral_image(self, cvSrcImg, version=0):
+        """To get the integral image of cvSrcImg, rebuilt only for another image or version.
+
+        The cache is keyed by the image object itself, so checking it costs nothing even at 48MP:
+        pass the same image (e.g., gImgSrc rather than gImgSrc.copy()) to hit the cache. A caller
+        which modifies the pixels in place bumps version to rebuild it.
+
+        Arguments
+        --------------
+        cvSrcImg: cv2 Mat
+            BGR source image
+        version: integer
+            the version of the pixels of cvSrcImg
+
+        Returns
+        --------------
+        np.ndarray (4, H+1, W+1)
+            see build_integral_image()
+        """
+        if self._integral is None or cvSrcImg is not self._integralSrc or version != self._integralVersion:
+            #-- release the old integral image before building the new one
+            self.clear_integral_image()
+            self._integral = build_integral_image(cvSrcImg)
+            self._integralSrc = cvSrcImg
+            self._integralVersion = version
+        return self._integral
+
+
+    def clear_integral_image(self):
+        """To release the cached integral image (16 bytes per pixel) and its source image
+        """
+        self._integral = None
+        self._integralSrc = None
+        self._integralVersion = None
+
+
+    def update(self, cvSrcImg, version=0):
         """To update vertexes and Y, R/G/B values of all shading rectangles
 
         Call this method to update vertexes and sub-image values if the properties are changed.
+        The integral image of cvSrcImg is cached, so calling it again with the same image
+        (e.g., on a slider move) only re-measures the shading rectangles.
 
         Arguments
         --------------
         cvSrcImg: cv2 Mat
             The source image which is used to get sub-image of each shading rectangle to calculate
             the luma/chroma information.
+        version: integer
+            see get_integral_image()
 
         Returns
         -------------
@@ -303,10 +422,71 @@ class ImageShading():
         self.gShadingRECT.update()
 
         #-- Recalculate Y, R/G/B values of each shading rectangles
-        self._calculate_all_shadings(cvSrcImg)
+        self._calculate_all_shadings(cvSrcImg, version)
 
         return self.gShadingINFO
 
+    def set_grid(self, cols, rows):
+        """To divide the image into a cols x rows grid of shading rectangles for the full-field shading map.
+
+        The cells, which tile the whole image, are added to self.gGridRECT (an ImageROI) with their exact
+        vertexes, named 'G<row>_<col>', e.g., 'G0_0' is the top-left cell. update_grid() measures the
+        same rectangles which are drawn.
+
+        Arguments
+        --------------
+        cols, rows: integer
+            number of cells in horizontal and vertical
+        """
+        if cols < 1 or rows < 1:
+            raise ValueError("invalid grid size: {}x{}".format(cols, rows))
+
+        self.gGridRECT = ROI.ImageROI(self.gImgW, self.gImgH)
+        self.gGridSize = (cols, rows)
+        names = [ 'G{}_{}'.format(r, c) for r in range(rows) for c in range(cols) ]
+        self.gGridRECT.add_vertexes(names, grid_vertexes(self.gImgW, self.gImgH, cols, rows))
+
+
+    def update_grid(self, cvSrcImg, version=0):
+        """To measure the full-field shading map over the grid of set_grid().
+
+        All cells are measured at once from the (cached) integral image of cvSrcImg.
+
+        Arguments
+        --------------
+        cvSrcImg: cv2 Mat
+            The source image, BGR
+        version: integer
+            see get_integral_image()
+
+        Returns
+        -------------
+        gShadingGRID: np.ndarray (rows, cols, 7) float32
+            the channels are listed in gridShading_Channels:
+            Y, R, G, B (means of each cell), Y/Ymax (Y relative to the brightest cell), R/G, B/G
+        """
+        if self.gGridRECT is None:
+            raise ValueError("grid is not set, call set_grid() first")
+
+        cols, rows = self.gGridSize
+        means = integral_means(self.get_integral_image(cvSrcImg, version), self.gGridRECT.get_vertex_array(), cvSrcImg).reshape(rows, cols, 4)
+
+        B, G, R, Y = [ means[..., c] for c in range(4) ]
+        grid = np.empty((rows, cols, len(gridShading_Channels)), np.float32)
+        grid[..., 0] = Y
+        grid[..., 1] = R
+        grid[..., 2] = G
+        grid[..., 3] = B
+        with np.errstate(divide='ignore', invalid='ignore'):
+            grid[..., 4] = Y / Y.max()
+            grid[..., 5] = R / G
+            grid[..., 6] = B / G
+        np.nan_to_num(grid, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+        self.gShadingGRID = grid
+        return grid
+
+
     def show(self, cv_win, cv_img):
         """To show all rectangles. (elaborate how to use gShadingINFO)
 
@@ -410,8 +590,9 @@ def cbfn_Update():
     gImageShading.set_property(d_field=scl_fieldDiag.get())
     gImageShading.set_property(hv_field=scl_fieldHV.get())
 
+    #-- measure on gImgSrc itself to reuse its cached integral image, draw on a copy
+    gImageShading.update(gImgSrc)
     gImgWC = gImgSrc.copy()
-    gImageShading.update(gImgWC)
 
     gImageShading.show(gSrcImgName, gImgWC)
 
@@ -0,0 +1,249 @@
+#!/usr/bin/python
+
+import os, sys, time, glob, json, csv
+
+import cv2
+
+import cyPyModules.image_shading as IS
+import cyPyModules.shading_test_util as shadingUTIL
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'cyModules'))
+import cy_BatchRunner as batchRunner
+
+
+#-- the shading rectangles tested against the center one
+shadingRect_Groups = {
+    'diag'  : ['Q1', 'Q2', 'Q3', 'Q4'],
+    'hori'  : ['Hr', 'Hl'],
+    'vert'  : ['Vb', 'Vt'],
+}
+
+imageFile_Patterns = ('*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tif', '*.tiff')
+manifestFile_Exts = ('.txt', '.lst', '.json')
+
+report_Fields = ['file', 'width', 'height', 'roi', 'Y', 'R', 'G', 'B', 'Y/Co', 'Y/mean', 'R/G', 'B/G',
+                 'luma_pass', 'ydev_pass', 'chroma_pass', 'pass', 'error']
+
+
+###########################################################
+# Collect image files
+###########################################################
+def is_batch_target(target):
+    """To check if target names several images: a directory, a glob pattern, or a manifest
+    """
+    return os.path.isdir(target) or glob.has_magic(target) or \
+           os.path.splitext(target)[1].lower() in manifestFile_Exts
+
+
+def find_image_files(target, patterns=imageFile_Patterns):
+    """To list the image files of a directory, a glob pattern, a manifest, or a single image
+
+    Arguments
+    ---------------
+    target: string
+        * a directory, searched with patterns
+        * a glob, e.g., 'samples/*_lsc.jpg'
+        * a manifest (.txt/.lst: one image per line, '#' for comments; .json: a list of images),
+          relative paths are relative to the manifest
+        * an image file
+    patterns: list of string
+        the file patterns used when target is a directory
+
+    Returns
+    ---------------
+    list of file names; the order of the manifest is kept, others are sorted
+    """
+    ext = os.path.splitext(target)[1].lower()
+    if ext in manifestFile_Exts and os.path.isfile(target):
+        with open(target, 'r') as f:
+            if ext == '.json':
+                entries = json.load(f)
+            else:
+                entries = [ line.strip() for line in f ]
+        baseDir = os.path.dirname(os.path.abspath(target))
+        return [ os.path.join(baseDir, e) for e in entries if e and not e.startswith('#') ]
+
+    return batchRunner.find_files(target, patterns)
+
+
+
+###########################################################
+# Test one image
+###########################################################
+#-- ImageShading instances of the process, keyed by image size and the rectangle settings
+_shadingCache = {}
+
+def get_image_shading(imgW, imgH, conf):
+    """To get the ImageShading of an image size, it is created once per process, size and rectangle settings
+
+    Arguments
+    ---------------
+    imgW, imgH: integer
+        the size of the image
+    conf: dict
+        'winsize', 'dfield', 'hvfield' in ratio (0.0 ~ 1.0)
+    """
+    key = (imgW, imgH, conf['winsize'], conf['dfield'], conf['hvfield'])
+    shading = _shadingCache.get(key)
+    if shading is None:
+        shading = IS.ImageShading(imgW, imgH)
+        hvEnabled = (conf['hvfield'] > 0.0)
+        shading.set_property(h_enable=hvEnabled, v_enable=hvEnabled)
+        shading.set_property(c_size_ratio=conf['winsize'], e_size_ratio=conf['winsize'])
+        shading.set_property(d_field=conf['dfield'], hv_field=conf['hvfield'])
+        _shadingCache[key] = shading
+    return shading
+
+
+def test_image_file(imgFile, conf):
+    """To run the shading test of one image file.
+
+    Arguments
+    ---------------
+    imgFile: string
+        the image file
+    conf: dict
+        * 'winsize', 'dfield', 'hvfield': the shading rectangles, see get_image_shading()
+        * 'lumaC2C', 'lumaDev', 'chromaDev': the spec in ratio, 0 to skip the luma/chroma check
+        * 'ydevFail': if True, a yDev (Y/mean) out of lumaDev fails the image; by default it is
+          only reported ('ydev_pass'), as the GUI test does
+        * 'saveimg', 'outdir': to save the result image to outdir (the folder of imgFile if empty)
+
+    Returns
+    ---------------
+    dict
+        'file', 'width', 'height', 'seconds', 'pass', 'error' (None if succeeded),
+        and 'rois' of { rect_name:result } of shading_test_util.evaluate_shading(), plus 'pass' of each
+    """
+    t0 = time.perf_counter()
+    result = { 'file': imgFile, 'width': 0, 'height': 0, 'seconds': 0.0, 'pass': False, 'rois': {}, 'error': None }
+    try:
+        img = cv2.imread(imgFile)
+        if img is None:
+            raise IOError("failed to load image")
+        imgH, imgW = img.shape[:2]
+        result['width'], result['height'] = imgW, imgH
+
+        shading = get_image_shading(imgW, imgH, conf)
+        shadingINFO = shading.update(img)
+        #-- do not keep the integral image (16 bytes per pixel) of this image alive in the worker
+        shading.clear_integral_image()
+
+        centerY = shadingINFO['Co'].get('Y')
+        isChkLuma = (conf['lumaC2C'] > 0)
+        isChkColor = (conf['chromaDev'] > 0)
+        spec = [centerY, conf['lumaC2C'], conf['lumaDev'], conf['chromaDev'], isChkLuma, isChkColor]
+
+        rectGroups = [shadingRect_Groups['diag']]
+        if conf['hvfield'] > 0.0:
+            rectGroups += [shadingRect_Groups['hori'], shadingRect_Groups['vert']]
+
+        for rect_list in rectGroups:
+            if conf.get('saveimg'):
+                result['rois'].update(shadingUTIL.test_shading(img, shadingINFO, rect_list, spec))
+            else:
+                result['rois'].update(shadingUTIL.evaluate_shading(shadingINFO, rect_list, spec))
+
+        for r in result['rois'].values():
+            r['pass'] = r['luma_pass'] and r['chroma_pass'] and (r['ydev_pass'] or not conf.get('ydevFail'))
+        result['pass'] = all(r['pass'] for r in result['rois'].values())
+
+        if conf.get('saveimg'):
+            base, ext = os.path.splitext(os.path.basename(imgFile))
+            outDir = conf.get('outdir') or os.path.dirname(os.path.abspath(imgFile))
+            os.makedirs(outDir, exist_ok=True)
+            if not cv2.imwrite(os.path.join(outDir, base + '_shading' + ext), img):
+                raise IOError("failed to save the result image")
+    except Exception as e:
+        result['error'] = "{}: {}".format(type(e).__name__, e)
+
+    result['seconds'] = time.perf_counter() - t0
+    return result
+
+
+
+###########################################################
+# Batch test over a process pool
+###########################################################
+def batch_test(files, conf, jobs=None, verbose=True):
+    """To run the shading test of image files in parallel with a ProcessPoolExecutor.
+
+    Files are sent to the workers in chunks, so each worker reuses its ImageShading
+    (and the imported modules) across many images of the same size.
+
+    Arguments
+    ---------------
+    files: list of string
+        the image files
+    conf: dict
+        see test_image_file()
+    jobs: integer
+        number of worker processes, None for os.cpu_count(), 1 to run in this process
+    verbose: boolean
+        if True, print the result of each file and the overall images/s
+
+    Returns
+    ---------------
+    list of result dict of test_image_file(), in the order of files
+    """
+    t0 = time.perf_counter()
+    results = batchRunner.run_batch(test_image_file, files, [conf] * len(files), jobs=jobs, maxChunk=32,
+                                    progress=_print_result if verbose else None)
+
+    if verbose:
+        dt = time.perf_counter() - t0
+        nFail = sum(1 for r in results if not r['pass'])
+        print("--- {} images in {:.2f} s, {:.2f} images/s, {} failed".format(
+                len(files), dt, len(files) / dt if dt > 0 else 0.0, nFail))
+    return results
+
+
+def _print_result(n, total, result):
+    if result['error']:
+        print("[{}/{}] {}: ERROR, {}".format(n, total, result['file'], result['error']))
+    else:
+        print("[{}/{}] {}: {}, {:.3f} s".format(n, total, result['file'],
+                'PASS' if result['pass'] else 'FAIL', result['seconds']))
+
+
+
+###########################################################
+# Report
+###########################################################
+def report_rows(results):
+    """To flatten the results to report rows, one row per shading rectangle (one per failed image)
+    """
+    rows = []
+    for res in results:
+        base = { 'file': res['file'], 'width': res['width'], 'height': res['height'],
+                 'pass': res['pass'], 'error': res['error'] or '' }
+        if not res['rois']:
+            rows.append(base)
+            continue
+        for name, r in res['rois'].items():
+            row = dict(base)
+            row.update({ 'roi': name, 'Y': r['Y'], 'R': r['R'], 'G': r['G'], 'B': r['B'],
+                         'Y/Co': round(r['yC2C'], 4), 'Y/mean': round(r['yDev'], 4),
+                         'R/G': round(r['r2g'], 4), 'B/G': round(r['b2g'], 4),
+                         'luma_pass': r['luma_pass'], 'ydev_pass': r['ydev_pass'],
+                         'chroma_pass': r['chroma_pass'], 'pass': r['pass'] })
+            rows.append(row)
+    return rows
+
+
+def write_report(results, reportFile):
+    """To write the results to a CSV (one row per shading rectangle) or JSON (one entry per image) report
+
+    The format is chosen by the extension of reportFile, .json for JSON, otherwise CSV.
+    """
+    reportDir = os.path.dirname(os.path.abspath(reportFile))
+    os.makedirs(reportDir, exist_ok=True)
+
+    if reportFile.lower().endswith('.json'):
+        with open(reportFile, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        with open(reportFile, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=report_Fields)
+            writer.writeheader()
+            writer.writerows(report_rows(results))
@@ -24,44 +24,37 @@ dprint = DP.DebugPrint('scfunc')
 # Function : cbfn_Update()
 ###########################################################
 
-def test_shading(cv_img, shadingINFO, rect_list, spec):
-    """
+def evaluate_shading(shadingINFO, rect_list, spec):
+    """To evaluate the luma/chroma shading of the shading rectangles against the spec
+
+    Arguments
+    --------------
+    shadingINFO: dict
+        from ImageShading.update()
+    rect_list: list
+        names of the shading rectangles to evaluate, e.g., ['Q1', 'Q2', 'Q3', 'Q4']
     spec: list
         [centerY, lumaSpecRatioMin, lumaSpecDev, colorSpecDev, chkLuma, chkColor]
-    """
-    maxRect, minRect = [ '' for _ in range(2)]
-    maxY = minY = 0
-    rectY = []
-    for k in rect_list:
-        rect = shadingINFO[k]
-        # Vt = rect.get('Vt')
-        # Vb = rect.get('Vb')
-        _Y = rect['Y']
-        rectY.append(_Y)
-        if _Y > maxY:
-            maxY = _Y
-            maxRect = k
-        elif _Y < minY:
-            minY = _Y
-            minRect = k
-        else:
-            pass
-    meanRectY = sum(rectY)/len(rectY)
 
+    Returns
+    --------------
+    dict
+        { rect_name:result, } where result is a dictionary of
+        'Y', 'R', 'G', 'B', 'yC2C' (Y/centerY), 'yDev' (Y/mean Y of rect_list), 'r2g', 'b2g',
+        'luma_pass', 'ydev_pass', 'chroma_pass'
+    """
     centerY, specLumaMin, specLumaDev, specColorDev, chkLuma, chkColor = spec
-    dprint.info('SPEC: ', spec)
+    meanRectY = sum(shadingINFO[k]['Y'] for k in rect_list)/len(rect_list)
+
+    results = {}
     for k in rect_list:
         rect = shadingINFO[k]
-        Vt = rect.get('Vt')
-        Vb = rect.get('Vb')
         _Y, _R, _G, _B = [rect[x] for x in ['Y', 'R', 'G', 'B']]
-        dprint.info(k, ': ', _Y, ', ', _R, ', ', _G, ', ', _B)
-        yC2C = _Y/centerY
-        yDev = _Y/meanRectY
-        r2g = _R/_G
-        b2g = _B/_G
+        yC2C = _Y/centerY if centerY else 0.0
+        yDev = _Y/meanRectY if meanRectY else 0.0
+        r2g = _R/_G if _G else 0.0
+        b2g = _B/_G if _G else 0.0
 
-        dprint.info(yC2C, ' ', yDev, ' ', r2g, ' ', b2g)
         is_pass = True
         yDev_pass = True
         chroma_pass = True
@@ -71,7 +64,6 @@ def test_shading(cv_img, shadingINFO, rect_list, spec):
                 is_pass = False
             #--- Luma corner to cornerMean deviation
             if yDev > (1.0+specLumaDev) or yDev < (1.0-specLumaDev):
-                # is_pass = False
                 yDev_pass = False
 
         if chkColor:
@@ -82,6 +74,36 @@ def test_shading(cv_img, shadingINFO, rect_list, spec):
             if abs(b2g-1.0) > specColorDev:
                 chroma_pass = False
 
+        results[k] = { 'Y':_Y, 'R':_R, 'G':_G, 'B':_B, 'yC2C':yC2C, 'yDev':yDev, 'r2g':r2g, 'b2g':b2g,
+                       'luma_pass':is_pass, 'ydev_pass':yDev_pass, 'chroma_pass':chroma_pass }
+    return results
+
+
+def test_shading(cv_img, shadingINFO, rect_list, spec):
+    """
+    spec: list
+        [centerY, lumaSpecRatioMin, lumaSpecDev, colorSpecDev, chkLuma, chkColor]
+
+    Returns
+    --------------
+    dict
+        the results of evaluate_shading()
+    """
+    centerY, specLumaMin, specLumaDev, specColorDev, chkLuma, chkColor = spec
+    dprint.info('SPEC: ', spec)
+    results = evaluate_shading(shadingINFO, rect_list, spec)
+    for k in rect_list:
+        rect = shadingINFO[k]
+        Vt = rect.get('Vt')
+        Vb = rect.get('Vb')
+        res = results[k]
+        _Y, yC2C, yDev, r2g, b2g = [res[x] for x in ['Y', 'yC2C', 'yDev', 'r2g', 'b2g']]
+        dprint.info(k, ': ', _Y, ', ', res['R'], ', ', res['G'], ', ', res['B'])
+        dprint.info(yC2C, ' ', yDev, ' ', r2g, ' ', b2g)
+        is_pass = res['luma_pass']
+        yDev_pass = res['ydev_pass']
+        chroma_pass = res['chroma_pass']
+
         if is_pass:
             color = color_pass
         else:
@@ -107,4 +129,4 @@ def test_shading(cv_img, shadingINFO, rect_list, spec):
         text = "%.2f, %.2f" % (r2g, b2g)
         osd.show(cv_img, text, Vt[0], Vt[1]+(h+pads*2))
 
-    return
+    return results
@@ -0,0 +1,56 @@
+# USAGE
+# python multi_camera_demo.py
+# python multi_camera_demo.py --sources 0 1 rtsp://192.168.1.67:554/stream1
+
+# import the necessary packages
+from imutils.video import MultiCameraStream, FakeVideoCapture
+import numpy as np
+import argparse
+import imutils
+import cv2
+
+# construct the argument parse and parse the arguments
+ap = argparse.ArgumentParser()
+ap.add_argument("-s", "--sources", nargs="*", default=[],
+	help="camera indexes, video files or URLs (default: 4 fake cameras)")
+ap.add_argument("-n", "--num-frames", type=int, default=300,
+	help="# of framesets to capture")
+args = vars(ap.parse_args())
+
+# open the cameras, or simulated ones with a bit of jitter and drops
+sources = [int(s) if s.isdigit() else s for s in args["sources"]]
+if not sources:
+	sources = [FakeVideoCapture(fps=30, jitter=0.002, drop_rate=0.01,
+		seed=i) for i in range(4)]
+
+print("[INFO] starting {} cameras...".format(len(sources)))
+cams = MultiCameraStream(sources).start()
+
+# loop over the timestamp-aligned framesets
+while cams.running() and cams.seq < args["num_frames"]:
+	frameset = cams.read(timeout=1.0)
+	if frameset is None:
+		continue
+
+	# tile the frames of the cameras side by side, black for the
+	# cameras which dropped the frame
+	frames = [imutils.resize(f, width=320) if f is not None else None
+		for f in frameset["frames"]]
+	shape = next(f.shape for f in frames if f is not None)
+	tiles = [f if f is not None else np.zeros(shape, dtype="uint8")
+		for f in frames]
+	cv2.putText(tiles[0], "skew {:.2f} ms".format(frameset["skew"] * 1000),
+		(10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+	cv2.imshow("Cameras", np.hstack(tiles))
+	cv2.waitKey(1)
+
+# display the statistics of the rig and of every camera
+stats = cams.get_stats()
+cams.stop()
+cv2.destroyAllWindows()
+print("[INFO] framesets: {}, dropped: {}, skew mean {:.2f} ms, max {:.2f} ms".format(
+	stats["framesets"], stats["dropped"], stats["skew_mean"] * 1000,
+	stats["skew_max"] * 1000))
+for (i, c) in enumerate(stats["cameras"]):
+	print("[INFO] camera {}: {} frames, {} dropped, {:.2f} FPS, offset max {:.2f} ms".format(
+		i, c["frames"], c["dropped"], c["fps"], c["offset_max"] * 1000))
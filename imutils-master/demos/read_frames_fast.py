@@ -57,9 +57,9 @@ while fvs.running():
 	# show the frame and update the FPS counter
 	cv2.imshow("Frame", frame)
 
+	# read() blocks until the producer hands over the next frame,
+	# no need to sleep when the queue runs low
 	cv2.waitKey(1)
-	if fvs.Q.qsize() < 2:  # If we are low on frames, give time to producer
-		time.sleep(0.001)  # Ensures producer runs now, so 2 is sufficient
 	fps.update()
 
 # stop the timer and display FPS information
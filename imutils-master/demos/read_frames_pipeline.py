@@ -0,0 +1,57 @@
+# USAGE
+# python read_frames_pipeline.py --video videos/jurassic_park_intro.mp4
+
+# import the necessary packages
+from imutils.video import VideoPipeline
+from imutils.video import FPS
+import numpy as np
+import argparse
+import imutils
+import cv2
+
+# the transforms of read_frames_fast.py, split into stages which run
+# concurrently instead of one after the other on the reader thread
+def resizeFrame(frame):
+	return imutils.resize(frame, width=450)
+
+def grayFrame(frame):
+	frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+	return np.dstack([frame, frame, frame])
+
+# construct the argument parse and parse the arguments
+ap = argparse.ArgumentParser()
+ap.add_argument("-v", "--video", required=True,
+	help="path to input video file")
+ap.add_argument("-w", "--workers", type=int, default=2,
+	help="number of workers of the resize stage")
+args = vars(ap.parse_args())
+
+# build and start the pipeline: decode -> resize -> gray
+print("[INFO] starting video pipeline...")
+pipe = VideoPipeline(args["video"])
+pipe.add_stage(resizeFrame, workers=args["workers"])
+pipe.add_stage(grayFrame)
+pipe.start()
+
+# start the FPS timer
+fps = FPS().start()
+
+# loop over the frames out of the last stage
+for frame in pipe:
+	cv2.imshow("Frame", frame)
+	cv2.waitKey(1)
+	fps.update()
+
+# stop the timer and display FPS information
+fps.stop()
+print("[INFO] elasped time: {:.2f}".format(fps.elapsed()))
+print("[INFO] approx. FPS: {:.2f}".format(fps.fps()))
+
+# display the throughput and queue depth of every stage
+for s in pipe.stats():
+	print("[INFO] {:>12}: {} worker(s), {:.2f} FPS, queue {}/{}".format(
+		s["name"], s["workers"], s["fps"], s["queue"], s["queue_size"]))
+
+# do a bit of cleanup
+cv2.destroyAllWindows()
+pipe.stop()
@@ -3,4 +3,7 @@ from .count_frames import count_frames
 from .fps import FPS
 from .videostream import VideoStream
 from .webcamvideostream import WebcamVideoStream
-from .filevideostream import FileVideoStream
\ No newline at end of file
+from .filevideostream import FileVideoStream
+from .videopipeline import VideoPipeline
+from .processfilevideostream import ProcessFileVideoStream
+from .multicamerastream import MultiCameraStream, FakeVideoCapture
\ No newline at end of file
@@ -2,28 +2,51 @@
 from threading import Thread
 import sys
 import cv2
-import time
 
 # import the Queue class from Python 3
 if sys.version_info >= (3, 0):
-	from queue import Queue
+	from queue import Queue, Empty, Full
 
 # otherwise, import the Queue class for Python 2.7
 else:
-	from Queue import Queue
+	from Queue import Queue, Empty, Full
+
+# marks the end of the stream in the queue, it is never handed
+# back to the consumer
+_END_OF_STREAM = object()
 
 
 class FileVideoStream:
-	def __init__(self, path, transform=None, queue_size=128):
+	def __init__(self, path, transform=None, queue_size=128,
+		timeout=0.1, pool=False):
 		# initialize the file video stream along with the boolean
 		# used to indicate if the thread should be stopped or not
 		self.stream = cv2.VideoCapture(path)
 		self.stopped = False
 		self.transform = transform
 
+		# the timeout (in seconds) of the blocking puts/gets, it only
+		# bounds how long a blocked thread takes to notice stop();
+		# frames are handed over as soon as they are available
+		self.timeout = timeout
+
 		# initialize the queue used to store frames read from
-		# the video file
+		# the video file, and the frame taken from the queue by
+		# more() but not yet returned by read()
 		self.Q = Queue(maxsize=queue_size)
+		self._head = None
+
+		# optional pool of frame buffers: the producer decodes into a
+		# free buffer and the consumer hands it back with release();
+		# the pool holds the frames of the queue, the one being
+		# decoded and the one the consumer works on, so it only runs
+		# dry if frames are not released (they are then simply not
+		# reused, new frames are allocated outside the pool);
+		# `_owned` maps the ids of the buffers in use to the buffers,
+		# a buffer on the free list is not in it
+		self.pool = pool
+		self._free = Queue()
+		self._owned = {}
 		# intialize thread
 		self.thread = Thread(target=self.update, args=())
 		self.thread.daemon = True
@@ -33,24 +56,72 @@ class FileVideoStream:
 		self.thread.start()
 		return self
 
+	def _put(self, item):
+		# block until the queue has room, unless the stream is
+		# stopped meanwhile
+		while not self.stopped:
+			try:
+				self.Q.put(item, timeout=self.timeout)
+				return True
+			except Full:
+				continue
+
+		return False
+
+	def _full(self):
+		return self.Q.maxsize > 0 and \
+			len(self._owned) + self._free.qsize() >= self.Q.maxsize + 2
+
+	def _acquire(self):
+		# get a free buffer of the pool, None to let the capture
+		# allocate a new frame
+		if not self.pool:
+			return None
+
+		try:
+			buf = self._free.get(block=False)
+		except Empty:
+			return None
+
+		self._owned[id(buf)] = buf
+		return buf
+
+	def _recycle(self, frame):
+		# return a buffer of the pool in use to the free list; an id
+		# may have been reused by another array, so check the
+		# identity, and a buffer already free is not in `_owned`, so
+		# recycling it twice does not put it twice on the free list
+		if self.pool and frame is not None and \
+			self._owned.get(id(frame)) is frame:
+			del self._owned[id(frame)]
+			self._free.put(frame)
+
 	def update(self):
-		# keep looping infinitely
-		while True:
-			# if the thread indicator variable is set, stop the
-			# thread
-			if self.stopped:
-				break
-
-			# otherwise, ensure the queue has room in it
-			if not self.Q.full():
-				# read the next frame from the file
-				(grabbed, frame) = self.stream.read()
+		try:
+			# keep looping until the end of the stream or stop()
+			while not self.stopped:
+				# read the next frame from the file, into a free
+				# buffer of the pool if there is one
+				buf = self._acquire()
+				if buf is None:
+					(grabbed, frame) = self.stream.read()
+				else:
+					(grabbed, frame) = self.stream.read(image=buf)
 
 				# if the `grabbed` boolean is `False`, then we have
 				# reached the end of the video file
 				if not grabbed:
-					self.stopped = True
-					
+					self._recycle(buf)
+					break
+
+				# track the buffers of the pool, the capture
+				# reallocates if the frame size changes
+				if self.pool and frame is not buf:
+					if buf is not None:
+						del self._owned[id(buf)]
+					if not self._full():
+						self._owned[id(frame)] = frame
+
 				# if there are transforms to be done, might as well
 				# do them on producer thread before handing back to
 				# consumer thread. ie. Usually the producer is so far
@@ -64,36 +135,71 @@ class FileVideoStream:
 				# producer/consumer queues since this one was generally
 				# idle grabbing frames.
 				if self.transform:
-					frame = self.transform(frame)
-
-				# add the frame to the queue
-				self.Q.put(frame)
-			else:
-				time.sleep(0.1)  # Rest for 10ms, we have a full queue
-
-		self.stream.release()
+					out = self.transform(frame)
+
+					# the decoded frame can be reused right away
+					# if the transform made a new one
+					if out is not frame:
+						self._recycle(frame)
+					frame = out
+
+				# add the frame to the queue, blocking while it is full
+				if not self._put(frame):
+					break
+		finally:
+			# release the capture first, the consumer may exit as
+			# soon as it gets the end of the stream; then always
+			# terminate the stream, even if the transform raised,
+			# so the consumer never waits forever
+			self.stream.release()
+			self._put(_END_OF_STREAM)
+			self.stopped = True
+
+	def _next(self):
+		# take the next item from the queue into the head, blocking
+		# until the producer hands one over; the producer always
+		# ends the stream with the sentinel, unless it is stopped
+		while self._head is None:
+			try:
+				self._head = self.Q.get(timeout=self.timeout)
+			except Empty:
+				if not self.thread.is_alive() and self.Q.empty():
+					self._head = _END_OF_STREAM
+
+		return self._head
 
 	def read(self):
-		# return next frame in the queue
-		return self.Q.get()
+		# return next frame in the queue, or None at the end of the
+		# stream
+		frame = self._next()
+		if frame is _END_OF_STREAM:
+			return None
+
+		self._head = None
+		return frame
+
+	def release(self, frame):
+		# hand a frame returned by read() back to the pool once
+		# the consumer is done with it; frames which are not
+		# buffers of the pool (e.g., made by the transform) are
+		# ignored, and so are frames already released, so it is
+		# always safe to call
+		self._recycle(frame)
 
-	# Insufficient to have consumer use while(more()) which does
-	# not take into account if the producer has reached end of
-	# file stream.
 	def running(self):
-		return self.more() or not self.stopped
+		# True if read() will return another frame; it blocks until
+		# the next frame is decoded or the end of the stream is
+		# reached, so it is exact
+		return self.more()
 
 	def more(self):
-		# return True if there are still frames in the queue. If stream is not stopped, try to wait a moment
-		tries = 0
-		while self.Q.qsize() == 0 and not self.stopped and tries < 5:
-			time.sleep(0.1)
-			tries += 1
-
-		return self.Q.qsize() > 0
+		# return True if there are still frames to read, waiting for
+		# the producer if the queue is empty
+		return self._next() is not _END_OF_STREAM
 
 	def stop(self):
 		# indicate that the thread should be stopped
 		self.stopped = True
 		# wait until stream resources are released (producer thread might be still grabbing frame)
-		self.thread.join()
+		if self.thread.is_alive():
+			self.thread.join()
@@ -1,33 +1,141 @@
 # import the necessary packages
-import datetime
+import math
+import time
+
+# the high resolution clock in integer nanoseconds, with a fallback
+# for Python versions without time.perf_counter_ns()
+if hasattr(time, "perf_counter_ns"):
+	_now_ns = time.perf_counter_ns
+else:
+	_clock = getattr(time, "perf_counter", time.time)
+	def _now_ns():
+		return int(_clock() * 1e9)
 
 class FPS:
-	def __init__(self):
+	def __init__(self, window=120):
 		# store the start time, end time, and total number of frames
 		# that were examined between the start and end intervals
 		self._start = None
 		self._end = None
 		self._numFrames = 0
 
+		# a fixed ring buffer of the last `window` frame times (ns)
+		# and their running sum, so update() takes constant time and
+		# the rolling statistics cover the last `window` frames
+		self.window = max(1, window)
+		self._ring = [0] * self.window
+		self._ringIdx = 0
+		self._ringCount = 0
+		self._ringSum = 0
+		self._last = None
+		self._maxStall = 0
+
+		# the lap timing of the stages within a frame: the time of
+		# the last lap (or frame), and name --> [count, total, max,
+		# last] in ns
+		self._lapStart = None
+		self._laps = {}
+
 	def start(self):
 		# start the timer
-		self._start = datetime.datetime.now()
+		self._start = _now_ns()
+		self._last = self._start
+		self._lapStart = self._start
 		return self
 
 	def stop(self):
 		# stop the timer
-		self._end = datetime.datetime.now()
+		self._end = _now_ns()
 
 	def update(self):
 		# increment the total number of frames examined during the
-		# start and end intervals
+		# start and end intervals, and record the frame time
+		now = _now_ns()
+		if self._last is not None:
+			dt = now - self._last
+			self._ringSum += dt - self._ring[self._ringIdx]
+			self._ring[self._ringIdx] = dt
+			self._ringIdx = (self._ringIdx + 1) % self.window
+			if self._ringCount < self.window:
+				self._ringCount += 1
+			if dt > self._maxStall:
+				self._maxStall = dt
+
+		self._last = now
+		self._lapStart = now
 		self._numFrames += 1
 
+	def lap(self, name):
+		# record the time spent in the stage `name` since the last
+		# lap (or the last frame), and return it in milliseconds
+		now = _now_ns()
+		dt = now - (self._lapStart if self._lapStart is not None else now)
+		self._lapStart = now
+
+		stats = self._laps.get(name)
+		if stats is None:
+			self._laps[name] = [1, dt, dt, dt]
+		else:
+			stats[0] += 1
+			stats[1] += dt
+			stats[3] = dt
+			if dt > stats[2]:
+				stats[2] = dt
+
+		return dt / 1e6
+
 	def elapsed(self):
 		# return the total number of seconds between the start and
-		# end interval
-		return (self._end - self._start).total_seconds()
+		# end interval (or now, if the timer is still running)
+		end = self._end if self._end is not None else _now_ns()
+		return (end - self._start) / 1e9
 
 	def fps(self):
 		# compute the (approximate) frames per second
-		return self._numFrames / self.elapsed()
\ No newline at end of file
+		return self._numFrames / self.elapsed()
+
+	def rolling_fps(self):
+		# the frames per second over the last `window` frames
+		if self._ringSum <= 0:
+			return 0.0
+		return self._ringCount * 1e9 / self._ringSum
+
+	def frame_times(self):
+		# the last `window` frame times in milliseconds, oldest first
+		if self._ringCount < self.window:
+			ring = self._ring[:self._ringCount]
+		else:
+			ring = self._ring[self._ringIdx:] + self._ring[:self._ringIdx]
+		return [dt / 1e6 for dt in ring]
+
+	def percentiles(self, ps=(50, 95, 99)):
+		# the percentiles (nearest rank) of the frame times over the
+		# last `window` frames in milliseconds, as {p: ms}; sorting
+		# happens here, never in update()
+		times = sorted(self._ring[:self._ringCount])
+		if not times:
+			return dict((p, 0.0) for p in ps)
+
+		n = len(times)
+		ranks = [min(n - 1, max(0, int(math.ceil(p * n / 100.0)) - 1))
+			for p in ps]
+		return dict((p, times[k] / 1e6) for (p, k) in zip(ps, ranks))
+
+	def max_stall(self):
+		# the longest frame time since start() in milliseconds
+		return self._maxStall / 1e6
+
+	def laps(self):
+		# the timing of each stage: name --> {count, mean_ms, max_ms,
+		# last_ms}
+		return dict((name, {"count": s[0], "mean_ms": s[1] / s[0] / 1e6,
+			"max_ms": s[2] / 1e6, "last_ms": s[3] / 1e6})
+			for (name, s) in self._laps.items())
+
+	def summary(self):
+		# all the statistics in one dictionary
+		p = self.percentiles()
+		return {"frames": self._numFrames, "fps": self.fps(),
+			"rolling_fps": self.rolling_fps(), "p50_ms": p[50],
+			"p95_ms": p[95], "p99_ms": p[99],
+			"max_stall_ms": self.max_stall(), "laps": self.laps()}
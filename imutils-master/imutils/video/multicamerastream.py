@@ -0,0 +1,277 @@
+# import the necessary packages
+from threading import Thread, Condition
+from collections import deque
+import numpy as np
+import random
+import time
+import cv2
+
+# the multi-camera stream needs threading.Barrier, i.e., Python 3; it
+# is imported when the stream is created so importing imutils.video
+# still works everywhere
+
+
+class FakeVideoCapture:
+	def __init__(self, width=640, height=480, fps=30.0, jitter=0.0,
+		drop_rate=0.0, frames=None, seed=None):
+		# a stand-in for cv2.VideoCapture to test multi-camera code
+		# without cameras: frames arrive every 1/fps seconds (plus a
+		# random jitter in seconds), `drop_rate` of the grabs fail,
+		# and the stream ends after `frames` frames (None: never)
+		self.width = width
+		self.height = height
+		self.fps = fps
+		self.jitter = jitter
+		self.drop_rate = drop_rate
+		self.frames = frames
+		self.random = random.Random(seed)
+		self.index = -1
+		self._start = None
+		self._opened = True
+
+	def isOpened(self):
+		return self._opened
+
+	def grab(self):
+		# wait for the next frame of the simulated camera
+		if not self._opened:
+			return False
+		if self._start is None:
+			self._start = time.perf_counter()
+
+		self.index += 1
+		if self.frames is not None and self.index >= self.frames:
+			return False
+
+		due = self._start + self.index / self.fps + \
+			self.random.uniform(0, self.jitter)
+		delay = due - time.perf_counter()
+		if delay > 0:
+			time.sleep(delay)
+
+		return self.random.random() >= self.drop_rate
+
+	def retrieve(self):
+		# render the index of the frame, so the frames of a frameset
+		# can be checked against each other
+		frame = np.zeros((self.height, self.width, 3), dtype="uint8")
+		cv2.putText(frame, str(self.index), (10, self.height // 2),
+			cv2.FONT_HERSHEY_SIMPLEX, 2.0, (255, 255, 255), 3)
+		return (True, frame)
+
+	def read(self):
+		if not self.grab():
+			return (False, None)
+		return self.retrieve()
+
+	def get(self, prop):
+		if prop == cv2.CAP_PROP_FPS:
+			return self.fps
+		if prop == cv2.CAP_PROP_FRAME_WIDTH:
+			return self.width
+		if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+			return self.height
+		return 0.0
+
+	def release(self):
+		self._opened = False
+
+
+class CameraStats:
+	def __init__(self, source):
+		# the statistics of one camera of a MultiCameraStream
+		self.source = source
+		self.frames = 0
+		self.dropped = 0
+		self.failures = 0
+		self.offsetSum = 0.0
+		self.offsetMax = 0.0
+		self._start = None
+		self._last = None
+
+	def update(self, grabbed, timestamp, offset):
+		# add a grab: its success, time, and offset from the mean
+		# grab time of its frameset
+		if self._start is None:
+			self._start = timestamp
+		if not grabbed:
+			self.dropped += 1
+			self.failures += 1
+			return
+
+		self.failures = 0
+		self.frames += 1
+		self._last = timestamp
+		self.offsetSum += offset
+		self.offsetMax = max(self.offsetMax, abs(offset))
+
+	def fps(self):
+		if self._last is None or self._last <= self._start:
+			return 0.0
+		return (self.frames - 1) / (self._last - self._start)
+
+
+class MultiCameraStream:
+	def __init__(self, sources, queue_size=4, max_failures=10,
+		name="MultiCameraStream"):
+		from threading import Barrier
+
+		# open the sources: camera indexes, files or URLs of
+		# cv2.VideoCapture, or objects with the same grab()/retrieve()
+		# interface (e.g., FakeVideoCapture); the capture ends when a
+		# source fails `max_failures` grabs in a row (e.g., the end of
+		# a file), a single failed grab is counted as a dropped frame
+		self.sources = list(sources)
+		self.streams = [src if hasattr(src, "grab") else
+			cv2.VideoCapture(src) for src in self.sources]
+
+		# fail early rather than starting a rig with a missing camera
+		for (src, stream) in zip(self.sources, self.streams):
+			if not stream.isOpened():
+				for s in self.streams:
+					s.release()
+				raise IOError("failed to open video source: {}".format(src))
+
+		self.name = name
+		self.max_failures = max_failures
+		n = len(self.streams)
+
+		# the grab threads meet at `trigger` to grab at the same
+		# time, then decode (retrieve) in parallel and meet at `done`,
+		# where the last one to arrive assembles the frameset
+		self._trigger = Barrier(n)
+		self._done = Barrier(n, action=self._assemble)
+		self._results = [None] * n
+		self.stats = [CameraStats(src) for src in self.sources]
+
+		# the framesets not read yet, the oldest one is dropped when
+		# the consumer falls behind
+		self.framesets = deque(maxlen=queue_size)
+		self.seq = 0
+		self.dropped = 0
+		self.skewMax = 0.0
+		self._skewSum = 0.0
+		self.stopped = False
+		self.threads = []
+		self.cond = Condition()
+
+	def start(self):
+		# start one grab thread per camera
+		for (i, stream) in enumerate(self.streams):
+			t = Thread(target=self.update, name="{}-{}".format(self.name, i),
+				args=(i, stream))
+			t.daemon = True
+			self.threads.append(t)
+			t.start()
+		return self
+
+	def update(self, i, stream):
+		from threading import BrokenBarrierError
+
+		try:
+			while not self.stopped:
+				# grab at the same time as the other cameras: grab()
+				# only latches the frame, the slower decoding of
+				# retrieve() happens after the timestamp
+				self._trigger.wait()
+				grabbed = stream.grab()
+				timestamp = time.perf_counter()
+				frame = stream.retrieve()[1] if grabbed else None
+				self._results[i] = (grabbed, timestamp, frame)
+				self._done.wait()
+		except BrokenBarrierError:
+			pass
+		except Exception:
+			# a failing source stops the whole rig instead of leaving
+			# the other threads waiting at the barriers
+			self.stopped = True
+			self._trigger.abort()
+			self._done.abort()
+			with self.cond:
+				self.cond.notify_all()
+			raise
+		finally:
+			stream.release()
+
+	def _assemble(self):
+		# runs once per cycle, in the last grab thread at `done`
+		results = self._results
+		grabbed = [r[0] for r in results]
+		times = [r[1] for r in results if r[0]]
+		reference = sum(times) / len(times) if times else 0.0
+		for (stats, (ok, ts, _)) in zip(self.stats, results):
+			stats.update(ok, ts, ts - reference)
+
+		ended = [s for s in self.stats if s.failures >= self.max_failures]
+		if ended or not times:
+			# a source is gone (or every source failed): the end of
+			# the stream, the trailing failed grabs were not drops
+			for s in self.stats:
+				s.dropped -= s.failures
+			self.stopped = True
+			self._trigger.abort()
+			with self.cond:
+				self.cond.notify_all()
+			return
+
+		skew = max(times) - min(times)
+
+		self.seq += 1
+		self.skewMax = max(self.skewMax, skew)
+		self._skewSum += skew
+		frameset = {"seq": self.seq, "timestamp": reference, "skew": skew,
+			"complete": all(grabbed),
+			"frames": [r[2] for r in results],
+			"timestamps": [r[1] if r[0] else None for r in results]}
+
+		with self.cond:
+			if len(self.framesets) == self.framesets.maxlen:
+				self.dropped += 1
+			self.framesets.append(frameset)
+			self.cond.notify_all()
+
+	def read(self, timeout=None):
+		# return the oldest frameset not read yet, waiting for one if
+		# needed; None at the end of the stream or on timeout
+		#
+		# a frameset is a dictionary of its "seq", its "timestamp"
+		# (the mean grab time), the "skew" between the cameras, and
+		# the "frames" and grab "timestamps" of each camera (None for
+		# a camera which failed to grab, "complete" is then False)
+		with self.cond:
+			self.cond.wait_for(lambda: self.framesets or self.stopped,
+				timeout)
+			if self.framesets:
+				return self.framesets.popleft()
+		return None
+
+	def running(self):
+		# True while framesets are being captured or not read yet
+		with self.cond:
+			return bool(self.framesets) or not self.stopped
+
+	def get_stats(self):
+		# the fps, dropped grabs and grab time offsets of each camera,
+		# and the skew and dropped framesets of the whole rig
+		cameras = []
+		for s in self.stats:
+			cameras.append({"source": s.source, "frames": s.frames,
+				"dropped": s.dropped, "fps": s.fps(),
+				"offset_mean": s.offsetSum / s.frames if s.frames else 0.0,
+				"offset_max": s.offsetMax})
+
+		return {"framesets": self.seq, "dropped": self.dropped,
+			"skew_mean": self._skewSum / self.seq if self.seq else 0.0,
+			"skew_max": self.skewMax, "cameras": cameras}
+
+	def stop(self):
+		# indicate that the threads should be stopped, release them
+		# from the barriers and wait until the sources are released
+		self.stopped = True
+		self._trigger.abort()
+		self._done.abort()
+		with self.cond:
+			self.cond.notify_all()
+		for t in self.threads:
+			if t.is_alive():
+				t.join()
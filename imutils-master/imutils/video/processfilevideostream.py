@@ -0,0 +1,236 @@
+# import the necessary packages
+import numpy as np
+import cv2
+
+# the process-based stream needs multiprocessing.shared_memory, i.e.,
+# Python 3.8+; the modules are imported when the stream is created so
+# importing imutils.video still works everywhere
+
+
+def _decode_worker(path, transform, start, count, shmName, slotBytes,
+	firstSlot, freeQ, readyQ, stopEvent, timeout):
+	# decode (and transform) frames [start, start + count) of the
+	# video in a worker process, each frame is written to a free
+	# slot of the shared memory and only its slot, shape and dtype
+	# are sent through the ready queue
+	from multiprocessing import shared_memory
+	from queue import Empty
+
+	shm = shared_memory.SharedMemory(name=shmName)
+	stream = cv2.VideoCapture(path)
+	try:
+		if start > 0:
+			stream.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+		n = 0
+		while not stopEvent.is_set() and (count is None or n < count):
+			(grabbed, frame) = stream.read()
+			if not grabbed:
+				break
+
+			if transform:
+				frame = transform(frame)
+			frame = np.ascontiguousarray(frame)
+			if frame.nbytes > slotBytes:
+				raise ValueError("frame of {} bytes exceeds the slot of "
+					"{} bytes".format(frame.nbytes, slotBytes))
+
+			# wait for a free slot, unless the stream is stopped
+			slot = None
+			while slot is None and not stopEvent.is_set():
+				try:
+					slot = freeQ.get(timeout=timeout)
+				except Empty:
+					continue
+			if slot is None:
+				break
+
+			view = np.ndarray(frame.shape, frame.dtype, buffer=shm.buf,
+				offset=(firstSlot + slot) * slotBytes)
+			view[...] = frame
+			del view
+			readyQ.put(("frame", slot, frame.shape, frame.dtype.str))
+			n += 1
+	except Exception as e:
+		readyQ.put(("error", "{}: {}".format(type(e).__name__, e)))
+	finally:
+		stream.release()
+		readyQ.put(("end",))
+		shm.close()
+
+
+class ProcessFileVideoStream:
+	def __init__(self, path, transform=None, queue_size=32, workers=1,
+		copy=True, timeout=0.1):
+		# a drop-in alternative of FileVideoStream which decodes and
+		# transforms in worker processes, so a transform holding the
+		# GIL does not slow down the consumer; `transform` must be
+		# picklable (a module level function) and return frames of
+		# the same size
+		import multiprocessing as mp
+		from multiprocessing import shared_memory
+
+		self.path = path
+		self.transform = transform
+		self.queue_size = queue_size
+		self.workers = max(1, workers)
+		self.copy = copy
+		self.timeout = timeout
+		self.stopped = False
+
+		# probe the first frame to size the slots of the shared
+		# memory, `queue_size` slots per worker
+		stream = cv2.VideoCapture(path)
+		(grabbed, frame) = stream.read()
+		nFrames = int(stream.get(cv2.CAP_PROP_FRAME_COUNT))
+		stream.release()
+		if not grabbed:
+			raise IOError("failed to read video: {}".format(path))
+		if transform:
+			frame = transform(frame)
+		self.slotBytes = max(1, np.ascontiguousarray(frame).nbytes)
+		self.shm = shared_memory.SharedMemory(create=True,
+			size=self.slotBytes * queue_size * self.workers)
+
+		# with several workers, each one decodes its own contiguous
+		# segment of the video (positioned by CAP_PROP_POS_FRAMES),
+		# the frames are read back segment after segment
+		if nFrames < self.workers:
+			self.workers = 1
+		bounds = [nFrames * i // self.workers
+			for i in range(self.workers + 1)]
+
+		self.stopEvent = mp.Event()
+		self.freeQs = []
+		self.readyQs = []
+		self.procs = []
+		for w in range(self.workers):
+			freeQ = mp.Queue()
+			for slot in range(queue_size):
+				freeQ.put(slot)
+			readyQ = mp.Queue()
+			count = None if w == self.workers - 1 else \
+				bounds[w + 1] - bounds[w]
+			p = mp.Process(target=_decode_worker, args=(path, transform,
+				bounds[w], count, self.shm.name, self.slotBytes,
+				w * queue_size, freeQ, readyQ, self.stopEvent, timeout))
+			p.daemon = True
+			self.freeQs.append(freeQ)
+			self.readyQs.append(readyQ)
+			self.procs.append(p)
+
+		# the segment being read, the message taken by more() but not
+		# yet returned by read(), and the slots of the frames handed
+		# out without a copy
+		self._current = 0
+		self._head = None
+		self._lent = {}
+
+	def start(self):
+		# start the worker processes
+		for p in self.procs:
+			p.start()
+		return self
+
+	def _next(self):
+		# take the next frame message into the head, moving on to the
+		# next segment at the end of the current one
+		from queue import Empty
+
+		while self._head is None:
+			if self._current >= self.workers:
+				self._head = ("end",)
+				break
+
+			readyQ = self.readyQs[self._current]
+			try:
+				msg = readyQ.get(timeout=self.timeout)
+			except Empty:
+				if self.stopped:
+					msg = ("end",)
+				elif not self.procs[self._current].is_alive():
+					# the worker may have put its last frames and
+					# exited since the timeout, take what is left
+					# before making up the end of the segment
+					try:
+						msg = readyQ.get_nowait()
+					except Empty:
+						msg = ("end",)
+				else:
+					continue
+
+			if msg[0] == "error":
+				self.stopped = True
+				raise RuntimeError("decode worker failed: " + msg[1])
+			if msg[0] == "end":
+				self._current += 1
+				continue
+			self._head = (self._current,) + tuple(msg[1:])
+
+		return self._head
+
+	def read(self):
+		# return the next frame, or None at the end of the stream
+		head = self._next()
+		if head[0] == "end":
+			return None
+		self._head = None
+
+		(w, slot, shape, dtype) = head
+		frame = np.ndarray(shape, np.dtype(dtype), buffer=self.shm.buf,
+			offset=(w * self.queue_size + slot) * self.slotBytes)
+
+		# hand the slot back right away after a copy, or when the
+		# consumer calls release()
+		if self.copy:
+			frame = frame.copy()
+			self.freeQs[w].put(slot)
+		else:
+			self._lent[id(frame)] = (w, slot)
+
+		return frame
+
+	def release(self, frame):
+		# hand the slot of a frame read with copy=False back to its
+		# worker; frames not lent by read() are ignored
+		lent = self._lent.pop(id(frame), None)
+		if lent is not None:
+			self.freeQs[lent[0]].put(lent[1])
+
+	def running(self):
+		# True if read() will return another frame
+		return self.more()
+
+	def more(self):
+		# return True if there are still frames to read, waiting for
+		# the workers if none is ready
+		return self._next()[0] != "end"
+
+	def stop(self):
+		# indicate that the workers should stop, and wait for them
+		# while draining their queues (a process does not exit until
+		# the data it put in a queue is consumed)
+		from queue import Empty
+
+		if self.shm is None:
+			return
+
+		self.stopped = True
+		self.stopEvent.set()
+		for (p, readyQ) in zip(self.procs, self.readyQs):
+			while p.is_alive():
+				try:
+					readyQ.get(timeout=self.timeout)
+				except Empty:
+					pass
+				p.join(self.timeout)
+
+		# release the shared memory, the frames still lent keep
+		# their own mapping
+		self._lent.clear()
+		try:
+			self.shm.close()
+		except BufferError:
+			pass
+		self.shm.unlink()
+		self.shm = None
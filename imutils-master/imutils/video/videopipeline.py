@@ -0,0 +1,238 @@
+# import the necessary packages
+from .filevideostream import FileVideoStream
+from collections import deque
+from threading import Thread
+import sys
+import time
+
+# import the Queue class from Python 3
+if sys.version_info >= (3, 0):
+	from queue import Queue, Empty, Full
+
+# otherwise, import the Queue class for Python 2.7
+else:
+	from Queue import Queue, Empty, Full
+
+# marks the end of the stream between the stages
+_END_OF_STREAM = object()
+
+# the high resolution clock of the stage statistics, with a fallback
+# for Python versions without time.perf_counter()
+_clock = getattr(time, "perf_counter", time.time)
+
+
+class PipelineStage:
+	def __init__(self, func, workers=1, queue_size=32, name=None,
+		process=False):
+		# the function applied to every frame, the number of
+		# workers running it, and whether the workers are threads
+		# or processes (`func` must then be picklable, i.e., a
+		# module level function, and frames are pickled between
+		# the processes)
+		self.func = func
+		self.workers = max(1, workers)
+		self.process = process
+		self.name = name or getattr(func, "__name__", "stage")
+
+		# the bounded queue of the frames out of this stage
+		self.Q = Queue(maxsize=queue_size)
+
+		# statistics of the stage
+		self.frames = 0
+		self._start = None
+		self._end = None
+
+	def fps(self):
+		# the throughput of the stage since its first frame
+		if self._start is None:
+			return 0.0
+
+		end = self._end or _clock()
+		return self.frames / max(end - self._start, 1e-9)
+
+
+class VideoPipeline:
+	def __init__(self, path, queue_size=128, timeout=0.1):
+		# the decode stage: a FileVideoStream, and its statistics
+		self.fvs = FileVideoStream(path, queue_size=queue_size,
+			timeout=timeout)
+		self.decode = PipelineStage(None, name="decode")
+		self.decode.Q = self.fvs.Q
+		self.timeout = timeout
+		self.stages = []
+		self.threads = []
+		self.stopped = False
+		self.error = None
+
+	def add_stage(self, func, workers=1, queue_size=32, name=None,
+		process=False):
+		# append a transform stage, frames flow through the stages
+		# in the order they are added and keep their order even
+		# with several workers per stage
+		stage = PipelineStage(func, workers=workers,
+			queue_size=queue_size, name=name, process=process)
+		self.stages.append(stage)
+		return self
+
+	def start(self):
+		# start the decode thread, then one driver thread per stage
+		self.fvs.start()
+		get = self._source_get
+		for stage in self.stages:
+			t = Thread(target=self._run_stage, args=(stage, get))
+			t.daemon = True
+			self.threads.append(t)
+			get = self._queue_get(stage.Q)
+
+		self._sink_get = get
+		self._head = None
+		for t in self.threads:
+			t.start()
+
+		return self
+
+	def _source_get(self):
+		# the next decoded frame, or the end of the stream
+		if self.decode._start is None:
+			self.decode._start = _clock()
+		frame = self.fvs.read()
+		if frame is None:
+			self.decode._end = _clock()
+			return _END_OF_STREAM
+
+		self.decode.frames += 1
+		return frame
+
+	def _queue_get(self, Q):
+		# build a blocking get from the queue of a stage, which
+		# gives up once the pipeline is stopped
+		def get():
+			while True:
+				try:
+					return Q.get(timeout=self.timeout)
+				except Empty:
+					if self.stopped:
+						return _END_OF_STREAM
+
+		return get
+
+	def _put(self, Q, item):
+		# block until the queue has room, unless the pipeline is
+		# stopped meanwhile
+		while not self.stopped:
+			try:
+				Q.put(item, timeout=self.timeout)
+				return True
+			except Full:
+				continue
+
+		return False
+
+	def _run_stage(self, stage, get):
+		executor = None
+		pending = deque()
+
+		def emit(frame):
+			stage.frames += 1
+			return self._put(stage.Q, frame)
+
+		try:
+			# a single thread worker runs on the driver thread
+			# itself, otherwise the frames are submitted to a pool
+			# (of one process for a single process worker) and
+			# handed on in submission order
+			if stage.workers > 1 or stage.process:
+				if stage.process:
+					from concurrent.futures import ProcessPoolExecutor
+					executor = ProcessPoolExecutor(stage.workers)
+				else:
+					from concurrent.futures import ThreadPoolExecutor
+					executor = ThreadPoolExecutor(stage.workers)
+
+			while not self.stopped:
+				frame = get()
+				if stage._start is None:
+					stage._start = _clock()
+				if frame is _END_OF_STREAM:
+					break
+
+				if executor is None:
+					if not emit(stage.func(frame)):
+						break
+					continue
+
+				# keep at most 2 frames in flight per worker, and
+				# hand on the finished frames at the head
+				pending.append(executor.submit(stage.func, frame))
+				while pending and (len(pending) >= 2 * stage.workers
+					or pending[0].done()):
+					if not emit(pending.popleft().result()):
+						break
+
+			# flush the frames still in flight
+			while pending and not self.stopped:
+				emit(pending.popleft().result())
+		except Exception as e:
+			# remember the first error and stop the whole pipeline,
+			# the decode thread included (it is not joined here, it
+			# notices the flag within its timeout and ends by itself)
+			if self.error is None:
+				self.error = "{}: {}: {}".format(stage.name,
+					type(e).__name__, e)
+			self.stopped = True
+			self.fvs.stopped = True
+		finally:
+			stage._end = _clock()
+			if executor is not None:
+				executor.shutdown(wait=False)
+			self._put(stage.Q, _END_OF_STREAM)
+
+	def _next(self):
+		# take the next frame out of the last stage into the head
+		if self._head is None:
+			self._head = self._sink_get()
+			if self._head is _END_OF_STREAM and self.error:
+				raise RuntimeError("pipeline failed in " + self.error)
+
+		return self._head
+
+	def read(self):
+		# return the next frame out of the last stage, or None at
+		# the end of the stream
+		frame = self._next()
+		if frame is _END_OF_STREAM:
+			return None
+
+		self._head = None
+		return frame
+
+	def more(self):
+		# return True if read() will return another frame
+		return self._next() is not _END_OF_STREAM
+
+	def running(self):
+		return self.more()
+
+	def __iter__(self):
+		# iterate over the frames out of the last stage
+		while self.more():
+			yield self.read()
+
+	def stats(self):
+		# the frames, throughput and output queue depth of each
+		# stage, starting with the decode stage
+		rows = []
+		for stage in [self.decode] + self.stages:
+			rows.append({"name": stage.name, "workers": stage.workers,
+				"frames": stage.frames, "fps": stage.fps(),
+				"queue": stage.Q.qsize(), "queue_size": stage.Q.maxsize})
+
+		return rows
+
+	def stop(self):
+		# stop the stages and the decode thread, and wait for them
+		self.stopped = True
+		self.fvs.stop()
+		for t in self.threads:
+			if t.is_alive():
+				t.join()
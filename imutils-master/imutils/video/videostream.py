@@ -30,9 +30,10 @@ class VideoStream:
 		# grab the next frame from the stream
 		self.stream.update()
 
-	def read(self):
-		# return the current frame
-		return self.stream.read()
+	def read(self, *args, **kwargs):
+		# return the current frame, the arguments (e.g., `wait_new`
+		# of WebcamVideoStream) are passed to the stream
+		return self.stream.read(*args, **kwargs)
 
 	def stop(self):
 		# stop the thread and release any resources
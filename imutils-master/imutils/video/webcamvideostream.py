@@ -1,7 +1,12 @@
 # import the necessary packages
-from threading import Thread
+from threading import Thread, Condition
+import time
 import cv2
 
+# the high resolution clock of the timestamps, with a fallback for
+# Python versions without time.perf_counter()
+_clock = getattr(time, "perf_counter", time.time)
+
 class WebcamVideoStream:
 	def __init__(self, src=0, name="WebcamVideoStream"):
 		# initialize the video camera stream and read the first frame
@@ -9,34 +14,82 @@ class WebcamVideoStream:
 		self.stream = cv2.VideoCapture(src)
 		(self.grabbed, self.frame) = self.stream.read()
 
+		# tag every frame grabbed with a monotonically increasing
+		# sequence number and its capture time (in seconds of
+		# _clock()), the condition is notified whenever a new frame
+		# arrives
+		self.seq = 1 if self.grabbed else 0
+		self.timestamp = _clock()
+		self.cond = Condition()
+		self._lastSeq = 0
+
 		# initialize the thread name
 		self.name = name
 
 		# initialize the variable used to indicate if the thread should
 		# be stopped
 		self.stopped = False
+		self.thread = None
 
 	def start(self):
 		# start the thread to read frames from the video stream
-		t = Thread(target=self.update, name=self.name, args=())
-		t.daemon = True
-		t.start()
+		self.thread = Thread(target=self.update, name=self.name, args=())
+		self.thread.daemon = True
+		self.thread.start()
 		return self
 
 	def update(self):
 		# keep looping infinitely until the thread is stopped
-		while True:
-			# if the thread indicator variable is set, stop the thread
-			if self.stopped:
-				return
-
+		while not self.stopped:
 			# otherwise, read the next frame from the stream
-			(self.grabbed, self.frame) = self.stream.read()
+			(grabbed, frame) = self.stream.read()
+			timestamp = _clock()
+
+			# publish the frame, and wake up the consumers waiting
+			# for a new one
+			with self.cond:
+				(self.grabbed, self.frame) = (grabbed, frame)
+				if grabbed:
+					self.seq += 1
+					self.timestamp = timestamp
+					self.cond.notify_all()
+
+			# do not spin on a camera which stopped delivering
+			if not grabbed:
+				time.sleep(0.01)
+
+		self.stream.release()
+
+	def read_info(self, wait_new=False, timeout=None, after=None):
+		# return (frame, seq, timestamp) of the frame most recently
+		# read; with `wait_new`, block until a frame newer than
+		# `after` (default: the last frame returned by read() or
+		# read_info()) arrives; if the timeout (in seconds) expires
+		# or the stream is stopped first, the frame is None
+		with self.cond:
+			if wait_new:
+				last = self._lastSeq if after is None else after
+				end = None if timeout is None else _clock() + timeout
+				while self.seq <= last:
+					remaining = None if end is None else end - _clock()
+					if self.stopped or (remaining is not None and
+						remaining <= 0):
+						return (None, self.seq, self.timestamp)
+					self.cond.wait(remaining)
+
+			self._lastSeq = self.seq
+			return (self.frame, self.seq, self.timestamp)
 
-	def read(self):
-		# return the frame most recently read
-		return self.frame
+	def read(self, wait_new=False, timeout=None):
+		# return the frame most recently read, see read_info()
+		return self.read_info(wait_new=wait_new, timeout=timeout)[0]
 
 	def stop(self):
-		# indicate that the thread should be stopped
+		# indicate that the thread should be stopped, wake up the
+		# consumers still waiting for a frame, and wait until the
+		# camera is released
 		self.stopped = True
+		with self.cond:
+			self.cond.notify_all()
+		if self.thread is not None and self.thread.is_alive():
+			self.thread.join()
@@ -10,6 +10,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 from show_shading3D import show_RGB_shading3D
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'raw_reader'))
+import cy_RawLoader as rawLoader
+
 
 '''
 from tkFileDialog import askopenfilename
@@ -219,7 +222,7 @@ def splitBayerRawU16(bayerdata, width, height, rawBits, bayerType):
     @Brief
         To split R/Gr/Gb/B components from Bayer Raw image input.
     @In
-        bayerdata   : Raw image input (from io.open/io.read)
+        bayerdata   : Raw image input, (H, W) view from cy_RawLoader.load_raw()
         width, height   : size of Raw image
         rawBits     : number of bits per pixel
     @Out
@@ -239,7 +242,7 @@ def splitBayerRawU16(bayerdata, width, height, rawBits, bayerType):
     btnRaw.config(bg='Coral')
     bitshift = rawBits-8
 
-    imgRaw = bayerdata.reshape(imgH, imgW)
+    imgRaw = bayerdata[0:imgH, 0:imgW]
     # saveRawGrayImage(imgRaw, bayerType)
 
     bayerImgC1 = imgRaw[0:imgH+1:2, 0:imgW+1:2] >> bitshift
@@ -301,10 +304,9 @@ def cbfnButtonOpenRaw():
 
     #print(rawfname)
     try:
-        # f = open(rawfname, 'rb')
-        # rawdata = f.read()
-        # f.close()
-        rawdata = np.fromfile(rawfname, dtype=np.uint16)
+        #-- memory-mapped, no file I/O until the pixels are touched
+        rawdata = rawLoader.load_raw(rawfname, int(txtlblRawWidth.get()),
+                                    int(txtlblRawHeight.get()), 16, bayerSelect.get())  #-- always uint16 containers
     except:
         messageBoxOK('FileIO', 'Failed to open file :\n' + rawfname)
         cbfnButtonReset()
@@ -9,6 +9,10 @@ import cv2
 import numpy as np
 # import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'raw_reader'))
+import cy_RawLoader as rawLoader
+import cy_RawBayer as rawBayer
+
 '''
 from tkFileDialog import askopenfilename
 
@@ -251,7 +255,7 @@ def splitBayerRawU16(bayerdata, width, height, rawBits, bayerType):
     @Brief
         To split R/Gr/Gb/B components from Bayer Raw image input.
     @In
-        bayerdata   : Raw image input (from io.open/io.read)
+        bayerdata   : Raw image input, (H, W) view from cy_RawLoader.load_raw()
         width, height   : size of Raw image
         rawBits     : number of bits per pixel
     @Out
@@ -259,12 +263,12 @@ def splitBayerRawU16(bayerdata, width, height, rawBits, bayerType):
     @Globals
         bayerImgC1, bayerImgC2, bayerImgC3, bayerImgC4 : sub-images of R/Gr/Gb/B.
             Size of sub-image is (widht/2, height/2).
+        gbayerMean, gbayerStats : mean, and mean/std/min/max/hist of the sub-images
     '''
     global bayerImgC1, bayerImgC2, bayerImgC3, bayerImgC4
 
     imgW, imgH = (int(width>>1))<<1, (int(height>>1)<<1)
     simgW, simgH =int(imgW>>1), int(imgH>>1)
-    bayerImgC1, bayerImgC2, bayerImgC3, bayerImgC4 = [np.zeros([simgH, simgW, 1], np.uint8) for x in range(4)]
 
     print("width %d -> %d, height %d -> %d" % (imgW, simgW, imgH, simgH))
 
@@ -272,51 +276,18 @@ def splitBayerRawU16(bayerdata, width, height, rawBits, bayerType):
     bitshift = rawBits-8
 
     #print("--- 1 ---")
-    imgRaw = bayerdata.reshape(imgH, imgW)
+    imgRaw = bayerdata[0:imgH, 0:imgW]
     #print("--- 1-1 ---")
     saveRawGrayImage(imgRaw, bayerType)
     #print("--- 2 ---")
 
-    global gbayerMean
-    gbayerMean = np.zeros(4, dtype=np.float)
-    if rawBits > 8:
-        bayerImg = imgRaw[0:imgH+1:2, 0:imgW+1:2]
-        gbayerMean[0] = bayerImg.mean()
-        bayerImgC1 = bayerImg >> bitshift
-
-        bayerImg = imgRaw[0:imgH+1:2, 1:imgW+1:2]
-        gbayerMean[1] = bayerImg.mean()
-        bayerImgC2 = bayerImg >> bitshift
-
-        bayerImg = imgRaw[1:imgH+1:2, 0:imgW+1:2]
-        gbayerMean[2] = bayerImg.mean()
-        bayerImgC3 = bayerImg >> bitshift
-
-        bayerImg = imgRaw[1:imgH+1:2, 1:imgW+1:2]
-        gbayerMean[3] = bayerImg.mean()
-        bayerImgC4 = bayerImg >> bitshift
-
-        #print("Bayer mean: {:.2f}".format(gbayerMean[0]))
-    else:
-        bayerImgC1 = imgRaw[0:imgH+1:2, 0:imgW+1:2]
-        gbayerMean[0] = bayerImgC1.mean()
-        print("Bayer mean: {:.2f}".format(gbayerMean[0]))
-        #print(bayImgC1[476:497, 612:633])
-
-        bayerImgC2 = imgRaw[0:imgH+1:2, 1:imgW+1:2]
-        gbayerMean[1] = bayerImgC2.mean()
-        print("Bayer mean: {:.2f}".format(gbayerMean[1]))
-        #print(bayImgC2[476:497, 612:633])
-
-        bayerImgC3 = imgRaw[1:imgH+1:2, 0:imgW+1:2]
-        gbayerMean[2] = bayerImgC3.mean()
-        print("Bayer mean: {:.2f}".format(gbayerMean[2]))
-        #print(bayImgC3[476:497, 612:633])
-
-        bayerImgC4 = imgRaw[1:imgH+1:2, 1:imgW+1:2]
-        gbayerMean[3] = bayerImgC4.mean()
-        print("Bayer mean: {:.2f}".format(gbayerMean[3]))
-        #print(bayImgC4[476:497, 612:633])
+    global gbayerMean, gbayerStats
+    #-- one pass: 8-bit planes for display/saving, statistics on the original pixels
+    bayerPlanes, gbayerStats = rawBayer.split_bayer(imgRaw, rawBits, shift=max(bitshift, 0))
+    bayerImgC1, bayerImgC2, bayerImgC3, bayerImgC4 = bayerPlanes
+    gbayerMean = gbayerStats['mean']
+    print("Bayer mean: ({:.2f}, {:.2f}, {:.2f}, {:.2f})".format(*gbayerMean))
+    print("Bayer std:  ({:.2f}, {:.2f}, {:.2f}, {:.2f})".format(*gbayerStats['std']))
 
 
 
@@ -376,13 +347,9 @@ def cbfnButtonOpenRaw():
     bits = int(txtlblRawBits.get())
     #print(rawfname)
     try:
-        # f = open(rawfname, 'rb')
-        # rawdata = f.read()
-        # f.close()
-        if bits > 8:
-            rawdata = np.fromfile(rawfname, dtype=np.uint16)
-        else:
-            rawdata = np.fromfile(rawfname, dtype=np.uint8)
+        #-- memory-mapped, no file I/O until the pixels are touched
+        rawdata = rawLoader.load_raw(rawfname, int(txtlblRawWidth.get()),
+                                    int(txtlblRawHeight.get()), bits, bayerSelect.get())
     except:
         messageBoxOK('FileIO', 'Failed to open file :\n' + rawfname)
         cbfnButtonReset()
@@ -7,80 +7,134 @@ import numpy as np
 import argparse
 import time
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'raw_reader'))
+import cy_RawUnpack as rawUnpack
+
+
+#-- output format : (bits, default right shift of the Amba pixels)
+mtkFormat_Table = {
+    'raw8'  : (8, 6),
+    'raw10' : (10, 4),
+}
 
 
 #---------------------------------------------------------------
-# __main__
+# Streaming converter
 #---------------------------------------------------------------
+def convert_amba2mtk(ambaRawFile, mtkRawFile, imgWidth, imgHeight, shift=None, outFmt='raw8',
+                     packing='mtk', blockRows=64):
+    """To convert an Amba RAW (uint16 containers) to MTK RAW8 / packed RAW10, block by block.
+
+    Only blockRows lines of input and output are held in memory at any time,
+    so the peak memory does not depend on the image size.
+
+    Arguments
+    ---------------
+    ambaRawFile, mtkRawFile: string
+        the input (Amba RAW) and output (MTK RAW) file names
+    imgWidth, imgHeight: integer
+        image size of the raw file
+    shift: integer
+        number of bits to right-shift the Amba pixels, None for the default of outFmt
+    outFmt: string
+        'raw8' or 'raw10'
+    packing: string
+        packing of RAW10 output, 'mtk' or 'mipi'
+    blockRows: integer
+        number of lines per block
+
+    Returns
+    ---------------
+    float
+        seconds spent
+    """
+    outBits, defShift = mtkFormat_Table[outFmt]
+    if shift is None:
+        shift = defShift
+    lineBytes = imgWidth * 2
+
+    fileBytes = os.path.getsize(ambaRawFile)
+    if fileBytes < lineBytes * imgHeight:
+        raise ValueError("file size {} is too small for {}x{} Amba RAW (needs {} bytes)".format(
+                            fileBytes, imgWidth, imgHeight, lineBytes * imgHeight))
+
+    #-- validate the output line (e.g., a RAW10 width must be a multiple of 4) before creating the file
+    rawUnpack.raw_line_bytes(imgWidth, outBits, packing if outBits > 8 else None)
+
+    t0 = time.perf_counter()
+    inBlock = np.empty((blockRows, imgWidth), '<u2')
+    outBlock = np.empty((blockRows, imgWidth), np.uint8 if outBits == 8 else np.uint16)
+    outMax = (1 << outBits) - 1
+
+    try:
+        with open(ambaRawFile, 'rb') as fin, open(mtkRawFile, 'wb') as fout:
+            for r0 in range(0, imgHeight, blockRows):
+                rows = min(blockRows, imgHeight - r0)
+                src = inBlock[:rows]
+                if fin.readinto(memoryview(src).cast('B')) != rows * lineBytes:
+                    raise IOError("unexpected end of file: " + ambaRawFile)
+
+                src >>= shift
+                np.minimum(src, outMax, out=src)
+                dst = outBlock[:rows]
+                np.copyto(dst, src, casting='unsafe')
+                #-- write the buffers directly, without a bytes copy of each block
+                if outBits == 8:
+                    fout.write(memoryview(dst))
+                else:
+                    fout.write(memoryview(rawUnpack.pack_raw(dst, outBits, packing)))
+    except Exception:
+        #-- do not leave a truncated output behind
+        if os.path.exists(mtkRawFile):
+            os.remove(mtkRawFile)
+        raise
+
+    return time.perf_counter() - t0
+
+
+def output_file_name(ambaRawFile, of, multiple):
+    """To get the output file name for an input; of is a folder for multiple inputs
+    """
+    if multiple or os.path.isdir(of):
+        srcBaseName, srcExtName = os.path.splitext(os.path.basename(ambaRawFile))
+        return os.path.join(of, srcBaseName + '_mtk' + srcExtName)
+    return of
+
 
 
-#----------------------
-# Argument Parse
-#----------------------
-if True:
-    #argParser = argparse.ArgumentParser(usage="An example to demonstrate edge detection using GaussianBlur and Canny algorithms.")
-    argParser = argparse.ArgumentParser(description='Convert Amba Raw to MTK Raw8.')
-    #argParser.add_argument("cascPath", help="path of cascade classifier for face detection")
-    argParser.add_argument("iff", type=str, help="the name of input file (Amba RAW)")
-    argParser.add_argument("of", type=str, help="the name of output file (MTK Raw8)")
+#---------------------------------------------------------------
+# __main__
+#---------------------------------------------------------------
+if __name__ == "__main__":
+    #----------------------
+    # Argument Parse
+    #----------------------
+    argParser = argparse.ArgumentParser(description='Convert Amba Raw to MTK Raw8 / packed Raw10.')
+    argParser.add_argument("iff", type=str, nargs='+', help="the name of input file(s) (Amba RAW)")
+    argParser.add_argument("of", type=str, help="the name of output file (MTK RAW), or a folder for multiple input files")
     argParser.add_argument("--width", default=2592, type=int, help="image width of the raw file")
     argParser.add_argument("--height", default=1944, type=int, help="image height of the raw file")
-    # argParser.add_argument("--camid", required=True, type=int, help="the ID number of the camera, default=0")
-    # argParser.add_argument("--delay", default=3, type=int, choices=range(2, 10), help="delay (sec) before starting detection and capture")
-    # argParser.add_argument("--skip", default=2, choices=range(1,10), type=int, help="skip inteval (sec) after one frame is processed ")
-    #argParser.add_argument("--ht", type=int, help="the high threshold of Canny detection")
+    argParser.add_argument("--format", default='raw8', choices=list(mtkFormat_Table), help="output format, default=raw8")
+    argParser.add_argument("--shift", type=int, help="bits to right-shift the Amba pixels, default=6 for raw8, 4 for raw10")
+    argParser.add_argument("--packing", default='mtk', choices=['mtk', 'mipi'], help="packing of raw10 output, default=mtk")
+    argParser.add_argument("--rows", default=64, type=int, help="number of lines per block, default=64")
     args = argParser.parse_args()
 
-    #-- DEBUG only
-    if False:
-        print('args.iff= ', args.iff)
-        print('args.of= ', args.of)
-
-
-#---------------------------------------------------------
-# Handle output directory
-#---------------------------------------------------------
-
-if False: #-- Debug ONLY !!
-    print('Amba RAW: ', args.iff)
-    srcPath = os.path.abspath(args.iff)
-    srcName = os.path.basename(args.iff)
-    srcBaseName, srcExtName = os.path.splitext(srcName)
-    print('Path: ', srcPath)
-    print('srcName={}, srcBaseName={}, srcExtname={}'.format(srcName, srcBaseName, srcExtName) )
-
-    print('MTK RAW: ', args.of)
-
-#-- read input file
-ambaRawFile = args.iff
-mtkRawFile = args.of
-imgWidth = args.width
-imgHeight = args.height
-print("Reading Amba RAW: {} image size: {}x{}".format(ambaRawFile, imgWidth, imgHeight))
-
-try:
-    # f = open(rawfname, 'rb')
-    # rawdata = f.read()
-    # f.close()
-    ambaRaw = np.fromfile(ambaRawFile, dtype=np.uint16)
-except:
-    print('Failed to open file : \n' + ambaRawFile)
-    exit()
-
-#-- reshape image to correct dimension
-# for a in ambaRaw[:10]:
-#     print('0x{:04x} '.format(a), end='')
-# print('\n')
-
-imgRaw = ambaRaw.reshape(imgHeight, imgWidth)
-mtkRaw = (imgRaw >> 6)
-mtkRaw = mtkRaw.astype(np.uint8)
-outRaw = mtkRaw.reshape(imgWidth * imgHeight)
-
-# for a in outRaw[:10]:
-#     print('0x{:04x} '.format(a), end='')
-# print('\n')
-
-#-- Write MTK Raw8 file
-print("Writing MTK RAW: {} ".format(mtkRawFile))
-outRaw.tofile(mtkRawFile)
+    multiple = len(args.iff) > 1
+    if multiple and not os.path.isdir(args.of):
+        os.makedirs(args.of)
+
+    nFail = 0
+    for ambaRawFile in args.iff:
+        mtkRawFile = output_file_name(ambaRawFile, args.of, multiple)
+        print("Converting Amba RAW: {} image size: {}x{} --> {}".format(ambaRawFile, args.width, args.height, mtkRawFile))
+        try:
+            dt = convert_amba2mtk(ambaRawFile, mtkRawFile, args.width, args.height,
+                                  args.shift, args.format, args.packing, args.rows)
+            print("    done in {:.3f} s".format(dt))
+        except Exception as e:
+            print('Failed to convert file : ' + ambaRawFile)
+            print(e)
+            nFail += 1
+
+    sys.exit(1 if nFail else 0)
@@ -0,0 +1,201 @@
+#!/usr/bin/python
+#-- encoding: utf-8 --
+
+import os, sys, time, functools
+
+import cv2
+import numpy as np
+
+import cy_RawLoader as rawLoader
+import cy_RawBayer as rawBayer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cyModules'))
+import cy_BatchRunner as batchRunner
+
+
+bayer2gray_code = {
+    0: cv2.COLOR_BAYER_BG2GRAY,
+    1: cv2.COLOR_BAYER_GB2GRAY,
+    2: cv2.COLOR_BAYER_GR2GRAY,
+    3: cv2.COLOR_BAYER_RG2GRAY
+}
+
+bayer2bgr_code = {
+    0: cv2.COLOR_BAYER_BG2BGR,
+    1: cv2.COLOR_BAYER_GB2BGR,
+    2: cv2.COLOR_BAYER_GR2BGR,
+    3: cv2.COLOR_BAYER_RG2BGR
+}
+
+#-- color name : BGR channels to be cleared in the split bayer images
+bayerColor_Clear = {
+    'R'     : (0, 1),
+    'Gr'    : (0, 2),
+    'Gb'    : (0, 2),
+    'B'     : (1, 2),
+}
+
+bayerCode_Table = {
+    'R'     : 0,
+    'Gr'    : 1,
+    'Gb'    : 2,
+    'B'     : 3
+}
+
+
+def bayer_code(bayer):
+    """To get bayer code (R=0, Gr=1, Gb=2, B=3) from a code or a color name
+    """
+    if isinstance(bayer, str) and not bayer.isdigit():
+        return bayerCode_Table[bayer]
+    return int(bayer)
+
+
+###########################################################
+# Collect RAW files
+###########################################################
+def find_raw_files(target, pattern="*.raw"):
+    """To list RAW files of a directory, a glob pattern, or a single file
+
+    Arguments
+    ---------------
+    target: string
+        a directory (searched with pattern), a glob (e.g. 'captures/*_14BR.raw'), or a file name
+    pattern: string
+        the file pattern used when target is a directory
+
+    Returns
+    ---------------
+    list of file names, sorted
+    """
+    return batchRunner.find_files(target, [pattern])
+
+
+
+###########################################################
+# Convert one RAW file
+###########################################################
+def _save_image(fname, img, jpgQuality):
+    params = [cv2.IMWRITE_JPEG_QUALITY, jpgQuality] if fname.lower().endswith(('.jpg', '.jpeg')) else []
+    if not cv2.imwrite(fname, img, params):
+        raise IOError("failed to write " + fname)
+
+
+def convert_raw_file(rawFile, rawFmt, outDir=None, ext=".jpg", saveGray=True, saveRGB=True, saveBayer=True,
+                    jpgQuality=95):
+    """To convert one RAW image to gray, RGB and split bayer images.
+
+    Arguments
+    ---------------
+    rawFile: string
+        the RAW image file
+    rawFmt: dict
+        'width', 'height', 'bits', 'bayer', and optional 'stride', 'offset', 'packing',
+        see cy_RawLoader.load_raw_format()
+    outDir: string
+        output folder, None for <folder of rawFile>/_imageRepo/<base name>
+    ext: string
+        '.jpg' or '.png'
+
+    Returns
+    ---------------
+    dict
+        'file', 'seconds', 'mean' (R/Gr/Gb/B), 'outputs', and 'error' (None if succeeded)
+    """
+    t0 = time.perf_counter()
+    result = { 'file': rawFile, 'seconds': 0.0, 'mean': None, 'outputs': [], 'error': None }
+    try:
+        base = os.path.splitext(os.path.basename(rawFile))[0]
+        if outDir is None:
+            outDir = os.path.join(os.path.dirname(os.path.abspath(rawFile)), "_imageRepo", base)
+        os.makedirs(outDir, exist_ok=True)
+        outBase = os.path.join(outDir, base)
+
+        fmt = dict(rawFmt)
+        fmt['bayer'] = bayer_code(fmt.get('bayer', 3))
+        rawImg = rawLoader.load_raw_format(rawFile, fmt)
+        bits, bayer = rawImg.bits, rawImg.bayer
+        pixels = rawImg.data if rawImg.packing is None else rawImg.unpack()
+
+        imgW, imgH = (rawImg.width>>1)<<1, (rawImg.height>>1)<<1
+        pixels = np.ascontiguousarray(pixels[0:imgH, 0:imgW])
+        shift = max(bits-8, 0)
+
+        if saveGray:
+            matGray = cv2.cvtColor(pixels, bayer2gray_code[bayer])
+            if shift:
+                matGray = (matGray >> shift).astype(np.uint8)
+            fname = outBase + "_RAW_Gray" + ext
+            _save_image(fname, matGray, jpgQuality)
+            result['outputs'].append(fname)
+
+        if saveRGB:
+            matBGR = cv2.cvtColor(pixels, bayer2bgr_code[bayer])
+            if shift:
+                matBGR = (matBGR >> shift).astype(np.uint8)
+            fname = outBase + "_RAW_RGB" + ext
+            _save_image(fname, matBGR, jpgQuality)
+            result['outputs'].append(fname)
+
+        planes, stats = rawBayer.split_bayer(pixels, bits, shift=shift)
+        names = rawBayer.bayerPlane_Names[bayer]
+        if saveBayer:
+            for plane, name in zip(planes, names):
+                matImg = cv2.cvtColor(plane.astype(np.uint8, copy=False), cv2.COLOR_GRAY2BGR)
+                for ch in bayerColor_Clear[name]:
+                    matImg[:, :, ch] = 0
+                fname = outBase + "_RAW_" + name + ext
+                _save_image(fname, matImg, jpgQuality)
+                result['outputs'].append(fname)
+
+        result['mean'] = [float(stats['mean'][i]) for i in rawBayer.bayer_plane_index(bayer)]
+        rawImg.close()
+    except Exception as e:
+        result['error'] = "{}: {}".format(type(e).__name__, e)
+
+    result['seconds'] = time.perf_counter() - t0
+    return result
+
+
+
+###########################################################
+# Batch conversion over a process pool
+###########################################################
+def batch_convert(files, rawFmt, jobs=None, verbose=True, **kwargs):
+    """To convert RAW files in parallel with a ProcessPoolExecutor.
+
+    Arguments
+    ---------------
+    files: list of string
+        the RAW image files
+    rawFmt: dict
+        the RAW format, see convert_raw_file()
+    jobs: integer
+        number of worker processes, None for os.cpu_count()
+    verbose: boolean
+        if True, print the timing of each file and the overall files/s
+    kwargs:
+        passed to convert_raw_file(), e.g., outDir, ext, saveGray, saveRGB, saveBayer
+
+    Returns
+    ---------------
+    list of result dict of convert_raw_file(), in the order of files
+    """
+    t0 = time.perf_counter()
+    results = batchRunner.run_batch(functools.partial(convert_raw_file, **kwargs), files, [rawFmt] * len(files),
+                                    jobs=jobs, progress=_print_result if verbose else None)
+
+    if verbose:
+        dt = time.perf_counter() - t0
+        nFail = sum(1 for r in results if r['error'])
+        print("--- {} files in {:.2f} s, {:.2f} files/s, {} failed".format(
+                len(files), dt, len(files) / dt if dt > 0 else 0.0, nFail))
+    return results
+
+
+def _print_result(n, total, result):
+    if result['error']:
+        print("[{}/{}] {}: FAILED, {}".format(n, total, result['file'], result['error']))
+    else:
+        print("[{}/{}] {}: {:.3f} s, mean (R/Gr/Gb/B): ({:.1f}, {:.1f}, {:.1f}, {:.1f})".format(
+                n, total, result['file'], result['seconds'], *result['mean']))
@@ -0,0 +1,125 @@
+#!/usr/bin/python
+#-- encoding: utf-8 --
+
+import os, sys
+
+import numpy as np
+
+
+#-- Bayer planes are in position order: C1=(0,0), C2=(0,1), C3=(1,0), C4=(1,1)
+bayerPlane_Offset = ((0, 0), (0, 1), (1, 0), (1, 1))
+
+#-- bayer code (R=0, Gr=1, Gb=2, B=3) : color names of C1 ~ C4
+bayerPlane_Names = {
+    0: ('R', 'Gr', 'Gb', 'B'),
+    1: ('Gr', 'R', 'B', 'Gb'),
+    2: ('Gb', 'B', 'R', 'Gr'),
+    3: ('B', 'Gb', 'Gr', 'R'),
+}
+
+
+def bayer_plane_index(bayer):
+    """To get the indexes of plane R, Gr, Gb, B for a bayer code
+
+    Returns
+    ---------------
+    (iR, iGr, iGb, iB)
+    """
+    names = bayerPlane_Names[bayer]
+    return tuple(names.index(c) for c in ('R', 'Gr', 'Gb', 'B'))
+
+
+def _stats_from_histogram(hist):
+    """To derive count, mean, std, min, max of each row of a (4, bins) histogram
+    """
+    hist = hist.astype(np.float64)
+    values = np.arange(hist.shape[1], dtype=np.float64)
+    count = hist.sum(axis=1)
+    count[count == 0] = 1
+    mean = hist.dot(values) / count
+    var = hist.dot(values * values) / count - mean * mean
+    std = np.sqrt(np.maximum(var, 0))
+
+    nonzero = hist > 0
+    vmin = np.argmax(nonzero, axis=1)
+    vmax = hist.shape[1] - 1 - np.argmax(nonzero[:, ::-1], axis=1)
+    return mean, std, vmin, vmax
+
+
+def split_bayer(raw, bits, shift=0, out=None, blockRows=32):
+    """To split the R/Gr/Gb/B planes of a Bayer RAW image and gather their statistics in one pass.
+
+    The image is processed in blocks of rows; each block is copied once into the plane outputs
+    and histogrammed while it is still in the CPU cache. mean/std/min/max are derived from the
+    histograms, so the RAW data is read from memory exactly once.
+
+    Arguments
+    ---------------
+    raw: np.ndarray (H, W)
+        uint8 or uint16 RAW pixels, LSB-aligned (e.g. from cy_RawLoader); odd last row/column is ignored
+    bits: integer
+        number of bits per pixel, sets the number of histogram bins (1 << bits)
+    shift: integer
+        number of bits to right-shift the plane outputs, e.g. bits-8 for 8-bit display images
+    out: np.ndarray (4, H/2, W/2)
+        optional preallocated plane outputs, uint8 if (bits - shift) <= 8 else uint16
+    blockRows: integer
+        number of plane rows per block
+
+    Returns
+    ---------------
+    (planes, stats)
+        planes: np.ndarray (4, H/2, W/2), planes C1 ~ C4 in position order (see bayerPlane_Names)
+        stats: dict of per-plane arrays, 'mean', 'std', 'min', 'max' of shape (4,)
+            and 'hist' of shape (4, 1 << bits); values beyond the bits are counted in the last bin.
+            Statistics are calculated on the pixels before shifting.
+            In the planes, values beyond the bits are clipped to (1 << bits) - 1.
+    """
+    raw = np.asarray(raw)
+    if raw.dtype not in (np.uint8, np.uint16):
+        raise ValueError("unsupported RAW dtype: {}".format(raw.dtype))
+    sH, sW = raw.shape[0] >> 1, raw.shape[1] >> 1
+    outDtype = np.uint8 if bits - shift <= 8 else np.uint16
+    if out is None:
+        out = np.empty((4, sH, sW), outDtype)
+    elif out.shape != (4, sH, sW):
+        raise ValueError("output must be of shape {}".format((4, sH, sW)))
+
+    #-- exact histograms over the whole container range, folded to 1 << bits at the end
+    fullBins = 1 << (8 * raw.dtype.itemsize)
+    hist = np.zeros((4, fullBins), np.int64)
+    blockRows = max(1, int(blockRows))
+    block = np.empty((blockRows, sW), raw.dtype)
+    #-- the largest valid pixel, larger values would wrap around in a narrower output
+    maxVal = (1 << bits) - 1 if bits < 8 * raw.dtype.itemsize else None
+
+    for r0 in range(0, sH, blockRows):
+        r1 = min(r0 + blockRows, sH)
+        rows = r1 - r0
+        tmp = block[:rows]
+        for c, (dy, dx) in enumerate(bayerPlane_Offset):
+            np.copyto(tmp, raw[2*r0+dy:2*r1:2, dx:2*sW:2])
+            counts = np.bincount(tmp.ravel())
+            hist[c, :counts.size] += counts
+            if maxVal is not None and counts.size > maxVal + 1:
+                np.minimum(tmp, maxVal, out=tmp)
+            if shift:
+                np.right_shift(tmp, shift, out=out[c, r0:r1], casting='unsafe')
+            else:
+                np.copyto(out[c, r0:r1], tmp, casting='unsafe')
+
+    mean, std, vmin, vmax = _stats_from_histogram(hist)
+
+    nbins = 1 << bits
+    if nbins < fullBins:
+        hist[:, nbins-1] += hist[:, nbins:].sum(axis=1)
+        hist = hist[:, :nbins]
+
+    stats = {
+        'mean'  : mean,
+        'std'   : std,
+        'min'   : vmin,
+        'max'   : vmax,
+        'hist'  : hist,
+    }
+    return out, stats
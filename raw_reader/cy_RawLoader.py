@@ -0,0 +1,209 @@
+#!/usr/bin/python
+#-- encoding: utf-8 --
+
+import os, sys
+
+import numpy as np
+
+import cy_RawUnpack as rawUnpack
+
+
+#--------------------------------------
+# Helpers
+#--------------------------------------
+def raw_bytes_per_pixel(bits):
+    """To get the container size (in bytes) of one unpacked RAW pixel
+
+    Arguments
+    ---------------
+    bits: integer
+        number of bits per pixel, 8 ~ 16
+
+    Returns
+    ---------------
+    integer
+        1 for 8-bit RAW, 2 for 9 ~ 16-bit RAW (uint16 little-endian containers)
+    """
+    if bits < 1 or bits > 16:
+        raise ValueError("unsupported pixel bits: {}".format(bits))
+    return 1 if bits <= 8 else 2
+
+
+def raw_dtype(bits):
+    """To get the numpy dtype of the unpacked RAW container
+    """
+    return np.dtype(np.uint8) if raw_bytes_per_pixel(bits) == 1 else np.dtype('<u2')
+
+
+
+#--------------------------------------
+# Class: RawImage
+#--------------------------------------
+class RawImage():
+    """A class to describe a RAW image file which is mapped into memory.
+
+    Opening a RawImage costs no file I/O, the pixels are paged in by the OS
+    only when they are actually touched (e.g., by slicing, cv2.cvtColor, ...).
+
+    Attributes
+    -----------
+    fname: string
+        the file name of the RAW image
+    width, height: integer
+        the size of the RAW image, in pixels
+    bits: integer
+        number of bits per pixel
+    bayer: integer
+        bayer code of the starting pixel: R=0, Gr=1, Gb=2, B=3
+    stride: integer
+        number of bytes per line, including the padding at end of line
+    offset: integer
+        number of bytes of the file header to skip
+    packing: string
+        one of cy_RawUnpack.RAW_PACKINGS, None for LSB-aligned uint8/uint16 containers
+    data: np.ndarray
+        the read-only view backed by np.memmap,
+        (H, W) pixels if packing is None, otherwise (H, lineBytes) uint8 of the packed lines
+
+
+    Methods
+    -----------
+    unpack(out=None, verbose=False) --> (H, W) uint16
+        To decode the pixels of any packing to LSB-aligned uint16
+    close()
+        To release the memory mapping of the file
+    """
+    def __init__(self, fname, width, height, bits=10, bayer=3, stride=None, offset=0, packing=None):
+        """Map a RAW image file into memory.
+
+        Arguments
+        ---------------
+        fname: string
+            the file name of the RAW image
+        width, height: integer
+            the size of the RAW image
+        bits: integer
+            number of bits per pixel, 8-bit RAW is stored in uint8, otherwise in uint16 (little-endian)
+        bayer: integer
+            bayer code of the starting pixel: R=0, Gr=1, Gb=2, B=3
+        stride: integer
+            number of bytes per line, None for no line padding
+        offset: integer
+            number of bytes of the file header to skip
+        packing: string
+            None, 'amba' (MSB-aligned uint16), 'mipi' or 'mtk' (packed RAW10/12/14)
+
+        Raises
+        ---------------
+        ValueError
+            if the format is invalid or the file is too small for the format
+        """
+        if bayer not in (0, 1, 2, 3):
+            raise ValueError("unsupported bayer code: {}".format(bayer))
+
+        width, height, offset = int(width), int(height), int(offset)
+        lineBytes = rawUnpack.raw_line_bytes(width, bits, packing)
+        if packing is None:
+            dtype = raw_dtype(bits)
+            cols = width
+        else:
+            dtype = np.dtype(np.uint8)
+            cols = lineBytes
+        bpp = dtype.itemsize
+        if stride is None:
+            stride = lineBytes
+        stride = int(stride)
+
+        if width <= 0 or height <= 0:
+            raise ValueError("invalid image size: {}x{}".format(width, height))
+        if stride < lineBytes or stride % bpp:
+            raise ValueError("invalid stride {} for lines of {} bytes".format(stride, lineBytes))
+        if offset < 0:
+            raise ValueError("invalid header offset: {}".format(offset))
+
+        #-- the last line does not need its padding
+        needBytes = offset + stride * (height-1) + lineBytes
+        fileBytes = os.path.getsize(fname)
+        if fileBytes < needBytes:
+            raise ValueError("file size {} is too small for {}x{} {}-bit RAW (needs {} bytes)".format(
+                                fileBytes, width, height, bits, needBytes))
+
+        self.fname = fname
+        self.width, self.height = width, height
+        self.bits = bits
+        self.bayer = bayer
+        self.stride = stride
+        self.offset = offset
+        self.packing = packing
+
+        if stride == lineBytes:
+            self._mmap = np.memmap(fname, dtype=dtype, mode='r', offset=offset, shape=(height, cols))
+            self.data = self._mmap
+        else:
+            count = (needBytes - offset) // bpp
+            self._mmap = np.memmap(fname, dtype=dtype, mode='r', offset=offset, shape=(count,))
+            self.data = np.lib.stride_tricks.as_strided(self._mmap, shape=(height, cols),
+                                                        strides=(stride, bpp), writeable=False)
+
+
+    def unpack(self, out=None, verbose=False):
+        """To decode the pixels to a (H, W) uint16 array with LSB-aligned values.
+
+        Arguments
+        ---------------
+        out: np.ndarray (H, W) uint16
+            optional preallocated output
+        verbose: boolean
+            if True, print the unpacking throughput in MB/s
+
+        Returns
+        ---------------
+        np.ndarray (H, W) uint16
+        """
+        return rawUnpack.unpack_raw(self.data, self.width, self.height, self.bits, self.packing,
+                                    out=out, verbose=verbose)
+
+
+    def close(self):
+        """To release the memory mapping, it is unmapped once no view of data is alive.
+        """
+        self.data = None
+        self._mmap = None
+
+
+
+def load_raw(fname, width, height, bits=10, bayer=3, stride=None, offset=0, packing=None, verbose=False):
+    """To open a RAW image file as a (H, W) pixel array.
+
+    Unpacked RAW (packing=None) is returned as a zero-copy view backed by np.memmap,
+    packed or MSB-aligned RAW is decoded to a new uint16 array.
+    See RawImage for the arguments, verbose prints the unpacking throughput.
+
+    Returns
+    ---------------
+    np.ndarray (H, W)
+        uint8 for unpacked 8-bit RAW, uint16 otherwise
+    """
+    rawImg = RawImage(fname, width, height, bits, bayer, stride, offset, packing)
+    if packing is None:
+        return rawImg.data
+    return rawImg.unpack(verbose=verbose)
+
+
+def load_raw_format(fname, rawFmt):
+    """To open a RAW image file with a format dictionary, e.g., the one loaded from raw_format.json.
+
+    Arguments
+    ---------------
+    rawFmt: dict
+        with keys 'width', 'height', 'bits' (or 'pixel_bits'), 'bayer',
+        and optional 'stride', 'offset', 'packing'
+
+    Returns
+    ---------------
+    RawImage
+    """
+    bits = rawFmt.get('bits', rawFmt.get('pixel_bits', 10))
+    return RawImage(fname, rawFmt['width'], rawFmt['height'], bits,
+                    rawFmt.get('bayer', 3), rawFmt.get('stride'), rawFmt.get('offset', 0),
+                    rawFmt.get('packing'))
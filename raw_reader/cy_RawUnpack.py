@@ -0,0 +1,241 @@
+#!/usr/bin/python
+#-- encoding: utf-8 --
+
+import os, sys, time
+
+import numpy as np
+
+
+#--------------------------------------
+# Packing formats
+#--------------------------------------
+#-- None  : unpacked, LSB-aligned uint8 (8-bit) or uint16 little-endian containers
+#-- 'amba': unpacked, MSB-aligned uint16 little-endian containers (Ambarella)
+#-- 'mipi': MIPI CSI-2 RAW10/12/14, MSBs of each pixel first, LSBs gathered in the last byte(s) of a group
+#-- 'mtk' : MediaTek packed RAW10/12/14, a continuous little-endian bit stream
+RAW_PACKINGS = (None, 'amba', 'mipi', 'mtk')
+
+#-- bits : (pixels, bytes) of a packed group
+packedGroup_Table = {
+    10: (4, 5),
+    12: (2, 3),
+    14: (4, 7),
+}
+
+
+def raw_packing_check(bits, packing):
+    """To validate the combination of pixel bits and packing format
+
+    Raises
+    ---------------
+    ValueError
+        if the packing is unknown or not supported for the bits
+    """
+    if packing not in RAW_PACKINGS:
+        raise ValueError("unknown RAW packing: {}".format(packing))
+    if bits < 1 or bits > 16:
+        raise ValueError("unsupported pixel bits: {}".format(bits))
+    if packing in ('mipi', 'mtk') and bits not in packedGroup_Table:
+        raise ValueError("{} packing supports RAW10/12/14 only, not RAW{}".format(packing, bits))
+    if packing == 'amba' and bits <= 8:
+        raise ValueError("amba packing needs more than 8 bits per pixel")
+
+
+def raw_line_bytes(width, bits, packing=None):
+    """To get number of bytes of one image line without padding
+
+    Arguments
+    ---------------
+    width: integer
+        number of pixels per line, must be a multiple of the group size for packed formats
+    bits: integer
+        number of bits per pixel
+    packing: string
+        one of RAW_PACKINGS
+
+    Returns
+    ---------------
+    integer
+    """
+    raw_packing_check(bits, packing)
+    if packing in ('mipi', 'mtk'):
+        gPixels, gBytes = packedGroup_Table[bits]
+        if width % gPixels:
+            raise ValueError("width {} is not a multiple of {} for packed RAW{}".format(width, gPixels, bits))
+        return (width // gPixels) * gBytes
+    if packing == 'amba' or bits > 8:
+        return width * 2
+    return width
+
+
+
+#--------------------------------------
+# Unpackers: (H, lineBytes) uint8 --> (H, W) uint16
+#--------------------------------------
+def _unpack_mipi(buf, out, bits):
+    gPixels, gBytes = packedGroup_Table[bits]
+    grp = buf.reshape(buf.shape[0], -1, gBytes)
+    pix = out.reshape(out.shape[0], -1, gPixels)
+    lsbBits = bits - 8
+    lsbMask = (1 << lsbBits) - 1
+    #-- one pass per pixel position of a group, each over all the groups of the image
+    for i in range(gPixels):
+        p = pix[..., i]
+        p[...] = grp[..., i]
+        p <<= lsbBits
+        k, s = divmod(lsbBits * i, 8)
+        lsb = grp[..., gPixels + k] >> s
+        if s + lsbBits > 8:
+            lsb |= grp[..., gPixels + k + 1] << (8 - s)
+        lsb &= lsbMask
+        p |= lsb
+
+
+def _unpack_mtk(buf, out, bits):
+    gPixels, gBytes = packedGroup_Table[bits]
+    grp = buf.reshape(buf.shape[0], -1, gBytes)
+    pix = out.reshape(out.shape[0], -1, gPixels)
+    #-- pixel i takes the bits [bits*i, bits*(i+1)) of the little-endian bit stream of a group
+    for i in range(gPixels):
+        p = pix[..., i]
+        k, s = divmod(bits * i, 8)
+        p[...] = grp[..., k]
+        p >>= s
+        got = 8 - s
+        while got < bits:
+            k += 1
+            t = grp[..., k].astype(np.uint16)
+            t <<= got
+            p |= t
+            got += 8
+        p &= (1 << bits) - 1
+
+
+def unpack_raw(buf, width, height, bits, packing=None, out=None, verbose=False):
+    """To unpack a RAW image into LSB-aligned uint16 pixels, fully vectorized.
+
+    Arguments
+    ---------------
+    buf: np.ndarray
+        the RAW data; either a flat buffer, or a (H, stride) uint8 view (e.g. from cy_RawLoader)
+        with stride >= raw_line_bytes(); line padding is skipped.
+    width, height: integer
+        the size of the RAW image
+    bits: integer
+        number of bits per pixel
+    packing: string
+        one of RAW_PACKINGS
+    out: np.ndarray (H, W) uint16
+        optional preallocated output
+    verbose: boolean
+        if True, print the unpacking throughput in MB/s (of packed input)
+
+    Returns
+    ---------------
+    np.ndarray (H, W) uint16
+    """
+    lineBytes = raw_line_bytes(width, bits, packing)
+    if out is None:
+        out = np.empty((height, width), np.uint16)
+    elif out.shape != (height, width) or out.dtype != np.uint16:
+        raise ValueError("output must be a ({}, {}) uint16 array".format(height, width))
+
+    t0 = time.perf_counter()
+    buf = np.asarray(buf)
+    if buf.dtype != np.uint8:
+        buf = buf.view(np.uint8)
+    if buf.ndim == 1:
+        if buf.size < lineBytes * height:
+            raise ValueError("buffer of {} bytes is too small, needs {}".format(buf.size, lineBytes * height))
+        buf = buf[:lineBytes * height].reshape(height, lineBytes)
+    else:
+        if buf.shape[0] < height or buf.shape[1] < lineBytes:
+            raise ValueError("buffer of {} is too small, needs ({}, {})".format(buf.shape, height, lineBytes))
+        buf = buf[:height, :lineBytes]
+
+    if packing == 'mipi':
+        _unpack_mipi(buf, out, bits)
+    elif packing == 'mtk':
+        _unpack_mtk(buf, out, bits)
+    else:
+        pix = buf.view('<u2') if lineBytes == width * 2 else buf
+        if packing == 'amba':
+            np.right_shift(pix, 16 - bits, out=out)
+        else:
+            out[...] = pix
+
+    if verbose:
+        dt = time.perf_counter() - t0
+        mb = lineBytes * height / 1e6
+        print("unpack RAW{} ({}): {:.1f} MB in {:.2f} ms, {:.0f} MB/s".format(
+                bits, packing, mb, dt * 1e3, mb / dt if dt > 0 else float('inf')))
+
+    return out
+
+
+
+#--------------------------------------
+# Packers: for test pattern generation and RAW format conversion
+#--------------------------------------
+def pack_raw(img, bits, packing):
+    """To pack LSB-aligned (H, W) pixels to a (H, lineBytes) uint8 array, the inverse of unpack_raw().
+    """
+    height, width = img.shape
+    lineBytes = raw_line_bytes(width, bits, packing)
+    img = np.asarray(img, np.uint16) & np.uint16((1 << bits) - 1)
+
+    if packing == 'mipi':
+        gPixels, gBytes = packedGroup_Table[bits]
+        lsbBits = bits - 8
+        pix = img.reshape(height, -1, gPixels)
+        grp = np.empty(pix.shape[:2] + (gBytes,), np.uint8)
+        grp[..., :gPixels] = pix >> lsbBits
+        lsb = np.zeros(pix.shape[:2], np.uint32)
+        for i in range(gPixels):
+            lsb |= (pix[..., i].astype(np.uint32) & ((1 << lsbBits) - 1)) << (lsbBits * i)
+        for k in range(gBytes - gPixels):
+            grp[..., gPixels + k] = (lsb >> (8 * k)) & 0xFF
+        return grp.reshape(height, lineBytes)
+
+    if packing == 'mtk':
+        gPixels, gBytes = packedGroup_Table[bits]
+        pix = img.reshape(height, -1, gPixels).astype(np.uint64)
+        word = np.zeros(pix.shape[:2], np.uint64)
+        for i in range(gPixels):
+            word |= pix[..., i] << np.uint64(bits * i)
+        return word[..., None].view(np.uint8)[..., :gBytes].reshape(height, lineBytes)
+
+    if packing == 'amba':
+        img = img << np.uint16(16 - bits)
+    if lineBytes == width:
+        return img.astype(np.uint8)
+    return img.astype('<u2').view(np.uint8).reshape(height, lineBytes)
+
+
+
+#---------------------------------------------------------------
+# __main__ : throughput benchmark
+#---------------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark of the packed RAW unpackers.')
+    parser.add_argument("-w", "--width", default=4000, type=int, help='the width of the test image')
+    parser.add_argument("--height", default=3000, type=int, help='the height of the test image')
+    parser.add_argument("--loops", default=5, type=int, help='number of unpacking per format')
+    args = parser.parse_args()
+
+    out = np.empty((args.height, args.width), np.uint16)
+    for bits in (10, 12, 14):
+        src = np.random.randint(0, 1 << bits, (args.height, args.width)).astype(np.uint16)
+        for packing in RAW_PACKINGS[1:]:
+            buf = pack_raw(src, bits, packing)
+            best = None
+            for n in range(args.loops):
+                t0 = time.perf_counter()
+                unpack_raw(buf, args.width, args.height, bits, packing, out=out)
+                dt = time.perf_counter() - t0
+                best = dt if best is None else min(best, dt)
+            ok = np.array_equal(out, src)
+            print("RAW{:<2} {:>4}: {:7.0f} MB/s, {:6.1f} Mpix/s  {}".format(
+                    bits, packing, buf.nbytes / 1e6 / best, src.size / 1e6 / best, 'OK' if ok else 'MISMATCH'))
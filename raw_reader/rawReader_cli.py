@@ -1,7 +1,7 @@
 #!/usr/bin/python
 #-- encoding: utf-8 --
 
-import os, sys, platform
+import os, sys, platform, glob
 
 import argparse
 import cv2
@@ -23,6 +23,7 @@ if platform.system() == 'Linux':
 
 import cy_OSUTIL as cyOS
 import cy_RawIMGUTIL as cySocRaw
+import cy_RawBatch as rawBatch
 
 
 gImgRepoRoot = repr(os.getcwd())
@@ -98,6 +99,12 @@ def conf_json_load(strJson):
         gRawFormat["height"] = jsonDict["height"]
         gRawFormat["bits"] = jsonDict["bits"]
         gRawFormat["bayer"] = jsonDict["bayer"]
+        for key in ("packing", "stride", "offset"):
+            if key in jsonDict:
+                gRawFormat[key] = jsonDict[key]
+        for key in gProgConf:
+            if key in jsonDict:
+                gProgConf[key] = jsonDict[key]
 
     return jsonDict
 
@@ -134,7 +141,7 @@ if __name__ == "__main__":
     #-------------------------------------
     argparse.ArgumentParser()
     parser = argparse.ArgumentParser(add_help=False)
-    parser.add_argument('rawImg', help="input RAW image file name")
+    parser.add_argument('rawImg', help="input RAW image file name; a directory or a glob (quoted) runs the batch mode")
     parser.add_argument('--gui', nargs='?', const=1, type=int, default=0, help='JSON file for default RAW format.')
     parser.add_argument('--conf', help='JSON file for default RAW format.')
     parser.add_argument("-w", "--width", type=int, help='the width of the RAW image')
@@ -143,6 +150,12 @@ if __name__ == "__main__":
     parser.add_argument("--bits", type=int, help='number of bits per pixel')
     parser.add_argument("--scale", type=int, help="percentage to downscale while generating output images, e.g., 30 stands for 30%%.")
     parser.add_argument("--ROI", help='+x+y*w+h to specify ROI of RAW image.')
+    parser.add_argument("--packing", choices=['amba', 'mipi', 'mtk'], help='packing of the RAW data, default: LSB-aligned uint8/uint16')
+    parser.add_argument("--batch", action='store_true', help='batch mode even if rawImg is a single file')
+    parser.add_argument("--pattern", default="*.raw", help='file pattern of the RAW images in a directory (batch mode)')
+    parser.add_argument("--jobs", type=int, help='number of worker processes (batch mode), default: number of CPUs')
+    parser.add_argument("--outdir", help='output folder (batch mode), default: <RAW folder>/_imageRepo/<RAW name>')
+    parser.add_argument("--ext", choices=['jpg', 'png'], default='jpg', help='output image format (batch mode)')
     args = parser.parse_args()
 
     # print(args.conf)
@@ -159,6 +172,26 @@ if __name__ == "__main__":
     if args.bayer:
         gRawFormat["bayer"]     = args.bayer
 
+    if args.packing:
+        gRawFormat["packing"]   = args.packing
+
+    #-------------------------------------
+    # Batch mode: headless, converts every RAW over a process pool
+    #-------------------------------------
+    if args.batch or os.path.isdir(args.rawImg) or glob.has_magic(args.rawImg):
+        rawFiles = rawBatch.find_raw_files(args.rawImg, args.pattern)
+        if not rawFiles:
+            print("Error: no RAW image found ... ", args.rawImg)
+            sys.exit(1)
+
+        print("Converting {} RAW images ...".format(len(rawFiles)))
+        results = rawBatch.batch_convert(rawFiles, gRawFormat, jobs=args.jobs,
+                                        outDir=args.outdir, ext='.'+args.ext,
+                                        saveGray=gProgConf["saveRawGray"],
+                                        saveRGB=gProgConf["saveRawRGB"],
+                                        saveBayer=gProgConf["saveBayerColor"])
+        sys.exit(1 if any(r['error'] for r in results) else 0)
+
     #-------------------------------------
     # Initialize globals
     #-------------------------------------
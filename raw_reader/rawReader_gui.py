@@ -7,6 +7,8 @@ from tkinter import filedialog
 import cv2
 
 import numpy as np
+import cy_RawLoader as rawLoader
+import cy_RawBayer as rawBayer
 # import matplotlib.pyplot as plt
 
 '''
@@ -259,7 +261,7 @@ def splitBayerRawU16(bayerdata, width, height, rawBits, bayerType):
     @Brief
         To split R/Gr/Gb/B components from Bayer Raw image input.
     @In
-        bayerdata   : Raw image input (from io.open/io.read)
+        bayerdata   : Raw image input, (H, W) view from cy_RawLoader.load_raw()
         width, height   : size of Raw image
         rawBits     : number of bits per pixel
     @Out
@@ -267,12 +269,12 @@ def splitBayerRawU16(bayerdata, width, height, rawBits, bayerType):
     @Globals
         bayerImgC1, bayerImgC2, bayerImgC3, bayerImgC4 : sub-images of R/Gr/Gb/B.
             Size of sub-image is (widht/2, height/2).
+        gbayerMean, gbayerStats : mean, and mean/std/min/max/hist of the sub-images
     '''
     global bayerImgC1, bayerImgC2, bayerImgC3, bayerImgC4
 
     imgW, imgH = (int(width>>1))<<1, (int(height>>1)<<1)
     simgW, simgH =int(imgW>>1), int(imgH>>1)
-    bayerImgC1, bayerImgC2, bayerImgC3, bayerImgC4 = [np.zeros([simgH, simgW, 1], np.uint8) for x in range(4)]
 
     print("width %d -> %d, height %d -> %d" % (imgW, simgW, imgH, simgH))
 
@@ -280,51 +282,18 @@ def splitBayerRawU16(bayerdata, width, height, rawBits, bayerType):
     bitshift = rawBits-8
 
     #print("--- 1 ---")
-    imgRaw = bayerdata.reshape(imgH, imgW)
+    imgRaw = bayerdata[0:imgH, 0:imgW]
     #print("--- 1-1 ---")
     saveRawGrayImage(imgRaw, bayerType)
     #print("--- 2 ---")
 
-    global gbayerMean
-    gbayerMean = np.zeros(4, dtype=np.float)
-    if rawBits > 8:
-        bayerImg = imgRaw[0:imgH+1:2, 0:imgW+1:2]
-        gbayerMean[0] = bayerImg.mean()
-        bayerImgC1 = bayerImg >> bitshift
-
-        bayerImg = imgRaw[0:imgH+1:2, 1:imgW+1:2]
-        gbayerMean[1] = bayerImg.mean()
-        bayerImgC2 = bayerImg >> bitshift
-
-        bayerImg = imgRaw[1:imgH+1:2, 0:imgW+1:2]
-        gbayerMean[2] = bayerImg.mean()
-        bayerImgC3 = bayerImg >> bitshift
-
-        bayerImg = imgRaw[1:imgH+1:2, 1:imgW+1:2]
-        gbayerMean[3] = bayerImg.mean()
-        bayerImgC4 = bayerImg >> bitshift
-
-        #print("Bayer mean: {:.2f}".format(gbayerMean[0]))
-    else:
-        bayerImgC1 = imgRaw[0:imgH+1:2, 0:imgW+1:2]
-        gbayerMean[0] = bayerImgC1.mean()
-        print("Bayer mean: {:.2f}".format(gbayerMean[0]))
-        #print(bayImgC1[476:497, 612:633])
-
-        bayerImgC2 = imgRaw[0:imgH+1:2, 1:imgW+1:2]
-        gbayerMean[1] = bayerImgC2.mean()
-        print("Bayer mean: {:.2f}".format(gbayerMean[1]))
-        #print(bayImgC2[476:497, 612:633])
-
-        bayerImgC3 = imgRaw[1:imgH+1:2, 0:imgW+1:2]
-        gbayerMean[2] = bayerImgC3.mean()
-        print("Bayer mean: {:.2f}".format(gbayerMean[2]))
-        #print(bayImgC3[476:497, 612:633])
-
-        bayerImgC4 = imgRaw[1:imgH+1:2, 1:imgW+1:2]
-        gbayerMean[3] = bayerImgC4.mean()
-        print("Bayer mean: {:.2f}".format(gbayerMean[3]))
-        #print(bayImgC4[476:497, 612:633])
+    global gbayerMean, gbayerStats
+    #-- one pass: 8-bit planes for display/saving, statistics on the original pixels
+    bayerPlanes, gbayerStats = rawBayer.split_bayer(imgRaw, rawBits, shift=max(bitshift, 0))
+    bayerImgC1, bayerImgC2, bayerImgC3, bayerImgC4 = bayerPlanes
+    gbayerMean = gbayerStats['mean']
+    print("Bayer mean: ({:.2f}, {:.2f}, {:.2f}, {:.2f})".format(*gbayerMean))
+    print("Bayer std:  ({:.2f}, {:.2f}, {:.2f}, {:.2f})".format(*gbayerStats['std']))
 
 
 
@@ -384,13 +353,11 @@ def cbfnButtonOpenRaw():
     bits = int(txtlblRawBits.get())
     #print(rawfname)
     try:
-        # f = open(rawfname, 'rb')
-        # rawdata = f.read()
-        # f.close()
-        if bits > 8:
-            rawdata = np.fromfile(rawfname, dtype=np.uint16)
-        else:
-            rawdata = np.fromfile(rawfname, dtype=np.uint8)
+        #-- memory-mapped, packed RAW is unpacked to uint16 pixels
+        packing = packingSelect.get()
+        rawdata = rawLoader.load_raw(rawfname, int(txtlblRawWidth.get()),
+                                    int(txtlblRawHeight.get()), bits, bayerSelect.get(),
+                                    packing=None if packing == 'none' else packing, verbose=True)
     except:
         messageBoxOK('FileIO', 'Failed to open file :\n' + rawfname)
         cbfnButtonReset()
@@ -454,39 +421,44 @@ def update_RawFmtButtonColor(activeID):
         btnRawFmt4.config(fg='Yellow', bg="#0000FF")
 
 
-def config_raw_image_format(szWidth, szHeight, szBits, szBayeName):
+def config_raw_image_format(szWidth, szHeight, szBits, szBayeName, szPacking='none'):
     txtlblRawWidth.set(szWidth)
     txtlblRawHeight.set(szHeight)
     txtlblRawBits.set(szBits)
     bayerSelect.set(szBayeName)
+    packingSelect.set(szPacking)
 
 
 def cbfnButtonConfigAntmanOS05A20():
     config_raw_image_format(gRawFmtTable["format_1"]["width"],
                                 gRawFmtTable["format_1"]["height"],
                                 gRawFmtTable["format_1"]["pixel_bits"],
-                                gRawFmtTable["format_1"]["bayer"])
+                                gRawFmtTable["format_1"]["bayer"],
+                                gRawFmtTable["format_1"].get("packing", "none"))
     update_RawFmtButtonColor(1)
 
 def cbfnButtonConfigTheiaOS05A20():
     config_raw_image_format(gRawFmtTable["format_2"]["width"],
                                 gRawFmtTable["format_2"]["height"],
                                 gRawFmtTable["format_2"]["pixel_bits"],
-                                gRawFmtTable["format_2"]["bayer"])
+                                gRawFmtTable["format_2"]["bayer"],
+                                gRawFmtTable["format_2"].get("packing", "none"))
     update_RawFmtButtonColor(2)
 
 def cbfnButtonConfigAntmanAR0330():
     config_raw_image_format(gRawFmtTable["format_3"]["width"],
                                 gRawFmtTable["format_3"]["height"],
                                 gRawFmtTable["format_3"]["pixel_bits"],
-                                gRawFmtTable["format_3"]["bayer"])
+                                gRawFmtTable["format_3"]["bayer"],
+                                gRawFmtTable["format_3"].get("packing", "none"))
     update_RawFmtButtonColor(3)
 
 def cbfnButtonConfigHawkeye():
     config_raw_image_format(gRawFmtTable["format_4"]["width"],
                                 gRawFmtTable["format_4"]["height"],
                                 gRawFmtTable["format_4"]["pixel_bits"],
-                                gRawFmtTable["format_4"]["bayer"])
+                                gRawFmtTable["format_4"]["bayer"],
+                                gRawFmtTable["format_4"].get("packing", "none"))
     update_RawFmtButtonColor(4)
 
 
@@ -518,6 +490,7 @@ def raw_format_json_load():
         gRawFmtTable["format_1"]["height"] = jsonDict["format_1"]["height"]
         gRawFmtTable["format_1"]["pixel_bits"] = jsonDict["format_1"]["pixel_bits"]
         gRawFmtTable["format_1"]["bayer"] = jsonDict["format_1"]["bayer"]
+        gRawFmtTable["format_1"]["packing"] = jsonDict["format_1"].get("packing", "none")
 
         gRawFmtTable["format_2"]["name"] = jsonDict["format_2"]["name"]
         gRawFmtTable["format_2"]["color"] = jsonDict["format_2"]["color"]
@@ -525,6 +498,7 @@ def raw_format_json_load():
         gRawFmtTable["format_2"]["height"] = jsonDict["format_2"]["height"]
         gRawFmtTable["format_2"]["pixel_bits"] = jsonDict["format_2"]["pixel_bits"]
         gRawFmtTable["format_2"]["bayer"] = jsonDict["format_2"]["bayer"]
+        gRawFmtTable["format_2"]["packing"] = jsonDict["format_2"].get("packing", "none")
 
         gRawFmtTable["format_3"]["name"] = jsonDict["format_3"]["name"]
         gRawFmtTable["format_3"]["color"] = jsonDict["format_3"]["color"]
@@ -532,6 +506,7 @@ def raw_format_json_load():
         gRawFmtTable["format_3"]["height"] = jsonDict["format_3"]["height"]
         gRawFmtTable["format_3"]["pixel_bits"] = jsonDict["format_3"]["pixel_bits"]
         gRawFmtTable["format_3"]["bayer"] = jsonDict["format_3"]["bayer"]
+        gRawFmtTable["format_3"]["packing"] = jsonDict["format_3"].get("packing", "none")
 
         gRawFmtTable["format_4"]["name"] = jsonDict["format_4"]["name"]
         gRawFmtTable["format_4"]["color"] = jsonDict["format_4"]["color"]
@@ -539,6 +514,7 @@ def raw_format_json_load():
         gRawFmtTable["format_4"]["height"] = jsonDict["format_4"]["height"]
         gRawFmtTable["format_4"]["pixel_bits"] = jsonDict["format_4"]["pixel_bits"]
         gRawFmtTable["format_4"]["bayer"] = jsonDict["format_4"]["bayer"]
+        gRawFmtTable["format_4"]["packing"] = jsonDict["format_4"].get("packing", "none")
 
     return jsonDict
 
@@ -661,6 +637,14 @@ if __name__ == "__main__":
     entryRawBits = Entry(winMain, bd=2, justify=LEFT, width=10, textvariable=txtlblRawBits)
     entryRawBits.grid(row=curRow, column=1, sticky=W)
 
+    #-- none: LSB-aligned uint8/uint16, amba: MSB-aligned uint16, mipi/mtk: packed RAW10/12/14
+    curRow +=1
+    lblRawPacking = Label(winMain, text='Packing')
+    lblRawPacking.grid(row=curRow, column=0, padx=2, pady=2)
+    packingSelect = StringVar(value=gRawFmtTable.get("packing", "none"))
+    optRawPacking = OptionMenu(winMain, packingSelect, 'none', 'amba', 'mipi', 'mtk')
+    optRawPacking.grid(row=curRow, column=1, sticky=W)
+
     curRow += 1
     Label(winMain, text='ShowRAW').grid(row=curRow, column=0)
     chkShowBayerImg = IntVar()
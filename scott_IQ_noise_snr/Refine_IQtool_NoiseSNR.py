@@ -1,15 +1,19 @@
 #!/usr/bin/python
 #coding:utf-8
 
-import threading
 import math
 import time
+import threading
 from tkinter import *  # Tk, Label, Entry, Radiobutton, IntVar, Button
 from tkinter import filedialog
 import numpy as np
 import matplotlib.pyplot as plt
 import cv2  
 
+import cy_NoiseSNR as noiseSNR
+import cy_Viewport as viewport
+import cy_CvDisplay as cvDisplay
+
 
 '''
     messageBoxOK()
@@ -30,17 +34,21 @@ def cbfnButtonOpenRaw():
     
     global txtlblRawFName, btnRaw, rawdata,load_img_en
     global img,re_img,img2
+    global gTemporal
     txtlblRawFName.set(value=filedialog.askopenfilename() )
     rawfname = txtlblRawFName.get()
     #print("11233455844",rawfname)
     
     img = cv2.imread(rawfname)
+    gTemporal = None
     #cv2.imshow('image', img)
-    re_img = cv2.resize(img,(960,540),interpolation=cv2.INTER_CUBIC)
-    img2 = cv2.resize(img,(960,540),interpolation=cv2.INTER_CUBIC)
+    gViewport.set_image(img)
+    refresh_view()
     cv2.namedWindow('image')  
     cv2.setMouseCallback('image', cbfnMouseEvents_ImageWindow)  
     load_img_en = 1
+    gDisplay.enabled = True
+    gDisplay.mark_dirty()
     '''
     try:
         f = open(rawfname, 'rb')
@@ -57,98 +65,167 @@ def cbfnButtonOpenRaw():
         btnRaw.config(text='Load RAW', command=cbfnButtonLoadRaw)
     '''
 
+'''
+    cbfnButtonOpenTemporal()
+'''
+def cbfnButtonOpenTemporal():
+    '''Callback of button Open temporal: accumulate the frames of a video / image sequence'''
+    global txtlblRawFName
+
+    fname = filedialog.askopenfilename()
+    if not fname:
+        return
+    try:
+        nFrames = int(txtTemporalFrames.get())
+    except ValueError:
+        nFrames = None
+    txtlblRawFName.set(value=fname)
+
+    #-- decode in a worker thread, the Tk main loop polls for the result so the GUI stays responsive
+    job = { 'fname': fname, 'result': None, 'error': None }
+    def work():
+        try:
+            job['result'] = noiseSNR.stream_temporal_noise(fname, maxFrames=nFrames)
+        except Exception as e:
+            job['error'] = e
+    job['thread'] = threading.Thread(target=work, daemon=True)
+    job['thread'].start()
+    btnTemporal.config(state=DISABLED, text='Reading ...')
+    winMain.after(100, poll_temporal, job)
+
+
+'''
+    poll_temporal()
+'''
+def poll_temporal(job):
+    '''Show the result of cbfnButtonOpenTemporal() once its worker thread is done, called by Tk.after()'''
+    global load_img_en
+    global img,re_img,img2
+    global gTemporal
+
+    if job['thread'].is_alive():
+        winMain.after(100, poll_temporal, job)
+        return
+    btnTemporal.config(state=NORMAL, text='Open temporal')
+
+    fname = job['fname']
+    if job['error'] is not None:
+        messageBoxOK('Temporal noise', 'Failed to read :\n' + fname + '\n' + str(job['error']))
+        return
+    acc, stats = job['result']
+    if acc.count < 2:
+        messageBoxOK('Temporal noise', 'Not enough frames in :\n' + fname)
+        return
+    print(acc.count, "frames\n" + noiseSNR.format_noise(stats['frame']))
+
+    #-- display the temporal mean frame, the ROIs are measured on the accumulated statistics
+    gTemporal = acc
+    mean = np.clip(acc.mean + 0.5, 0, 255).astype(np.uint8)
+    img = mean[:, :, :3] if mean.shape[2] >= 3 else cv2.cvtColor(mean, cv2.COLOR_GRAY2BGR)
+    gViewport.set_image(img)
+    refresh_view()
+    cv2.namedWindow('image')
+    cv2.setMouseCallback('image', cbfnMouseEvents_ImageWindow)
+    load_img_en = 1
+    gDisplay.enabled = True
+    gDisplay.mark_dirty()
+
+
+'''
+    refresh_view()
+'''
+def refresh_view():
+    '''Render the viewport to img2 (clean view) and re_img (view with overlay)'''
+    global img2,re_img
+    img2 = gViewport.render()
+    re_img = img2.copy()
+    gDisplay.mark_dirty()
+
+
 '''
     cbfnMouseEvents_ImageWindow
 '''
 def cbfnMouseEvents_ImageWindow(event, x, y, flags, param):  
     global ix, iy, drawing, mode 
     global img,img2,re_img
+    global panX, panY
   
+    #-- wheel: zoom at the cursor, right button drag: pan
+    if event == cv2.EVENT_MOUSEWHEEL:
+        gViewport.zoom_at(1.25 if cv2.getMouseWheelDelta(flags) > 0 else 0.8, x, y)
+        refresh_view()
+        return
+    if event == cv2.EVENT_RBUTTONDOWN:
+        panX, panY = x, y
+        return
+    if event == cv2.EVENT_MOUSEMOVE and (flags & cv2.EVENT_FLAG_RBUTTON):
+        gViewport.pan(x - panX, y - panY)
+        panX, panY = x, y
+        refresh_view()
+        return
+
     if event == cv2.EVENT_LBUTTONDOWN:  
         #print("left button down")  
         #img = img2.copy()
         re_img = img2.copy()
         drawing = True  
         ix, iy = x,y  
+        gDisplay.mark_dirty()
     #elif event == cv2.EVENT_MOUSEMOVE and flags == cv2.EVENT_FLAG_LBUTTON:  
     elif event == cv2.EVENT_MOUSEMOVE:  
         #print('mouse move')  
         if drawing == True:  
             if mode == True: 
-                if x < ix :
-                    print("nono")
-                else:
-                    print("nono")
-                    cv2.rectangle(re_img, (ix, iy), (x,y), (255,255,255), -1)  
+                re_img = img2.copy()
+                cv2.rectangle(re_img, (ix, iy), (x,y), (255,255,255), 1)  
                    #cv2.rectangle(re_img, (ix, iy), (x,y), (255,255,255), -1)
             else:  
                 cv2.circle(re_img, (x, y), 10, (255,0,0), -1)  
+            gDisplay.mark_dirty()
                 #cv2.circle(img, (x, y), 10, (255,0,0), -1)  
     elif event == cv2.EVENT_LBUTTONUP:  
         print('left button up')  
         print("ix,iy,x,y",ix,iy,x,y);
         drawing = False  
      
-        img_w_ratio = img.shape[0]/re_img.shape[0]
-        img_h_ratio = img.shape[1]/re_img.shape[1]
-
-        y_start= int(img_h_ratio*iy)
-        y_end= int(img_h_ratio*y)
-        x_start= int(img_w_ratio*ix)
-        x_end= int(img_w_ratio*x)
-
-        print("img_w img_h",img_w_ratio,img_h_ratio)
-        test_img = img[y_start:y_end, x_start:x_end]
-        test_img = cv2.cvtColor(test_img, cv2.COLOR_BGR2GRAY)
-
-        value = 0
-        count_add = 0
-        for i in range(test_img.shape[0]):
-            for j in range(test_img.shape[1]):
-                count_add += 1
-                value += test_img[i, j]
-
-        mean, std = cv2.meanStdDev(test_img)
-
-        SNR_step1 = (mean*mean)/(std*std)
-        SNR_step2 = math.log10(SNR_step1)
-        SNR =SNR_step2*10
-        print("SNR",SNR)
-
-        print(mean,std)
-        
-        text2 = str(SNR)
-        text = str(std)
-        messageBoxOK('cul noise std', 'SNR:\n'+text2 +'DB \n'+'STD \n'+text)
-        #text = 'Hello, OpenCV!'
+        #-- the pixels of the full resolution image under the rectangle of the view
+        rect = gViewport.view_rect_to_source(ix, iy, x, y)
+        print("source rect", rect, "zoom", gViewport.zoom)
+        stats = noiseSNR.patch_noise(img, rect)
+        if not stats:
+            print("empty patch", rect)
+            return
+
+        text = noiseSNR.format_noise(stats)
+        if gTemporal is not None:
+            text = 'Spatial:\n' + text + '\nTemporal ({} frames):\n'.format(gTemporal.count) + \
+                   noiseSNR.format_noise(gTemporal.roi_stats(rect))
+        print(text)
+        messageBoxOK('cul noise std', text)
+
+        test_img = cv2.cvtColor(noiseSNR.crop_patch(img, rect), cv2.COLOR_BGR2GRAY)
         # 使用各種字體
-        cv2.putText(test_img, text, (10, 40), cv2.FONT_HERSHEY_SIMPLEX,
+        cv2.putText(test_img, "{:.3f}".format(stats['Y']['std']), (10, 40), cv2.FONT_HERSHEY_SIMPLEX,
         1, (255, 255, 255), 1, cv2.LINE_AA)
-        print("Value",value)
-        print("count_add",count_add)
-        print("W , H",test_img.shape[0],test_img.shape[1])
+        print("count",stats['Y']['count'])
+        print("W , H",test_img.shape[1],test_img.shape[0])
         cv2.imshow('test_img',test_img)
         
         
 '''
-    thread_function()
+    cbfnKey_ImageWindow()
 '''
-def thread_function():
-  global load_img_en
-  global img
-
-  while(True):  
-    
-    k = cv2.waitKey(1)&0xff  
+def cbfnKey_ImageWindow(k):
+    '''Keys of the image window, called by gDisplay'''
+    global mode, load_img_en
 
-    if load_img_en == 1:
-        cv2.imshow('image', re_img)
-    
     if k == ord('m'):  
         print('you typed key m')  
         mode = not mode  
     elif k == 27:  
-        break
+        load_img_en = 0
+        gDisplay.enabled = False
+        cv2.destroyWindow('image')
 
 
 
@@ -179,21 +256,23 @@ ix, iy = -1, -1
    # print("Child thread:", i)
     #time.sleep(1)
 
-# 建立一個子執行緒
 load_img_en = 0
+gTemporal = None
+panX, panY = 0, 0
 img = cv2.imread("Building.jpg") # init opencv info
-img2 = img.copy() # init opencv info
-re_img = img.copy() # init opencv info
-t = threading.Thread(target = thread_function)
+gViewport = viewport.ImageViewport(img, 960, 540)
+img2 = gViewport.render() # init opencv info
+re_img = img2.copy() # init opencv info
 
 #cv2.namedWindow('image')  
 #cv2.setMouseCallback('image', draw_circle)  
 
-# 執行該子執行緒
-t.start()
-
 winMain = Tk()
 winMain.title('noise tool')
+
+#-- repaint the image window only when it is dirty, driven by the Tk main loop
+gDisplay = cvDisplay.CvDisplayScheduler(winMain, 'image', lambda: re_img, onKey=cbfnKey_ImageWindow, maxFps=30)
+gDisplay.start()
 btnRaw = Button(winMain, text='Open cul noise', command=cbfnButtonOpenRaw, bg='LightGreen')
 btnRaw.grid(row=0, column=0, pady=2)
 
@@ -201,5 +280,11 @@ txtlblRawFName = StringVar()
 lblRawFName = Label(winMain, width=48, textvariable=txtlblRawFName)
 lblRawFName.grid(row=0, column=1, columnspan=8)
 
+btnTemporal = Button(winMain, text='Open temporal', command=cbfnButtonOpenTemporal, bg='LightBlue')
+btnTemporal.grid(row=1, column=0, pady=2)
+Label(winMain, text='frames:').grid(row=1, column=1)
+txtTemporalFrames = StringVar(value='64')
+Entry(winMain, width=8, textvariable=txtTemporalFrames).grid(row=1, column=2)
+
 winMain.mainloop()
 
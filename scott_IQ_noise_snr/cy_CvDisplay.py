@@ -0,0 +1,119 @@
+#!/usr/bin/python
+#coding:utf-8
+
+import time
+
+import cv2
+
+
+#--------------------------------------
+# Class: CvDisplayScheduler
+#--------------------------------------
+class CvDisplayScheduler():
+    """A redraw scheduler of an OpenCV window driven by the Tk main loop.
+
+    Instead of a thread spinning cv2.waitKey(1), the HighGUI events are pumped from Tk.after():
+    at maxFps while the window is active (dirty, or events in the last activeSec seconds),
+    and every idleMs when nothing happens. The image is re-shown only when it is marked dirty,
+    at most maxFps times per second.
+
+    Attributes
+    -----------
+    winName: string
+        the OpenCV window
+    enabled: boolean
+        False to stop showing and pumping the window, e.g., before an image is loaded
+
+    Methods
+    -----------
+    start()
+    stop()
+    mark_dirty()
+        To request a repaint, call it whenever the image or the overlay changes
+    """
+    def __init__(self, tkRoot, winName, getFrame, onKey=None, maxFps=30, idleMs=100, activeSec=1.0):
+        """
+        Arguments
+        ---------------
+        tkRoot: Tk
+            the Tk root window whose main loop drives the scheduler
+        winName: string
+            the OpenCV window
+        getFrame: function
+            returns the image to show, called only when a repaint is due
+        onKey: function
+            optional callback of the key codes from cv2.waitKey()
+        maxFps: integer
+            the maximum refresh rate
+        idleMs: integer
+            the event polling interval when the window is idle
+        activeSec: float
+            how long to keep polling at maxFps after the last repaint
+        """
+        self.tkRoot = tkRoot
+        self.winName = winName
+        self.getFrame = getFrame
+        self.onKey = onKey
+        self.frameMs = max(1, int(1000 / maxFps))
+        self.idleMs = idleMs
+        self.activeSec = activeSec
+        self.enabled = False
+        self._dirty = False
+        self._lastPaint = 0.0
+        self._afterId = None
+
+
+    def start(self):
+        """To start the scheduler, and stop it cleanly when the Tk root window is closed
+        """
+        self.tkRoot.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._schedule(self.idleMs)
+        return self
+
+
+    def stop(self):
+        """To cancel the pending poll and close the OpenCV windows
+        """
+        if self._afterId is not None:
+            self.tkRoot.after_cancel(self._afterId)
+            self._afterId = None
+        cv2.destroyAllWindows()
+
+
+    def mark_dirty(self):
+        """To request a repaint at the next frame slot
+        """
+        self._dirty = True
+        if self._afterId is not None and time.perf_counter() - self._lastPaint > self.activeSec:
+            #-- wake up from the idle polling
+            self.tkRoot.after_cancel(self._afterId)
+            self._schedule(1)
+
+
+    def _on_close(self):
+        self.stop()
+        self.tkRoot.destroy()
+
+
+    def _schedule(self, ms):
+        self._afterId = self.tkRoot.after(ms, self._poll)
+
+
+    def _poll(self):
+        self._afterId = None
+        now = time.perf_counter()
+        if self.enabled:
+            if self._dirty and now - self._lastPaint >= self.frameMs / 1000.0:
+                self._dirty = False
+                self._lastPaint = now
+                frame = self.getFrame()
+                if frame is not None:
+                    cv2.imshow(self.winName, frame)
+
+            #-- pump the HighGUI events (mouse callbacks, keys), it returns immediately
+            k = cv2.waitKey(1)
+            if k != -1 and self.onKey is not None:
+                self.onKey(k & 0xff)
+
+        active = self._dirty or (time.perf_counter() - self._lastPaint) < self.activeSec
+        self._schedule(self.frameMs if active else self.idleMs)
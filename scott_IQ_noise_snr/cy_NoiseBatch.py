@@ -0,0 +1,191 @@
+#!/usr/bin/python
+#coding:utf-8
+
+import os, sys, time, json, csv
+
+import cv2
+
+import cy_NoiseSNR as noiseSNR
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cyModules'))
+import cy_BatchRunner as batchRunner
+
+
+imageFile_Patterns = ('*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tif', '*.tiff')
+
+table_Fields = ['file', 'patch', 'channel', 'mean', 'std', 'snr', 'count']
+
+
+###########################################################
+# Inputs: captures and patches
+###########################################################
+def find_captures(target, patterns=imageFile_Patterns):
+    """To list the captures of a directory, a glob pattern, or a single image file, sorted
+    """
+    return batchRunner.find_files(target, patterns)
+
+
+def load_patches(fname):
+    """To load the patch list from a JSON file
+
+    The JSON is a list (or { "patches": list }) of patches, each patch is either
+    [x0, y0, x1, y1] or { "name": str, "rect": [x0, y0, x1, y1] }.
+    Unnamed patches are named 'P1', 'P2', ... in the order of the list.
+
+    Returns
+    ---------------
+    list of (name, (x0, y0, x1, y1))
+    """
+    with open(fname, 'r') as f:
+        conf = json.load(f)
+    if isinstance(conf, dict):
+        conf = conf['patches']
+
+    patches = []
+    for i, p in enumerate(conf):
+        if isinstance(p, dict):
+            name, rect = p.get('name', 'P{}'.format(i+1)), p['rect']
+        else:
+            name, rect = 'P{}'.format(i+1), p
+        if len(rect) != 4:
+            raise ValueError("patch {} must be [x0, y0, x1, y1]: {}".format(name, rect))
+        patches.append((str(name), tuple(int(v) for v in rect)))
+    return patches
+
+
+
+###########################################################
+# Analyze one capture
+###########################################################
+def analyze_file(imgFile, patches):
+    """To measure the noise of all patches of a capture, the image is decoded once.
+
+    Arguments
+    ---------------
+    imgFile: string
+        the capture, 8-bit or 16-bit, color or gray
+    patches: list of (name, rect)
+        see load_patches()
+
+    Returns
+    ---------------
+    dict
+        'file', 'seconds', 'error' (None if succeeded),
+        and 'patches' of { name:stats } of cy_NoiseSNR.patch_noise()
+    """
+    t0 = time.perf_counter()
+    result = { 'file': imgFile, 'seconds': 0.0, 'patches': {}, 'error': None }
+    try:
+        img = cv2.imread(imgFile, cv2.IMREAD_UNCHANGED)
+        if img is None:
+            raise IOError("failed to load image")
+        if img.ndim == 3 and img.shape[2] == 4:
+            img = img[:, :, :3]
+        for name, rect in patches:
+            result['patches'][name] = noiseSNR.patch_noise(img, rect)
+    except Exception as e:
+        result['error'] = "{}: {}".format(type(e).__name__, e)
+
+    result['seconds'] = time.perf_counter() - t0
+    return result
+
+
+
+###########################################################
+# Batch analysis over a process pool
+###########################################################
+def batch_analyze(files, patches, jobs=None, verbose=True):
+    """To measure the noise of all patches of the captures in parallel with a ProcessPoolExecutor.
+
+    Arguments
+    ---------------
+    files: list of string
+        the captures
+    patches: list of (name, rect)
+        see load_patches()
+    jobs: integer
+        number of worker processes, None for os.cpu_count(), 1 to run in this process
+    verbose: boolean
+        if True, print the progress and the overall files/s
+
+    Returns
+    ---------------
+    list of result dict of analyze_file(), in the order of files
+    """
+    t0 = time.perf_counter()
+    out = batchRunner.run_batch(analyze_file, files, [patches] * len(files), jobs=jobs, maxChunk=16,
+                                progress=_print_result if verbose else None)
+
+    if verbose:
+        dt = time.perf_counter() - t0
+        print("--- {} files x {} patches in {:.2f} s, {:.2f} files/s".format(
+                len(files), len(patches), dt, len(files) / dt if dt > 0 else 0.0))
+    return out
+
+
+def _print_result(n, total, result):
+    if result['error']:
+        print("[{}/{}] {}: ERROR, {}".format(n, total, result['file'], result['error']))
+    else:
+        print("[{}/{}] {}: {:.3f} s".format(n, total, result['file'], result['seconds']))
+
+
+
+###########################################################
+# Noise-vs-signal table
+###########################################################
+def noise_table(results, channels=('Y', 'R', 'G', 'B')):
+    """To flatten the results to a noise-vs-signal table, i.e., one noise curve per capture and channel
+    sorted by the signal level (mean)
+
+    Returns
+    ---------------
+    list of dict
+        one row per file, patch and channel, with keys of table_Fields
+    """
+    rows = []
+    for res in results:
+        for name, stats in res['patches'].items():
+            for ch in channels:
+                if ch not in stats:
+                    continue
+                s = stats[ch]
+                rows.append({ 'file': res['file'], 'patch': name, 'channel': ch, 'mean': round(s['mean'], 4),
+                              'std': round(s['std'], 4), 'snr': round(s['snr'], 3), 'count': s['count'] })
+    rows.sort(key=lambda r: (r['file'], r['channel'], r['mean']))
+    return rows
+
+
+def write_table(rows, fname):
+    """To write the noise-vs-signal table to a CSV file
+    """
+    with open(fname, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=table_Fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+
+#---------------------------------------------------------------
+# __main__
+#---------------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Batch noise/SNR analysis of patches over captures.')
+    parser.add_argument("captures", help='a folder, a glob pattern or an image file of the captures')
+    parser.add_argument("patches", help='JSON file of the patches, [[x0, y0, x1, y1], ...]')
+    parser.add_argument("-o", "--output", default="noise_table.csv", help='the CSV file of the noise-vs-signal table')
+    parser.add_argument("--jobs", type=int, default=None, help='number of worker processes, default=number of CPUs')
+    parser.add_argument("--channels", default="YRGB", help='channels in the table, default=YRGB')
+    args = parser.parse_args()
+
+    files = find_captures(args.captures)
+    if not files:
+        print("No capture found: " + args.captures)
+        sys.exit(1)
+
+    results = batch_analyze(files, load_patches(args.patches), jobs=args.jobs)
+    write_table(noise_table(results, tuple(args.channels)), args.output)
+    print("Noise table: " + args.output)
+    sys.exit(1 if any(r['error'] for r in results) else 0)
@@ -0,0 +1,303 @@
+#!/usr/bin/python
+#coding:utf-8
+
+import os, sys
+import math
+
+import numpy as np
+import cv2
+
+#-- the imutils of this repo first, an installed imutils has no FileVideoStream(pool=) / release()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'imutils-master'))
+
+
+#-- channels of a BGR image, and their index in the image
+noiseChannel_Index = {
+    'B' : 0,
+    'G' : 1,
+    'R' : 2,
+}
+
+
+def snr_db(mean, std):
+    """To get SNR in dB, 20*log10(mean/std), of a signal level and its noise
+
+    Returns
+    ---------------
+    float
+        inf if std is 0, -inf if mean is 0
+    """
+    if std <= 0:
+        return math.inf
+    if mean <= 0:
+        return -math.inf
+    return 20.0 * math.log10(mean / std)
+
+
+def crop_patch(img, rect):
+    """To crop a patch of an image
+
+    Arguments
+    ---------------
+    img: np.ndarray
+        the image, (H, W) or (H, W, C)
+    rect: (x0, y0, x1, y1)
+        the two corners of the patch in any order, clipped to the image; None for the whole image
+
+    Returns
+    ---------------
+    np.ndarray
+        a view of the patch
+    """
+    if rect is None:
+        return img
+    x0, y0, x1, y1 = [int(v) for v in rect]
+    x0, x1 = sorted((x0, x1))
+    y0, y1 = sorted((y0, y1))
+    imgH, imgW = img.shape[:2]
+    x0, x1 = max(0, x0), min(imgW, x1)
+    y0, y1 = max(0, y0), min(imgH, y1)
+    return img[y0:max(y0, y1), x0:max(x0, x1)]
+
+
+def _channel_stats(mean, std, count):
+    mean, std = float(mean), float(std)
+    return { 'mean': mean, 'std': std, 'snr': snr_db(mean, std), 'count': int(count) }
+
+
+###########################################################
+# Spatial noise of a patch
+###########################################################
+def patch_noise(img, rect=None):
+    """To measure mean, std and SNR of the Y/R/G/B channels of a uniform patch, all in one call.
+
+    The statistics are computed by cv2.meanStdDev over the whole patch, no per-pixel Python loop.
+
+    Arguments
+    ---------------
+    img: np.ndarray
+        BGR image (H, W, 3), or gray image (H, W) of any depth
+    rect: (x0, y0, x1, y1)
+        the patch, see crop_patch(); None for the whole image
+
+    Returns
+    ---------------
+    dict
+        { channel:stats } of channels 'Y' (and 'R', 'G', 'B' for a BGR image), where stats is a dictionary
+        of 'mean', 'std', 'snr' (dB) and 'count' (number of pixels); an empty patch returns {}
+    """
+    patch = crop_patch(img, rect)
+    count = patch.shape[0] * patch.shape[1]
+    if count == 0:
+        return {}
+
+    if patch.ndim == 2 or patch.shape[2] == 1:
+        mean, std = cv2.meanStdDev(patch)
+        return { 'Y': _channel_stats(mean[0, 0], std[0, 0], count) }
+
+    gray = cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY)
+    mean, std = cv2.meanStdDev(gray)
+    result = { 'Y': _channel_stats(mean[0, 0], std[0, 0], count) }
+
+    mean, std = cv2.meanStdDev(patch)
+    for ch in ('R', 'G', 'B'):
+        i = noiseChannel_Index[ch]
+        result[ch] = _channel_stats(mean[i, 0], std[i, 0], count)
+    return result
+
+
+###########################################################
+# Temporal noise of a sequence of frames
+###########################################################
+def temporal_noise(frames, rect=None):
+    """To measure the temporal noise of a patch over a stack of frames of a static scene.
+
+    The temporal noise of a pixel is its std over the frames; the temporal noise of the patch is
+    the RMS of the per-pixel std, and the signal is the mean of the patch over all frames.
+
+    Arguments
+    ---------------
+    frames: np.ndarray or list of np.ndarray
+        N BGR (N, H, W, 3) or gray (N, H, W) frames of the same size, N >= 2
+    rect: (x0, y0, x1, y1)
+        the patch, see crop_patch(); None for the whole frame
+
+    Returns
+    ---------------
+    dict
+        same format as patch_noise(), where 'std' is the temporal noise and 'count' is the number of frames
+    """
+    patches = [ crop_patch(f, rect) for f in frames ]
+    if len(patches) < 2:
+        raise ValueError("temporal noise needs at least 2 frames")
+    if patches[0].size == 0:
+        return {}
+
+    isColor = patches[0].ndim == 3 and patches[0].shape[2] >= 3
+    stack = np.stack(patches).astype(np.float32)
+    if isColor:
+        gray = np.stack([ cv2.cvtColor(p, cv2.COLOR_BGR2GRAY) for p in patches ]).astype(np.float32)
+        channels = { 'Y': gray, 'R': stack[..., 2], 'G': stack[..., 1], 'B': stack[..., 0] }
+    else:
+        channels = { 'Y': stack.reshape(stack.shape[:3]) }
+
+    result = {}
+    for ch, data in channels.items():
+        var = data.var(axis=0, ddof=1, dtype=np.float64)
+        result[ch] = _channel_stats(data.mean(dtype=np.float64), math.sqrt(var.mean()), len(patches))
+    return result
+
+
+class TemporalNoise():
+    """A streaming accumulator of the per-pixel temporal mean and variance (Welford's algorithm).
+
+    Frames are added one by one, only the running mean and the sum of squared deviations (M2)
+    are kept in float32 buffers, plus one scratch buffer; the memory does not depend on the
+    number of frames. Color frames are accumulated as B, G, R, Y channels.
+
+    Attributes
+    -----------
+    count: integer
+        number of frames accumulated
+    mean, m2: np.ndarray (H, W, C) float32
+        the running per-pixel mean and M2
+
+    Methods
+    -----------
+    add(frame)
+    std_map(rect=None) --> np.ndarray
+    snr_map(rect=None) --> np.ndarray, in dB
+    roi_stats(rect=None) --> dict
+        same format as patch_noise()
+    """
+    def __init__(self):
+        self.count = 0
+        self.channels = None
+        self.mean = None
+        self.m2 = None
+        self._delta = None
+
+
+    def add(self, frame):
+        """To accumulate one frame, BGR or gray, all frames must be of the same size
+        """
+        if frame.ndim == 3 and frame.shape[2] >= 3:
+            bgry = cv2.cvtColor(frame[:, :, :3], cv2.COLOR_BGR2BGRA)
+            bgry[:, :, 3] = cv2.cvtColor(frame[:, :, :3], cv2.COLOR_BGR2GRAY)
+            frame, channels = bgry, ('B', 'G', 'R', 'Y')
+        else:
+            frame, channels = frame.reshape(frame.shape[0], frame.shape[1], 1), ('Y',)
+
+        if self.mean is None:
+            self.channels = channels
+            self.mean = np.zeros(frame.shape, np.float32)
+            self.m2 = np.zeros(frame.shape, np.float32)
+            self._delta = np.empty(frame.shape, np.float32)
+        elif frame.shape != self.mean.shape:
+            raise ValueError("frame of {} does not match the accumulated frames of {}".format(frame.shape, self.mean.shape))
+
+        #-- delta = x - mean, mean += delta/n, M2 += delta * (x - mean') = delta^2 * (n-1)/n
+        self.count += 1
+        n = self.count
+        delta = self._delta
+        np.subtract(frame, self.mean, out=delta, dtype=np.float32)
+        cv2.scaleAdd(delta, 1.0 / n, self.mean, dst=self.mean)
+        np.multiply(delta, delta, out=delta)
+        cv2.scaleAdd(delta, (n - 1.0) / n, self.m2, dst=self.m2)
+
+
+    def variance_map(self, rect=None):
+        """To get the per-pixel temporal variance (unbiased), (H, W, C) float32
+        """
+        if self.count < 2:
+            raise ValueError("temporal noise needs at least 2 frames")
+        return crop_patch(self.m2, rect) / np.float32(self.count - 1)
+
+
+    def std_map(self, rect=None):
+        """To get the per-pixel temporal noise (std), (H, W, C) float32
+        """
+        return np.sqrt(self.variance_map(rect))
+
+
+    def snr_map(self, rect=None):
+        """To get the per-pixel temporal SNR in dB, 20*log10(mean/std), (H, W, C) float32
+        """
+        std = self.std_map(rect)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 20.0 * np.log10(crop_patch(self.mean, rect) / std)
+
+
+    def roi_stats(self, rect=None):
+        """To get the temporal noise of a patch, the RMS of the per-pixel std over the patch
+
+        Returns
+        ---------------
+        dict
+            same format as temporal_noise(), 'count' is the number of frames
+        """
+        var = self.variance_map(rect)
+        if var.size == 0:
+            return {}
+        mean = crop_patch(self.mean, rect)
+        result = {}
+        for i, ch in enumerate(self.channels):
+            result[ch] = _channel_stats(mean[..., i].mean(dtype=np.float64),
+                                        math.sqrt(var[..., i].mean(dtype=np.float64)), self.count)
+        return result
+
+
+def stream_temporal_noise(source, rects=None, maxFrames=None, transform=None):
+    """To measure the temporal noise by streaming the frames of a video or an image sequence.
+
+    The frames are decoded by imutils.video.FileVideoStream in a background thread into a pool
+    of frame buffers, and accumulated by TemporalNoise.
+
+    Arguments
+    ---------------
+    source: string
+        a video file, or an image sequence of cv2.VideoCapture, e.g., 'captures/img_%04d.png'
+    rects: dict
+        { name:(x0, y0, x1, y1) } of the ROIs to report, None for the whole frame
+    maxFrames: integer
+        the maximum number of frames to accumulate, None for all frames
+    transform: function
+        optional transform of each frame, run in the decoding thread
+
+    Returns
+    ---------------
+    (accumulator, stats)
+        accumulator: TemporalNoise
+        stats: { name:stats } of TemporalNoise.roi_stats() of each ROI, { 'frame':stats } if rects is None;
+               {} if less than 2 frames were accumulated (e.g., a still image or an unreadable source)
+    """
+    from imutils.video import FileVideoStream
+
+    acc = TemporalNoise()
+    fvs = FileVideoStream(source, transform=transform, queue_size=16, pool=True).start()
+    try:
+        while fvs.running() and (maxFrames is None or acc.count < maxFrames):
+            frame = fvs.read()
+            if frame is None:
+                break
+            acc.add(frame)
+            fvs.release(frame)
+    finally:
+        fvs.stop()
+
+    if acc.count < 2:
+        return acc, {}
+    if rects is None:
+        rects = { 'frame': None }
+    return acc, { name: acc.roi_stats(rect) for name, rect in rects.items() }
+
+
+def format_noise(stats):
+    """To format the result of patch_noise()/temporal_noise() as lines of text
+    """
+    lines = []
+    for ch in ('Y', 'R', 'G', 'B'):
+        if ch in stats:
+            s = stats[ch]
+            lines.append("{}: mean {:.2f}, std {:.3f}, SNR {:.2f} dB".format(ch, s['mean'], s['std'], s['snr']))
+    return '\n'.join(lines)
@@ -0,0 +1,159 @@
+#!/usr/bin/python
+#coding:utf-8
+
+import math
+
+import numpy as np
+import cv2
+
+
+#--------------------------------------
+# Class: ImageViewport
+#--------------------------------------
+class ImageViewport():
+    """A class to display a (large) image in a fixed-size window with pan and zoom.
+
+    The view is defined by the zoom (display pixels per source pixel) and the source coordinate
+    shown at the top-left corner of the view, so the view-to-source transform is exact:
+        sx = x0 + vx / zoom,  sy = y0 + vy / zoom
+    Rendering reads from the cached image pyramid level closest to (but not below) the display
+    resolution, only the visible part of that level is resampled.
+
+    Attributes
+    -----------
+    img: np.ndarray
+        the full-resolution source image
+    viewW, viewH: integer
+        the size of the view (window)
+    zoom: float
+        display pixels per source pixel
+    x0, y0: float
+        the source coordinate at the top-left corner of the view
+
+    Methods
+    -----------
+    fit()
+    render() --> np.ndarray (viewH, viewW, C)
+    view_to_source(vx, vy) --> (sx, sy)
+    source_to_view(sx, sy) --> (vx, vy)
+    view_rect_to_source(vx0, vy0, vx1, vy1) --> (x0, y0, x1, y1)
+    pan(dx, dy)
+    zoom_at(factor, vx, vy)
+    """
+    def __init__(self, img, viewW=960, viewH=540, maxZoom=16.0):
+        self.viewW, self.viewH = int(viewW), int(viewH)
+        self.maxZoom = maxZoom
+        self.set_image(img)
+
+
+    def set_image(self, img):
+        """To replace the source image, the pyramid is rebuilt lazily and the view is fit to the image
+        """
+        self.img = img
+        self.imgH, self.imgW = img.shape[:2]
+        self._pyramid = [img]
+        self.fit()
+
+
+    def _level(self, k):
+        """To get level k of the pyramid (1/2^k of the source), built on demand and cached
+        """
+        while len(self._pyramid) <= k:
+            prev = self._pyramid[-1]
+            if min(prev.shape[:2]) < 2:
+                break
+            self._pyramid.append(cv2.pyrDown(prev))
+        return self._pyramid[min(k, len(self._pyramid)-1)]
+
+
+    def fit(self):
+        """To show the whole image centered in the view
+        """
+        self.minZoom = min(self.viewW / self.imgW, self.viewH / self.imgH)
+        self.zoom = self.minZoom
+        self.x0 = (self.imgW - self.viewW / self.zoom) / 2
+        self.y0 = (self.imgH - self.viewH / self.zoom) / 2
+
+
+    def _clamp(self):
+        """To keep the image covering the view, or centered if it is smaller than the view
+        """
+        visW, visH = self.viewW / self.zoom, self.viewH / self.zoom
+        if visW >= self.imgW:
+            self.x0 = (self.imgW - visW) / 2
+        else:
+            self.x0 = min(max(self.x0, 0.0), self.imgW - visW)
+        if visH >= self.imgH:
+            self.y0 = (self.imgH - visH) / 2
+        else:
+            self.y0 = min(max(self.y0, 0.0), self.imgH - visH)
+
+
+    def view_to_source(self, vx, vy):
+        """To map a view coordinate to the (sub-pixel) source coordinate
+        """
+        return (self.x0 + vx / self.zoom, self.y0 + vy / self.zoom)
+
+
+    def source_to_view(self, sx, sy):
+        """To map a source coordinate to the view coordinate
+        """
+        return ((sx - self.x0) * self.zoom, (sy - self.y0) * self.zoom)
+
+
+    def view_rect_to_source(self, vx0, vy0, vx1, vy1):
+        """To map a rectangle of the view (two corners in any order) to the source pixels it covers
+
+        Returns
+        ---------------
+        (x0, y0, x1, y1)
+            integer source rectangle, x1/y1 exclusive, clipped to the image
+        """
+        sx0, sy0 = self.view_to_source(min(vx0, vx1), min(vy0, vy1))
+        sx1, sy1 = self.view_to_source(max(vx0, vx1), max(vy0, vy1))
+        x0 = min(max(int(math.floor(sx0)), 0), self.imgW)
+        y0 = min(max(int(math.floor(sy0)), 0), self.imgH)
+        x1 = min(max(int(math.ceil(sx1)), x0), self.imgW)
+        y1 = min(max(int(math.ceil(sy1)), y0), self.imgH)
+        return (x0, y0, x1, y1)
+
+
+    def pan(self, dx, dy):
+        """To move the view by (dx, dy) display pixels
+        """
+        self.x0 -= dx / self.zoom
+        self.y0 -= dy / self.zoom
+        self._clamp()
+
+
+    def zoom_at(self, factor, vx, vy):
+        """To zoom by factor, keeping the source point under the view coordinate (vx, vy) fixed
+        """
+        sx, sy = self.view_to_source(vx, vy)
+        self.zoom = min(max(self.zoom * factor, self.minZoom), self.maxZoom)
+        self.x0 = sx - vx / self.zoom
+        self.y0 = sy - vy / self.zoom
+        self._clamp()
+
+
+    def render(self):
+        """To render the view from the pyramid level matching the zoom
+
+        Returns
+        ---------------
+        np.ndarray (viewH, viewW, C)
+            the view, the area outside of the image is black
+        """
+        #-- the coarsest level which still has at least one pixel per display pixel
+        k = max(0, int(math.floor(math.log2(1.0 / self.zoom)))) if self.zoom < 1.0 else 0
+        level = self._level(k)
+        scale = level.shape[1] / self.imgW
+
+        #-- pixel i covers [i, i+1) in both the view and the level, warpAffine maps pixel centers:
+        #-- view = (level + 0.5 - x0*scale) * zoom/scale - 0.5
+        s = self.zoom / scale
+        M = np.float64([[s, 0, s * (0.5 - self.x0 * scale) - 0.5],
+                        [0, s, s * (0.5 - self.y0 * scale) - 0.5]])
+        interp = cv2.INTER_NEAREST if s >= 2.0 else cv2.INTER_LINEAR
+        return cv2.warpAffine(level, M, (self.viewW, self.viewH), flags=interp,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=0)
@@ -0,0 +1,748 @@
+# -*- coding: utf-8 -*-
+import os, sys, time, csv, shutil
+import math
+
+import numpy as np
+import cv2
+
+#-- the imutils of this repo first, an installed imutils has no FileVideoStream(pool=) / release()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'imutils-master'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cyModules'))
+import cy_BatchRunner as batchRunner
+
+
+#-- columns of the per-frame CSV report
+frameReport_Fields = ['frame', 'pos_msec', 'interval_ms', 'jitter_ms', 'changed_pixels', 'changed_ratio',
+                      'mean_diff', 'duplicate', 'dropped']
+
+#-- columns of the per-frame CSV report of the hash checker
+hashReport_Fields = ['frame', 'pos_msec', 'interval_ms', 'jitter_ms', 'mean', 'block_diff', 'hash_dist',
+                     'repeated', 'dropped', 'exposure_step']
+
+#-- size of the block-mean signature, HASH_SIZE x HASH_SIZE blocks, a 64-bit average hash
+HASH_SIZE = 8
+
+#-- the per-frame signature record, 89 bytes per frame
+signature_Dtype = np.dtype([
+    ('frame',   '<u4'),
+    ('pos_msec','<f8'),
+    ('mean',    '<f4'),
+    ('ahash',   '<u8'),
+    ('flags',   'u1'),
+    ('blocks',  'u1', (HASH_SIZE, HASH_SIZE)),
+])
+
+#-- bits of signature_Dtype['flags']
+FLAG_REPEATED = 1
+FLAG_DROPPED = 2
+FLAG_EXPOSURE = 4
+
+
+###########################################################
+# Decode thread: gray / downscaled frames with timestamps
+###########################################################
+def gray_transform(stream, scale=1.0):
+    """To build the FileVideoStream transform which runs on the decode thread.
+
+    Each frame is converted to gray (and downscaled) right after decoding,
+    and paired with its timestamp read from the capture.
+
+    Arguments
+    ---------------
+    stream: cv2.VideoCapture
+        the capture of the FileVideoStream, to read CAP_PROP_POS_MSEC
+    scale: float
+        the downscale factor, e.g., 0.5 for half size; 1.0 to keep the size
+
+    Returns
+    ---------------
+    function
+        frame --> (pos_msec, gray), None at the end of stream
+    """
+    def transform(frame):
+        if frame is None:
+            return None
+        pos = stream.get(cv2.CAP_PROP_POS_MSEC)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        if scale != 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return (pos, gray)
+    return transform
+
+
+
+###########################################################
+# Frame interval: jitter and dropped frames from the timestamps
+###########################################################
+class FrameIntervals():
+    """A class to analyze the frame intervals from the video timestamps (CAP_PROP_POS_MSEC).
+
+    Only running sums are kept, the memory does not depend on the number of frames.
+
+    Attributes
+    -----------
+    nominalMs: float
+        the nominal frame interval, e.g., 1000/fps; None to use the first positive interval
+    dropRatio: float
+        an interval longer than dropRatio * nominalMs means frames are missing
+    count, dropped: integer
+        number of intervals and of missing frames so far
+
+    Methods
+    -----------
+    add(interval) --> (jitter, dropped)
+    summary() --> dict
+    """
+    def __init__(self, nominalMs=None, dropRatio=1.5):
+        self.nominalMs = nominalMs if nominalMs and nominalMs > 0 else None
+        self.dropRatio = dropRatio
+        self.count = 0
+        self.dropped = 0
+        self._sum = 0.0
+        self._jitterCount = 0
+        self._jitterSum = 0.0
+        self._jitterSq = 0.0
+        self._jitterMax = 0.0
+
+
+    def add(self, interval):
+        """To add one frame interval in ms
+
+        Returns
+        ---------------
+        (jitter, dropped)
+            jitter: interval - nominalMs, None if the nominal interval is not known yet
+            dropped: number of frames missing in the interval
+        """
+        if self.nominalMs is None and interval > 0:
+            self.nominalMs = interval
+        self.count += 1
+        self._sum += interval
+        if not self.nominalMs:
+            return None, 0
+
+        #-- the jitter statistics only count the intervals measured against the nominal interval
+        jitter = interval - self.nominalMs
+        self._jitterCount += 1
+        self._jitterSum += jitter
+        self._jitterSq += jitter * jitter
+        self._jitterMax = max(self._jitterMax, abs(jitter))
+        dropped = 0
+        if interval > self.dropRatio * self.nominalMs:
+            dropped = int(round(interval / self.nominalMs)) - 1
+            self.dropped += dropped
+        return jitter, dropped
+
+
+    def merge(self, other):
+        """To merge the intervals of another FrameIntervals, e.g., of the next segment of the video
+        """
+        if self.nominalMs is None:
+            self.nominalMs = other.nominalMs
+        self.count += other.count
+        self.dropped += other.dropped
+        self._sum += other._sum
+        self._jitterCount += other._jitterCount
+        self._jitterSum += other._jitterSum
+        self._jitterSq += other._jitterSq
+        self._jitterMax = max(self._jitterMax, other._jitterMax)
+
+
+    def summary(self):
+        """To get 'dropped', 'nominal_ms', 'interval_mean_ms', 'jitter_std_ms' and 'jitter_max_ms'
+        """
+        n = self._jitterCount
+        jitterVar = self._jitterSq / n - (self._jitterSum / n) ** 2 if n else 0.0
+        return {
+            'dropped'           : self.dropped,
+            'nominal_ms'        : self.nominalMs or 0.0,
+            'interval_mean_ms'  : self._sum / self.count if self.count else 0.0,
+            'jitter_std_ms'     : math.sqrt(max(0.0, jitterVar)),
+            'jitter_max_ms'     : self._jitterMax,
+        }
+
+
+
+###########################################################
+# Frame-difference checker
+###########################################################
+class FrameDiffChecker():
+    """A class to check the consistency of consecutive frames.
+
+    For each frame it reports the number of pixels changed from the previous frame,
+    duplicated frames (no changed pixel), and the frame interval, its jitter against
+    the nominal interval and the number of frames dropped before it.
+
+    Attributes
+    -----------
+    threshold: integer
+        a pixel is changed if its absolute gray difference is above threshold
+    intervals: FrameIntervals
+        the frame interval analysis
+    frame: integer
+        the index of the next frame, starts at firstFrame
+    count, duplicated: integer
+        number of frames and duplicated frames so far
+
+    Methods
+    -----------
+    prime(pos_msec, gray)
+    process(pos_msec, gray) --> dict of frameReport_Fields
+    merge(other)
+    summary() --> dict
+    """
+    def __init__(self, threshold=15, nominalMs=None, dropRatio=1.5, firstFrame=0):
+        self.threshold = threshold
+        self.intervals = FrameIntervals(nominalMs, dropRatio)
+        self.frame = firstFrame
+        self.count = 0
+        self.duplicated = 0
+        self._prev = None
+        self._prevPos = None
+        self._diff = None
+        self._mask = None
+
+
+    def prime(self, pos, gray):
+        """To set the frame before firstFrame, the first frame is then checked against it
+        """
+        self._prev = gray
+        self._prevPos = pos
+
+
+    def process(self, pos, gray):
+        """To check one frame against the previous one
+
+        Arguments
+        ---------------
+        pos: float
+            the timestamp of the frame in ms (CAP_PROP_POS_MSEC)
+        gray: np.ndarray (H, W) uint8
+            the gray (or downscaled gray) frame
+
+        Returns
+        ---------------
+        dict
+            the row of the frame with keys of frameReport_Fields
+        """
+        row = { 'frame': self.frame, 'pos_msec': round(pos, 3), 'interval_ms': '', 'jitter_ms': '',
+                'changed_pixels': '', 'changed_ratio': '', 'mean_diff': '', 'duplicate': 0, 'dropped': 0 }
+
+        if self._prev is not None:
+            if self._diff is None or self._diff.shape != gray.shape:
+                self._diff = np.empty_like(gray)
+                self._mask = np.empty_like(gray)
+            cv2.absdiff(self._prev, gray, dst=self._diff)
+            cv2.threshold(self._diff, self.threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+            changed = cv2.countNonZero(self._mask)
+            row['changed_pixels'] = changed
+            row['changed_ratio'] = round(changed / gray.size, 6)
+            row['mean_diff'] = round(cv2.mean(self._diff)[0], 4)
+            if changed == 0:
+                row['duplicate'] = 1
+                self.duplicated += 1
+
+            interval = pos - self._prevPos
+            jitter, row['dropped'] = self.intervals.add(interval)
+            row['interval_ms'] = round(interval, 3)
+            if jitter is not None:
+                row['jitter_ms'] = round(jitter, 3)
+
+        self._prev = gray
+        self._prevPos = pos
+        self.frame += 1
+        self.count += 1
+        return row
+
+
+    def merge(self, other):
+        """To merge the statistics of the checker of the next segment of the video
+        """
+        self.intervals.merge(other.intervals)
+        self.frame = other.frame
+        self.count += other.count
+        self.duplicated += other.duplicated
+
+
+    def summary(self):
+        """To get the statistics of all frames checked
+
+        Returns
+        ---------------
+        dict
+            'frames', 'duplicated', 'dropped', 'nominal_ms', and the frame interval statistics
+            'interval_mean_ms', 'jitter_std_ms', 'jitter_max_ms'
+        """
+        result = { 'frames': self.count, 'duplicated': self.duplicated }
+        result.update(self.intervals.summary())
+        return result
+
+
+
+###########################################################
+# Frame signatures: block-mean hash
+###########################################################
+def frame_signature(gray):
+    """To compute the compact signature of a gray frame, the block means and the average hash
+
+    Arguments
+    ---------------
+    gray: np.ndarray (H, W) uint8
+        the gray (or downscaled gray) frame
+
+    Returns
+    ---------------
+    (blocks, ahash, mean)
+        blocks: np.ndarray (HASH_SIZE, HASH_SIZE) uint8, the block means
+        ahash: integer, 64-bit hash, bit set if the block is brighter than the frame mean
+        mean: float, the mean of the frame
+    """
+    blocks = cv2.resize(gray, (HASH_SIZE, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    mean = float(blocks.mean())
+    ahash = int.from_bytes(np.packbits(blocks > mean).tobytes(), 'big')
+    return blocks, ahash, mean
+
+
+def hash_distance(h0, h1):
+    """To get the Hamming distance of two hashes of frame_signature()
+    """
+    return bin(h0 ^ h1).count('1')
+
+
+class SignatureArray():
+    """A growable array of signature_Dtype records, grown by doubling so append() is amortized O(1).
+
+    Methods
+    -----------
+    append(frame, pos, mean, ahash, flags, blocks)
+    extend(records)
+    array --> np.ndarray of signature_Dtype, a view of the records appended
+    save(fname)
+        to save as .npy
+    """
+    def __init__(self, capacity=4096):
+        self._buf = np.zeros(capacity, signature_Dtype)
+        self._n = 0
+
+
+    def __len__(self):
+        return self._n
+
+
+    def _reserve(self, n):
+        if n > len(self._buf):
+            buf = np.zeros(max(n, 2 * len(self._buf)), signature_Dtype)
+            buf[:self._n] = self._buf[:self._n]
+            self._buf = buf
+
+
+    def append(self, frame, pos, mean, ahash, flags, blocks):
+        self._reserve(self._n + 1)
+        self._buf[self._n] = (frame, pos, mean, ahash, flags, blocks)
+        self._n += 1
+
+
+    def extend(self, records):
+        self._reserve(self._n + len(records))
+        self._buf[self._n:self._n + len(records)] = records
+        self._n += len(records)
+
+
+    @property
+    def array(self):
+        return self._buf[:self._n]
+
+
+    def save(self, fname):
+        np.save(fname, self.array)
+
+
+
+###########################################################
+# Frame-hash checker
+###########################################################
+class FrameHashChecker():
+    """A class to check the consistency of consecutive frames by their block-mean signatures and timestamps.
+
+    Each frame is reduced to HASH_SIZE x HASH_SIZE block means and a 64-bit average hash, so a frame
+    costs one INTER_AREA resize and the memory per frame is one signature_Dtype record (or nothing,
+    if the signatures are not kept). It flags
+        repeated frames: no block mean changes more than repeatTol
+        dropped frames: the timestamp interval is longer than dropRatio * nominal interval
+        exposure steps: the frame mean changes at least exposureStep while the hash (the structure
+                        of the scene relative to its mean) changes at most hashTol bits
+
+    Attributes
+    -----------
+    intervals: FrameIntervals
+        the frame interval analysis
+    signatures: SignatureArray
+        the signatures of all frames, None if not kept
+    frame: integer
+        the index of the next frame, starts at firstFrame
+    count, repeated, exposureSteps: integer
+        number of frames, repeated frames and exposure steps so far
+
+    Methods
+    -----------
+    prime(pos_msec, gray)
+    process(pos_msec, gray) --> dict of hashReport_Fields
+    merge(other)
+    summary() --> dict
+    """
+    def __init__(self, nominalMs=None, dropRatio=1.5, repeatTol=1, exposureStep=8.0, hashTol=6, keepSignatures=True, firstFrame=0):
+        self.intervals = FrameIntervals(nominalMs, dropRatio)
+        self.repeatTol = repeatTol
+        self.exposureStep = exposureStep
+        self.hashTol = hashTol
+        self.signatures = SignatureArray() if keepSignatures else None
+        self.frame = firstFrame
+        self.count = 0
+        self.repeated = 0
+        self.exposureSteps = 0
+        self._prev = None
+
+
+    def prime(self, pos, gray):
+        """To set the frame before firstFrame, the first frame is then checked against it
+        """
+        blocks, ahash, mean = frame_signature(gray)
+        self._prev = (pos, blocks, ahash, mean)
+
+
+    def process(self, pos, gray):
+        """To check one frame against the previous one
+
+        Arguments
+        ---------------
+        pos: float
+            the timestamp of the frame in ms (CAP_PROP_POS_MSEC)
+        gray: np.ndarray (H, W) uint8
+            the gray (or downscaled gray) frame
+
+        Returns
+        ---------------
+        dict
+            the row of the frame with keys of hashReport_Fields
+        """
+        blocks, ahash, mean = frame_signature(gray)
+        row = { 'frame': self.frame, 'pos_msec': round(pos, 3), 'interval_ms': '', 'jitter_ms': '',
+                'mean': round(mean, 3), 'block_diff': '', 'hash_dist': '', 'repeated': 0, 'dropped': 0, 'exposure_step': 0 }
+
+        flags = 0
+        if self._prev is not None:
+            prevPos, prevBlocks, prevHash, prevMean = self._prev
+            blockDiff = int(cv2.absdiff(blocks, prevBlocks).max())
+            dist = hash_distance(ahash, prevHash)
+            row['block_diff'], row['hash_dist'] = blockDiff, dist
+
+            if blockDiff <= self.repeatTol:
+                row['repeated'] = 1
+                self.repeated += 1
+                flags |= FLAG_REPEATED
+            elif abs(mean - prevMean) >= self.exposureStep and dist <= self.hashTol:
+                row['exposure_step'] = 1
+                self.exposureSteps += 1
+                flags |= FLAG_EXPOSURE
+
+            interval = pos - prevPos
+            jitter, row['dropped'] = self.intervals.add(interval)
+            row['interval_ms'] = round(interval, 3)
+            if jitter is not None:
+                row['jitter_ms'] = round(jitter, 3)
+            if row['dropped']:
+                flags |= FLAG_DROPPED
+
+        if self.signatures is not None:
+            self.signatures.append(self.frame, pos, mean, ahash, flags, blocks)
+        self._prev = (pos, blocks, ahash, mean)
+        self.frame += 1
+        self.count += 1
+        return row
+
+
+    def merge(self, other):
+        """To merge the statistics and signatures of the checker of the next segment of the video
+        """
+        self.intervals.merge(other.intervals)
+        if self.signatures is not None and other.signatures is not None:
+            self.signatures.extend(other.signatures.array)
+        self.frame = other.frame
+        self.count += other.count
+        self.repeated += other.repeated
+        self.exposureSteps += other.exposureSteps
+
+
+    def summary(self):
+        """To get the statistics of all frames checked
+
+        Returns
+        ---------------
+        dict
+            'frames', 'repeated', 'exposure_steps', and FrameIntervals.summary()
+        """
+        result = { 'frames': self.count, 'repeated': self.repeated, 'exposure_steps': self.exposureSteps }
+        result.update(self.intervals.summary())
+        return result
+
+
+
+###########################################################
+# Check a video file
+###########################################################
+def _make_checker(method, threshold, nominalMs, keepSignatures=False, firstFrame=0):
+    if method == 'hash':
+        return FrameHashChecker(nominalMs, keepSignatures=keepSignatures, firstFrame=firstFrame), hashReport_Fields
+    if method == 'diff':
+        return FrameDiffChecker(threshold, nominalMs, firstFrame=firstFrame), frameReport_Fields
+    raise ValueError("unknown method: " + method)
+
+
+def _run_checker(fvs, checker, writer=None, nFrames=None, verbose=False):
+    """To feed the frames of a started FileVideoStream to the checker, until the end of stream or nFrames
+    """
+    while nFrames is None or checker.count < nFrames:
+        item = fvs.read()
+        if item is None:
+            break
+        row = checker.process(*item)
+        if writer:
+            writer.writerow(row)
+        if verbose:
+            print(row)
+
+
+def video_info(path):
+    """To get (frame count, fps) of a video file from its header, the count may be approximate
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError("failed to open video: " + path)
+    info = (int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS))
+    cap.release()
+    return info
+
+
+def check_video(path, csvFile=None, scale=0.5, threshold=15, queueSize=128, verbose=False, method='diff', sigFile=None):
+    """To check a video file frame by frame, decoding on the FileVideoStream producer thread.
+
+    Arguments
+    ---------------
+    path: string
+        the video file
+    csvFile: string
+        the per-frame CSV report, None for no report
+    scale: float
+        the downscale factor of the gray frames
+    threshold: integer
+        see FrameDiffChecker
+    queueSize: integer
+        the size of the decoded frame queue
+    verbose: boolean
+        if True, print the row of each frame
+    method: string
+        'diff' for FrameDiffChecker, 'hash' for FrameHashChecker
+    sigFile: string
+        the .npy file of the frame signatures of the 'hash' method, None to not keep the signatures
+
+    Returns
+    ---------------
+    dict
+        summary() of the checker, plus 'seconds' and 'fps' of the analysis
+    """
+    from imutils.video import FileVideoStream
+
+    fvs = FileVideoStream(path, queue_size=queueSize, pool=True)
+    if not fvs.stream.isOpened():
+        raise IOError("failed to open video: " + path)
+    fps = fvs.stream.get(cv2.CAP_PROP_FPS)
+    fvs.transform = gray_transform(fvs.stream, scale)
+    checker, fields = _make_checker(method, threshold, 1000.0 / fps if fps and fps > 0 else None, sigFile is not None)
+
+    fcsv = open(csvFile, 'w', newline='') if csvFile else None
+    writer = csv.DictWriter(fcsv, fieldnames=fields) if fcsv else None
+    if writer:
+        writer.writeheader()
+
+    t0 = time.perf_counter()
+    fvs.start()
+    try:
+        _run_checker(fvs, checker, writer, verbose=verbose)
+    finally:
+        fvs.stop()
+        if fcsv:
+            fcsv.close()
+
+    if sigFile and method == 'hash':
+        checker.signatures.save(sigFile)
+
+    result = checker.summary()
+    result['seconds'] = time.perf_counter() - t0
+    result['fps'] = checker.count / result['seconds'] if result['seconds'] > 0 else 0.0
+    return result
+
+
+
+###########################################################
+# Parallel segments of a long video
+###########################################################
+def split_segments(nFrames, nSegments):
+    """To split [0, nFrames) into nSegments contiguous ranges of (almost) equal length
+
+    Returns
+    ---------------
+    list of (start, end)
+        end is exclusive; the end of the last segment is None, i.e., to the end of stream,
+        since the frame count of the header may be approximate
+    """
+    nSegments = max(1, min(nSegments, nFrames))
+    bounds = [ nFrames * i // nSegments for i in range(nSegments + 1) ]
+    segments = [ (bounds[i], bounds[i+1]) for i in range(nSegments) ]
+    segments[-1] = (segments[-1][0], None)
+    return segments
+
+
+def check_segment(path, start, end, conf):
+    """To check the frames [start, end) of a video in a worker process.
+
+    The capture is positioned with CAP_PROP_POS_FRAMES at start-1, the frame before the segment only
+    primes the checker, so the first frame of the segment is checked against its real predecessor
+    and the merged report is the same as the sequential one.
+
+    Arguments
+    ---------------
+    path: string
+        the video file
+    start, end: integer
+        the segment, see split_segments()
+    conf: dict
+        'scale', 'threshold', 'method', 'nominalMs', 'signatures' (boolean), 'csvFile' (the part file, or None)
+
+    Returns
+    ---------------
+    dict
+        'start', 'end', 'seconds', 'error' (None if succeeded), and 'checker' with the statistics of the segment
+    """
+    from imutils.video import FileVideoStream
+
+    t0 = time.perf_counter()
+    result = { 'start': start, 'end': end, 'seconds': 0.0, 'checker': None, 'error': None }
+    fcsv = None
+    try:
+        fvs = FileVideoStream(path, queue_size=conf.get('queueSize', 128), pool=True)
+        if not fvs.stream.isOpened():
+            raise IOError("failed to open video: " + path)
+        fvs.transform = gray_transform(fvs.stream, conf['scale'])
+        checker, fields = _make_checker(conf['method'], conf['threshold'], conf['nominalMs'], conf['signatures'], start)
+        if start > 0:
+            fvs.stream.set(cv2.CAP_PROP_POS_FRAMES, start - 1)
+
+        if conf['csvFile']:
+            fcsv = open(conf['csvFile'], 'w', newline='')
+        writer = csv.DictWriter(fcsv, fieldnames=fields) if fcsv else None
+
+        fvs.start()
+        try:
+            if start > 0:
+                item = fvs.read()
+                if item is None:
+                    raise IOError("failed to seek to frame {}".format(start - 1))
+                checker.prime(*item)
+            _run_checker(fvs, checker, writer, None if end is None else end - start)
+        finally:
+            fvs.stop()
+
+        #-- only the statistics go back to the parent process
+        checker._prev = None
+        if conf['method'] == 'diff':
+            checker._diff = checker._mask = None
+        result['checker'] = checker
+    except Exception as e:
+        result['error'] = "{}: {}".format(type(e).__name__, e)
+    finally:
+        if fcsv:
+            fcsv.close()
+
+    result['seconds'] = time.perf_counter() - t0
+    return result
+
+
+def check_video_parallel(path, csvFile=None, scale=0.5, threshold=15, method='diff', sigFile=None, jobs=None, segments=None, verbose=True):
+    """To check a long video in parallel, one segment per task of a ProcessPoolExecutor.
+
+    Each worker seeks to its segment with CAP_PROP_POS_FRAMES and writes its rows to a part file,
+    the part files are then concatenated in order and the statistics of the segments merged.
+
+    Arguments
+    ---------------
+    path, csvFile, scale, threshold, method, sigFile:
+        see check_video()
+    jobs: integer
+        number of worker processes, None for os.cpu_count(), 1 to run the segments in this process
+    segments: integer
+        number of segments, None for the number of workers
+    verbose: boolean
+        if True, print the progress and the overall fps
+
+    Returns
+    ---------------
+    dict
+        same as check_video(), plus 'segments'
+    """
+    nFrames, fps = video_info(path)
+    nWorkers = jobs or os.cpu_count() or 1
+    segs = split_segments(nFrames, segments or nWorkers)
+    conf = { 'scale': scale, 'threshold': threshold, 'method': method, 'signatures': sigFile is not None,
+             'nominalMs': 1000.0 / fps if fps and fps > 0 else None }
+    confs = []
+    for i in range(len(segs)):
+        c = dict(conf)
+        c['csvFile'] = '{}.part{:03d}'.format(csvFile, i) if csvFile else None
+        confs.append(c)
+
+    t0 = time.perf_counter()
+    starts, ends = [ s for s, e in segs ], [ e for s, e in segs ]
+    try:
+        out = batchRunner.run_batch(check_segment, [path] * len(segs), starts, ends, confs, jobs=nWorkers,
+                                    progress=_print_segment if verbose else None)
+
+        errors = [ r['error'] for r in out if r['error'] ]
+        if errors:
+            raise RuntimeError("failed to check {}: {}".format(path, errors[0]))
+
+        #-- merge the segments in order
+        checker = out[0]['checker']
+        for res in out[1:]:
+            checker.merge(res['checker'])
+
+        if csvFile:
+            fields = hashReport_Fields if method == 'hash' else frameReport_Fields
+            with open(csvFile, 'w', newline='') as f:
+                csv.DictWriter(f, fieldnames=fields).writeheader()
+                for c in confs:
+                    with open(c['csvFile'], 'r', newline='') as part:
+                        shutil.copyfileobj(part, f)
+    finally:
+        #-- the part files are removed even if a segment failed
+        for c in confs:
+            if c['csvFile'] and os.path.exists(c['csvFile']):
+                os.remove(c['csvFile'])
+
+    if sigFile and method == 'hash':
+        checker.signatures.save(sigFile)
+
+    result = checker.summary()
+    result['segments'] = len(segs)
+    result['seconds'] = time.perf_counter() - t0
+    result['fps'] = checker.count / result['seconds'] if result['seconds'] > 0 else 0.0
+    if verbose:
+        print("--- {} frames in {} segments, {:.2f} s, {:.1f} fps".format(checker.count, len(segs), result['seconds'], result['fps']))
+    return result
+
+
+def _print_segment(n, total, result):
+    if result['error']:
+        print("[{}/{}] frames {}-: ERROR, {}".format(n, total, result['start'], result['error']))
+    else:
+        print("[{}/{}] frames {}-{}: {:.2f} s".format(n, total, result['start'],
+                result['checker'].frame - 1, result['seconds']))
@@ -1,43 +1,40 @@
 # -*- coding: utf-8 -*-
-import cv2
-import time;
-
-# ip camera 的擷取路徑
-URL = "rtsp://192.168.1.67:554/stream1"
-
-# 建立 VideoCapture 物件
-ipcam = cv2.VideoCapture("TESR9166.MP4")
-
-current_milli_time = 0
-# 使用無窮迴圈擷取影像，直到按下Esc鍵結束
-stat, I = ipcam.read()
-stat, last_I = ipcam.read()
-while True:
-    # 使用 read 方法取回影像
-    stat, I = ipcam.read()
+import sys
+import argparse
 
+import cy_FrameChecker as frameCHECKER
 
 
-    image_th = cv2.absdiff(last_I,I);
-    ret,image_th = cv2.threshold(image_th,15,255,cv2.THRESH_BINARY)
-    gray_image = cv2.cvtColor(image_th, cv2.COLOR_BGR2GRAY)
-    cunt_value = cv2.countNonZero(gray_image)
-    print(cunt_value)
-    last_I = I
-    # 加上一些影像處理...
-
-    # imshow 和 waitkey 需搭配使用才能展示影像
-    #if stat == True:
-    #    cv2.imshow('Image', I)
-
-    #if stat == False:
-    #    print("ERROR FRAME")
-    last_milli_time = current_milli_time
-    current_milli_time = int(round(time.time() * 1000))
-    spend_time = current_milli_time - last_milli_time
-    #print(spend_time)
+# ip camera 的擷取路徑
+URL = "rtsp://192.168.1.67:554/stream1"
 
-    if cv2.waitKey(1) == 27:
-        ipcam.release()
-        cv2.destroyAllWindows()
-        break
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Frame consistency check: changed pixels, duplicated/dropped frames and frame-interval jitter.')
+    parser.add_argument("video", nargs='?', default="TESR9166.MP4", help='the video file (or stream URL)')
+    parser.add_argument("-o", "--output", default="frame_report.csv", help='the per-frame CSV report')
+    parser.add_argument("--scale", type=float, default=0.5, help='downscale factor of the gray frames, default=0.5')
+    parser.add_argument("--threshold", type=int, default=15, help='gray difference of a changed pixel, default=15')
+    parser.add_argument("--method", choices=['diff', 'hash'], default='diff', help='diff: changed pixels; hash: block-mean signatures, default=diff')
+    parser.add_argument("--signatures", default=None, help='the .npy file of the frame signatures, --method hash only')
+    parser.add_argument("--jobs", type=int, default=1, help='number of worker processes checking segments of the video in parallel, 0 for the number of CPUs, default=1')
+    parser.add_argument("-v", "--verbose", action='store_true', help='print the row of each frame')
+    args = parser.parse_args()
+
+    # 解碼在背景執行緒 (FileVideoStream)，主執行緒只做灰階差異，不顯示影像
+    if args.jobs == 1:
+        res = frameCHECKER.check_video(args.video, args.output, scale=args.scale, threshold=args.threshold, verbose=args.verbose,
+                                         method=args.method, sigFile=args.signatures)
+    else:
+        # 長影片切成多段，各段由不同行程以 CAP_PROP_POS_FRAMES 定位後檢查，再依序合併
+        res = frameCHECKER.check_video_parallel(args.video, args.output, scale=args.scale, threshold=args.threshold,
+                                                  method=args.method, sigFile=args.signatures, jobs=args.jobs or None)
+
+    if args.method == 'hash':
+        print("frames: {}, repeated: {}, dropped: {}, exposure steps: {}".format(res['frames'], res['repeated'], res['dropped'], res['exposure_steps']))
+    else:
+        print("frames: {}, duplicated: {}, dropped: {}".format(res['frames'], res['duplicated'], res['dropped']))
+    print("interval: nominal {:.3f} ms, mean {:.3f} ms, jitter std {:.3f} ms, max {:.3f} ms".format(
+            res['nominal_ms'], res['interval_mean_ms'], res['jitter_std_ms'], res['jitter_max_ms']))
+    print("--- {} frames in {:.2f} s, {:.1f} fps".format(res['frames'], res['seconds'], res['fps']))
+    print("Report: " + args.output)
+    sys.exit(0)